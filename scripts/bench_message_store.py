@@ -0,0 +1,76 @@
+"""Benchmark MessageStore write paths.
+
+Compares per-message commits (batch_size=1) against the write-behind queue
+at a few batch sizes, reporting per-call latency and overall throughput.
+
+Usage: python -m scripts.bench_message_store [--messages N] [--wal]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src.memory.store import MessageStore
+
+
+async def _run(
+    db_path: Path, *, messages: int, batch_size: int, flush_ms: float, wal: bool,
+) -> dict:
+    store = MessageStore(
+        db_path, batch_size=batch_size, flush_interval_ms=flush_ms,
+        wal=wal, read_pool_size=2 if wal else 0,
+    )
+    await store.initialize()
+
+    latencies: list[float] = []
+
+    async def one(i: int):
+        started = time.perf_counter()
+        await store.save_message(
+            channel_id=f"ch-{i % 8}", user_id=f"u-{i % 50}", user_name="bench",
+            content=f"benchmark message {i}", is_bot=False, bot_name=None,
+        )
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    # Simulate a burst of concurrent on_message handlers
+    await asyncio.gather(*(one(i) for i in range(messages)))
+    elapsed = time.perf_counter() - started
+    stats = store.stats
+    await store.close()
+
+    latencies.sort()
+    return {
+        "batch_size": batch_size,
+        "throughput": messages / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "commits": stats.batches,
+        "mean_batch": stats.mean_batch_size,
+    }
+
+
+async def main(messages: int, wal: bool):
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, batch_size in enumerate([1, 8, 32, 128]):
+            result = await _run(
+                Path(tmp) / f"bench-{i}.sqlite",
+                messages=messages, batch_size=batch_size, flush_ms=50, wal=wal,
+            )
+            print(
+                f"batch_size={result['batch_size']:>4}  "
+                f"{result['throughput']:>9.0f} msg/s  "
+                f"p50={result['p50_ms']:.2f}ms  p99={result['p99_ms']:.2f}ms  "
+                f"commits={result['commits']}  mean_batch={result['mean_batch']:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--wal", action="store_true", help="WAL mode with a read pool")
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.wal))
@@ -0,0 +1,152 @@
+"""Token-budgeted prompt assembly.
+
+A single pasted log or tool result can be hundreds of kilobytes, so counting
+messages says little about prompt size. ``ContextAssembler`` builds each LLM
+call from the system prompt, retrieved vector context and session history
+within ``ContextBudget.max_tokens``. When the prompt is over budget the
+largest messages are truncated first (keeping their head and tail), and
+only once every message is down to ``min_message_tokens`` are the oldest
+ones dropped. Tool results are capped as they enter the tool loop.
+
+Token counts come from a pluggable ``count_tokens`` callable. The default,
+``estimate_tokens``, is a character heuristic that is close enough for
+budgeting; pass a real tokenizer's length function for exact counts.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+TokenCounter = Callable[[str], int]
+
+# Per-message framing (role, separators) that providers add on top of content
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: about four characters per token for prose and code."""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class ContextBudget:
+    # Hard cap on the prompt sent with each LLM call
+    max_tokens: int = 32_000
+    # Share of the prompt for retrieved vector context
+    retrieved_tokens: int = 2_000
+    # Cap on a single tool result as it enters the conversation
+    tool_result_tokens: int = 8_000
+    # Session size that triggers background compaction
+    history_tokens: int = 16_000
+    # Truncation floor; past this, whole messages are dropped instead
+    min_message_tokens: int = 200
+
+
+class ContextAssembler:
+    def __init__(
+        self,
+        budget: ContextBudget | None = None,
+        *,
+        count_tokens: TokenCounter = estimate_tokens,
+    ):
+        self.budget = budget or ContextBudget()
+        self.count_tokens = count_tokens
+
+    def message_tokens(self, message: BaseMessage) -> int:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        return self.count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+    def history_tokens(self, messages: list[BaseMessage]) -> int:
+        return sum(self.message_tokens(m) for m in messages)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut ``text`` to about ``max_tokens``, keeping its head and tail."""
+        tokens = self.count_tokens(text)
+        if tokens <= max_tokens:
+            return text
+        marker = f"\n[... truncated {tokens - max_tokens} tokens ...]\n"
+        room = max(0, max_tokens - self.count_tokens(marker))
+        keep = int(len(text) * room / tokens)
+        head = text[: keep * 2 // 3]
+        tail = text[len(text) - (keep - len(head)):] if keep > len(head) else ""
+        return head + marker + tail
+
+    def fit_tool_result(self, text: str) -> str:
+        return self.truncate(text, self.budget.tool_result_tokens)
+
+    def assemble(
+        self,
+        *,
+        system_prompt: str,
+        retrieved: list[str],
+        history: list[BaseMessage],
+    ) -> list[BaseMessage]:
+        """Build the prompt for one turn. ``history`` itself is not modified."""
+        messages: list[BaseMessage] = [SystemMessage(content=system_prompt)]
+
+        lines = []
+        used = 0
+        for text in retrieved:
+            # Results arrive best first, so stop at the first that won't fit
+            cost = self.count_tokens(text) + 1
+            if used + cost > self.budget.retrieved_tokens:
+                break
+            lines.append(f"- {text}")
+            used += cost
+        if lines:
+            messages.append(HumanMessage(content="[Retrieved context]:\n" + "\n".join(lines)))
+
+        return self.fit(messages + list(history))
+
+    def fit(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        """Return ``messages`` cut down to ``max_tokens``.
+
+        System messages and the final message are never dropped, and tool
+        call/result pairs are only truncated, never split.
+        """
+        fitted = list(messages)
+        sizes = [self.message_tokens(m) for m in fitted]
+        excess = sum(sizes) - self.budget.max_tokens
+        if excess <= 0:
+            return fitted
+
+        floor = self.budget.min_message_tokens
+        settled: set[int] = set()
+        while excess > 0:
+            # Largest non-system message still above the floor
+            candidates = [
+                i for i, m in enumerate(fitted)
+                if not isinstance(m, SystemMessage) and sizes[i] > floor and i not in settled
+            ]
+            if not candidates:
+                break
+            i = max(candidates, key=sizes.__getitem__)
+            settled.add(i)
+            if not isinstance(fitted[i].content, str):
+                continue
+            target = max(floor, sizes[i] - excess)
+            truncated = fitted[i].model_copy(update={
+                "content": self.truncate(fitted[i].content, target - MESSAGE_OVERHEAD_TOKENS),
+            })
+            new_size = self.message_tokens(truncated)
+            # Skip when the truncation marker outweighs what was cut
+            if new_size < sizes[i]:
+                fitted[i] = truncated
+                excess -= sizes[i] - new_size
+                sizes[i] = new_size
+
+        i = 0
+        while excess > 0 and i < len(fitted) - 1:
+            if _droppable(fitted[i]):
+                excess -= sizes.pop(i)
+                fitted.pop(i)
+            else:
+                i += 1
+        return fitted
+
+
+def _droppable(message: BaseMessage) -> bool:
+    if isinstance(message, (SystemMessage, ToolMessage)):
+        return False
+    return not (isinstance(message, AIMessage) and message.tool_calls)
@@ -1,13 +1,23 @@
 """Core agent with session management and agentic tool loop.
 
-Uses in-memory session store with tool-calling support via run_tool_loop.
+Sessions live in a bounded SessionStore that spills evicted conversations
+to SQLite. Tool calling goes through run_tool_loop.
+
+Turns are serialized per session. Messages that arrive for a session while
+a turn is in flight wait in a bounded queue, and the whole queue is answered
+by the next turn, so a burst in a busy channel costs one LLM call.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
 
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from langchain_openai import ChatOpenAI
 from openai import (
     APIConnectionError,
@@ -16,11 +26,17 @@ from openai import (
     RateLimitError,
 )
 
-from src.agent.tool_loop import run_tool_loop
+from src.agent.context import ContextAssembler
+from src.agent.tool_loop import TokenSink, run_tool_loop, stream_response
+from src.agent.tool_selection import ToolSelector
+from src.memory.backfill import message_doc_id
 from src.memory.compaction import compact_messages, should_compact
+from src.memory.hybrid import HybridRetriever, session_scope
 from src.memory.operational import OperationalMemory
+from src.memory.sessions import SessionStore
 from src.memory.vector import VectorMemory
 from src.providers.minimax import normalize_messages
+from src.skills.index import SkillIndex
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +49,77 @@ class LLMProviderError(Exception):
         self.recoverable = recoverable
 
 
+class SessionBusyError(Exception):
+    """Raised when a session already has the maximum number of queued messages.
+
+    This is back-pressure from the agent, not a provider failure, so it is
+    not an ``LLMProviderError``.
+    """
+
+
+@dataclass
+class PromptCacheStats:
+    hits: int = 0
+    rebuilds: int = 0
+
+
+@dataclass
+class _PendingMessage:
+    user_message: str
+    user_name: str
+    on_tool_call: Callable | None
+    stream: TokenSink | None
+    message_id: asyncio.Future | None
+    channel_id: str | None
+    user_id: str | None
+    future: asyncio.Future
+
+
+class _SessionLane:
+    """Turn lock and wait queue for one session."""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.pending: list[_PendingMessage] = []
+        self.callers = 0
+
+
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _skills_section(index: str, *, relevant_only: bool = False) -> str:
+    if not index or index == "No skills available.":
+        return ""
+    note = (
+        "Only the skills most relevant to this message are listed; "
+        "`dispatch_skill` accepts any skill name.\n"
+        if relevant_only else ""
+    )
+    return (
+        "\n\n## Available Skills\n"
+        "When a request matches a skill trigger, use `dispatch_skill`.\n"
+        f"{note}\n{index}"
+    )
+
+
+def _tools_section(tools: list) -> str:
+    tool_names = [t.name for t in tools]
+    return (
+        "\n\n## Tools\n"
+        f"You have access to the following tools: {', '.join(tool_names)}.\n"
+        "Use them when needed to fulfill user requests. "
+        "Call tools by including tool_calls in your response.\n\n"
+        "If you have the `create_skill` tool and a user's request would benefit from "
+        "a reusable capability that doesn't exist yet, create a new skill for it. "
+        "This lets you learn and improve over time."
+    )
+
+
 class CoreAgent:
     def __init__(
         self,
@@ -44,12 +131,24 @@ class CoreAgent:
         operational_memory: OperationalMemory | None = None,
         tools: list | None = None,
         skill_registry=None,
+        retriever: HybridRetriever | None = None,
+        soul_path: Path | None = None,
+        prompt_stat_interval: float = 2.0,
+        max_queued_messages: int = 8,
+        session_store: SessionStore | None = None,
+        context: ContextAssembler | None = None,
+        skill_index: SkillIndex | None = None,
+        tool_selector: ToolSelector | None = None,
     ):
         self.tools = tools or []
         self.skill_registry = skill_registry
+        # With an index, each turn lists only the skills relevant to it
+        self.skill_index = skill_index
+        # With a selector, each turn binds only the tools relevant to it
+        self.tool_selector = tool_selector
 
         # Bind tools to LLM if any are provided
-        if self.tools:
+        if self.tools and tool_selector is None:
             self.llm = llm.bind_tools(self.tools)
         else:
             self.llm = llm
@@ -57,18 +156,82 @@ class CoreAgent:
         self._raw_llm = llm
         self.system_prompt = system_prompt
         self.max_session_messages = max_session_messages
+        self.context = context or ContextAssembler()
         self.vector_memory = vector_memory
+        if retriever is None and vector_memory is not None:
+            retriever = HybridRetriever(vector_memory)
+        self.retriever = retriever
         self.operational_memory = operational_memory
-        self._sessions: dict[str, list[BaseMessage]] = {}
+        self._sessions = session_store or SessionStore()
+        self.max_queued_messages = max_queued_messages
+        self._lanes: dict[str, _SessionLane] = {}
+        self._compactions: dict[str, asyncio.Task] = {}
+        self._indexing: set[asyncio.Task] = set()
+
+        # System prompt cache. In-process changes (operational memory writes,
+        # skill registrations, tool list) are seen through version counters;
+        # hand edits to SOUL.md and the memory files through mtimes, which are
+        # re-checked at most every prompt_stat_interval seconds.
+        self.soul_path = soul_path
+        self.prompt_stat_interval = prompt_stat_interval
+        self.prompt_cache_stats = PromptCacheStats()
+        self._prompt_cache: tuple[tuple, str] | None = None
+        self._file_signatures: tuple | None = None
+        self._file_signatures_checked = 0.0
 
     def _get_session(self, session_id: str) -> list[BaseMessage]:
-        if session_id not in self._sessions:
-            self._sessions[session_id] = []
-        return self._sessions[session_id]
+        return self._sessions.get(session_id)
+
+    def _prompt_source_files(self) -> list[Path]:
+        files = []
+        if self.soul_path is not None:
+            files.append(self.soul_path)
+        if self.operational_memory is not None:
+            files.extend(self.operational_memory.paths)
+        return files
+
+    def _prompt_cache_key(self) -> tuple:
+        now = time.monotonic()
+        if (
+            self._file_signatures is None
+            or now - self._file_signatures_checked >= self.prompt_stat_interval
+        ):
+            self._file_signatures = tuple(
+                _file_signature(p) for p in self._prompt_source_files()
+            )
+            self._file_signatures_checked = now
+        return (
+            self._file_signatures,
+            getattr(self.operational_memory, "version", None),
+            getattr(self.skill_registry, "version", None),
+            tuple(t.name for t in self.tools),
+        )
+
+    def invalidate_prompt_cache(self) -> None:
+        """Force the next turn to rebuild the system prompt from disk."""
+        self._prompt_cache = None
+        self._file_signatures = None
 
     def _build_system_prompt(self) -> str:
+        """Return the assembled system prompt, rebuilding it only when a source changed."""
+        key = self._prompt_cache_key()
+        if self._prompt_cache is not None and self._prompt_cache[0] == key:
+            self.prompt_cache_stats.hits += 1
+            return self._prompt_cache[1]
+
+        prompt = self._assemble_system_prompt()
+        self.prompt_cache_stats.rebuilds += 1
+        logger.debug("System prompt rebuilt (%d rebuilds)", self.prompt_cache_stats.rebuilds)
+        # Keyed on signatures taken before the reads, so an edit racing the
+        # assembly costs at most one extra rebuild rather than a stale prompt
+        self._prompt_cache = (key, prompt)
+        return prompt
+
+    def _assemble_system_prompt(self) -> str:
         """Build system prompt, appending operational memory and skill index."""
         prompt = self.system_prompt
+        if self.soul_path is not None and self.soul_path.exists():
+            prompt = self.soul_path.read_text()
         if self.operational_memory is not None:
             mem = self.operational_memory.read_all()
             sections = []
@@ -81,45 +244,47 @@ class CoreAgent:
             if sections:
                 prompt += "\n\n" + "\n\n".join(sections)
 
-        if self.skill_registry is not None:
-            index = self.skill_registry.get_skill_index()
-            if index and index != "No skills available.":
-                prompt += (
-                    "\n\n## Available Skills\n"
-                    "When a request matches a skill trigger, use `dispatch_skill`.\n\n"
-                    f"{index}"
-                )
+        if self.skill_registry is not None and self.skill_index is None:
+            prompt += _skills_section(self.skill_registry.get_skill_index())
 
-        if self.tools:
-            tool_names = [t.name for t in self.tools]
-            prompt += (
-                "\n\n## Tools\n"
-                f"You have access to the following tools: {', '.join(tool_names)}.\n"
-                "Use them when needed to fulfill user requests. "
-                "Call tools by including tool_calls in your response.\n\n"
-                "If you have the `create_skill` tool and a user's request would benefit from "
-                "a reusable capability that doesn't exist yet, create a new skill for it. "
-                "This lets you learn and improve over time."
-            )
+        if self.tools and self.tool_selector is None:
+            prompt += _tools_section(self.tools)
 
         return prompt
 
-    def _search_vector_context(self, query: str) -> list[dict]:
-        """Search vector memory for relevant prior context."""
-        if self.vector_memory is None:
+    async def _search_vector_context(self, query: str) -> list[dict]:
+        """Search for relevant prior context across all sessions (hybrid ranking)."""
+        if self.retriever is None:
             return []
         try:
-            return self.vector_memory.search(query, k=5)
+            return await self.retriever.search(query, k=5, exclude_text=query)
         except Exception:
             logger.exception("Vector search failed")
             return []
 
-    def _index_message(self, text: str, metadata: dict) -> None:
-        """Index a message in the vector store."""
+    async def _index_message(
+        self, text: str, metadata: dict, message_id: asyncio.Future | None = None,
+    ) -> None:
+        """Queue a message for background indexing in the vector store.
+
+        A message with a row in the message log is indexed under the same
+        ``msg-<row id>`` id the backfill uses, so backfilling it later
+        replaces the document instead of adding a second copy.
+        """
         if self.vector_memory is None:
             return
+        doc_id = None
+        if message_id is not None:
+            await asyncio.wait([message_id])
+            if message_id.cancelled() or message_id.exception() is not None:
+                logger.warning("Message was not logged; indexing it by content")
+            else:
+                doc_id = message_doc_id(message_id.result())
+                metadata["message_id"] = message_id.result()
         try:
-            self.vector_memory.add(text=text, metadata=metadata)
+            await self.vector_memory.add_in_background(
+                text=text, metadata=metadata, doc_id=doc_id,
+            )
         except Exception:
             logger.exception("Vector indexing failed")
 
@@ -130,65 +295,155 @@ class CoreAgent:
         user_message: str,
         user_name: str,
         on_tool_call=None,
+        stream: TokenSink | None = None,
+        message_id: asyncio.Future | None = None,
+        channel_id: str | None = None,
+        user_id: str | None = None,
+    ) -> str:
+        """Answer a message, coalescing it with others queued for the session.
+
+        When several messages are answered by one turn, the reply (or the
+        error) goes to the most recent caller and the others get ``""``.
+        Only that caller's ``stream`` receives the reply as it is generated.
+        ``message_id`` resolves to the message's row in the message log (see
+        ``MessageStore.enqueue_message``) and keys its vector store entry.
+        ``channel_id`` and ``user_id`` are stored with that entry, like the
+        backfill does; by default they come from the session id.
+        """
+        lane = self._lanes.setdefault(session_id, _SessionLane())
+        if len(lane.pending) >= self.max_queued_messages:
+            raise SessionBusyError(
+                "Too many messages are waiting in this conversation. "
+                "Please wait for a reply before sending more."
+            )
+
+        pending = _PendingMessage(
+            user_message=user_message,
+            user_name=user_name,
+            on_tool_call=on_tool_call,
+            stream=stream,
+            message_id=message_id,
+            channel_id=channel_id,
+            user_id=user_id,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        lane.pending.append(pending)
+        lane.callers += 1
+        try:
+            async with lane.lock:
+                # A turn that ran while we waited may already have answered us
+                if not pending.future.done():
+                    batch, lane.pending = lane.pending, []
+                    await self._run_batch(session_id, batch)
+        finally:
+            lane.callers -= 1
+            if lane.callers == 0:
+                self._lanes.pop(session_id, None)
+        return await pending.future
+
+    async def _run_batch(self, session_id: str, batch: list[_PendingMessage]) -> None:
+        if len(batch) > 1:
+            logger.debug("Coalescing %d messages into one turn for %s", len(batch), session_id)
+        last = batch[-1]
+        try:
+            async with self._sessions.checkout(session_id) as session:
+                response = await self._run_turn(session, session_id, batch)
+        except Exception as e:
+            last.future.set_exception(e)
+        except BaseException:
+            for item in batch:
+                item.future.cancel()
+            raise
+        else:
+            last.future.set_result(response)
+        for item in batch[:-1]:
+            item.future.set_result("")
+
+    async def _run_turn(
+        self, session: list[BaseMessage], session_id: str, batch: list[_PendingMessage],
     ) -> str:
-        session = self._get_session(session_id)
+        # Everything this turn adds is rolled back together if the LLM call
+        # fails. It is always the tail: background compaction only rewrites
+        # the head of the session.
+        added = len(batch)
+        session.extend(
+            HumanMessage(content=f"[{item.user_name}]: {item.user_message}") for item in batch
+        )
 
-        user_msg = HumanMessage(content=f"[{user_name}]: {user_message}")
-        session.append(user_msg)
+        query = "\n".join(item.user_message for item in batch)
 
         # Build system prompt with operational memory + skill index
         system_prompt = self._build_system_prompt()
+        if self.skill_index is not None:
+            # After the cached part, so the stable prefix stays the same
+            system_prompt += _skills_section(
+                await self.skill_index.render(query), relevant_only=True,
+            )
 
-        # Search vector memory for relevant context
-        retrieved = self._search_vector_context(user_message)
-
-        messages: list[BaseMessage] = [SystemMessage(content=system_prompt)]
+        llm, tools = self.llm, self.tools
+        on_tool_call = batch[-1].on_tool_call
+        used_tools: set[str] = set()
+        if self.tool_selector is not None and self.tools:
+            tools = self.tool_selector.select(self.tools, query, session_id)
+            llm = self.tool_selector.bind(self._raw_llm, tools)
+            if tools:
+                system_prompt += _tools_section(tools)
+
+            # The session only keeps the final reply, so note the calls here
+            # for the selector's follow-up stickiness
+            async def on_tool_call(name: str, args: dict, _report=batch[-1].on_tool_call):
+                used_tools.add(name)
+                if _report is not None:
+                    await _report(name, args)
 
-        if retrieved:
-            context_text = "\n".join(
-                f"- {r['text']}" for r in retrieved
-            )
-            messages.append(
-                HumanMessage(content=f"[Retrieved context]:\n{context_text}")
-            )
+        # Search vector memory for relevant context
+        retrieved = await self._search_vector_context(query)
 
-        messages.extend(session)
+        messages = self.context.assemble(
+            system_prompt=system_prompt,
+            retrieved=[r["text"] for r in retrieved],
+            history=session,
+        )
         normalized = normalize_messages(messages)
 
         try:
-            if self.tools:
+            if tools:
                 response = await run_tool_loop(
-                    llm=self.llm,
+                    llm=llm,
                     messages=normalized,
-                    tools=self.tools,
+                    tools=tools,
                     on_tool_call=on_tool_call,
+                    context=self.context,
+                    stream=batch[-1].stream,
                 )
+            elif batch[-1].stream is not None:
+                response = await stream_response(llm, normalized, batch[-1].stream)
             else:
-                response = await self.llm.ainvoke(normalized)
+                response = await llm.ainvoke(normalized)
         except AuthenticationError as e:
             logger.error("MiniMax authentication failed: %s", e)
-            session.pop()
+            del session[-added:]
             raise LLMProviderError(
                 "Authentication with MiniMax failed. The API key may be invalid or expired.",
                 recoverable=False,
             ) from e
         except RateLimitError as e:
             logger.warning("MiniMax rate limit hit: %s", e)
-            session.pop()
+            del session[-added:]
             raise LLMProviderError(
                 "MiniMax rate limit reached. Please try again in a moment.",
                 recoverable=True,
             ) from e
         except APIConnectionError as e:
             logger.error("Cannot reach MiniMax API: %s", e)
-            session.pop()
+            del session[-added:]
             raise LLMProviderError(
                 "Cannot reach the MiniMax API. The service may be down.",
                 recoverable=True,
             ) from e
         except APIStatusError as e:
             logger.error("MiniMax API error (status %s): %s", e.status_code, e)
-            session.pop()
+            del session[-added:]
             raise LLMProviderError(
                 f"MiniMax returned an error (HTTP {e.status_code}). "
                 "The service may be experiencing issues.",
@@ -197,16 +452,119 @@ class CoreAgent:
 
         ai_msg = AIMessage(content=response.content)
         session.append(ai_msg)
+        if self.tool_selector is not None:
+            self.tool_selector.record(session_id, used_tools)
+
+        # Index the user messages in the background; the reply never waits
+        # on the vector store, even when its ingestion buffer is backed up
+        scope_channel, scope_user = session_scope(session_id)
+        for item in batch:
+            metadata = {
+                "user_name": item.user_name,
+                "timestamp_us": time.time_ns() // 1000,
+            }
+            # The filter keys the backfill writes; Chroma rejects None values
+            channel_id = item.channel_id or scope_channel
+            user_id = item.user_id or scope_user
+            if channel_id is not None:
+                metadata["channel_id"] = channel_id
+            if user_id is not None:
+                metadata["user_id"] = user_id
+            task = asyncio.create_task(self._index_message(
+                text=f"[{item.user_name}]: {item.user_message}",
+                metadata=metadata,
+                message_id=item.message_id,
+            ))
+            self._indexing.add(task)
+            task.add_done_callback(self._indexing.discard)
+
+        if self._needs_compaction(session):
+            self._schedule_compaction(session_id)
 
-        # Index the user message in the vector store
-        self._index_message(
-            text=f"[{user_name}]: {user_message}",
-            metadata={"session_id": session_id, "user_name": user_name},
+        return response.content
+
+    def _needs_compaction(self, session: list[BaseMessage], ratio: float = 1.0) -> bool:
+        """Whether a session is over ``ratio`` of the message or token limit."""
+        return (
+            should_compact(session, max_messages=int(self.max_session_messages * ratio))
+            or self.context.history_tokens(session) > self.context.budget.history_tokens * ratio
         )
 
-        if should_compact(session, max_messages=self.max_session_messages):
-            compacted = await compact_messages(session, llm=self._raw_llm)
-            session.clear()
-            session.extend(compacted)
+    def _recent_to_keep(self, session: list[BaseMessage], limit: int = 10) -> int:
+        """Trailing messages to keep verbatim: up to ``limit``, within half the token limit."""
+        budget = self.context.budget.history_tokens // 2
+        keep = 0
+        for message in reversed(session[-limit:]):
+            budget -= self.context.message_tokens(message)
+            if budget < 0:
+                break
+            keep += 1
+        return max(1, keep)
+
+    def _schedule_compaction(self, session_id: str) -> None:
+        if session_id in self._compactions:
+            return
+        task = asyncio.get_running_loop().create_task(self._compact_session(session_id))
+        self._compactions[session_id] = task
+        task.add_done_callback(lambda _: self._compactions.pop(session_id, None))
 
-        return response.content
+    async def _compact_session(self, session_id: str) -> None:
+        """Summarize the head of a session without holding up its turns.
+
+        Turns keep appending while the summary is generated. The result is
+        spliced over the snapshot it was made from, and dropped if that
+        prefix changed in the meantime.
+        """
+        folded_so_far = 0
+
+        async def checkpoint(summary: str, folded: int) -> None:
+            nonlocal folded_so_far
+            await self._sessions.save_summary(session_id, summary, folded - folded_so_far)
+            folded_so_far = folded
+
+        try:
+            async with self._sessions.checkout(session_id, touch=False) as session:
+                snapshot = list(session)
+                compacted = await compact_messages(
+                    snapshot, llm=self._raw_llm,
+                    keep_recent=self._recent_to_keep(snapshot),
+                    truncate=self.context.fit_tool_result,
+                    on_checkpoint=checkpoint,
+                )
+                if len(session) < len(snapshot) or any(
+                    a is not b for a, b in zip(session, snapshot, strict=False)
+                ):
+                    logger.debug("Session %s changed during compaction; skipping", session_id)
+                    return
+                session[:len(snapshot)] = compacted
+                logger.info(
+                    "Compacted session %s from %d to %d messages",
+                    session_id, len(snapshot), len(compacted),
+                )
+        except Exception:
+            logger.exception("Compaction failed for session %s", session_id)
+
+    async def compact_sessions(self, ratio: float = 0.5) -> int:
+        """Compact every resident session over ``ratio`` of its limits.
+
+        Run by the scheduler so busy sessions are summarized before a turn
+        crosses the message or token limit. Returns the number compacted.
+        """
+        due = [
+            session_id for session_id in self._sessions.session_ids()
+            if self._needs_compaction(self._sessions.peek(session_id) or [], ratio)
+        ]
+        for session_id in due:
+            self._schedule_compaction(session_id)
+        await self.drain_compactions()
+        return len(due)
+
+    async def drain_indexing(self) -> None:
+        """Wait for messages still being handed to the vector store."""
+        if self._indexing:
+            await asyncio.gather(*self._indexing, return_exceptions=True)
+
+    async def drain_compactions(self) -> None:
+        """Wait for in-flight background compactions."""
+        if self._compactions:
+            await asyncio.gather(*self._compactions.values(), return_exceptions=True)
@@ -1,16 +1,50 @@
-"""Generic async tool loop for agentic LLM execution."""
+"""Generic async tool loop for agentic LLM execution.
+
+The tool calls in one response run concurrently, at most ``max_concurrency``
+at a time. Each tool may also belong to a concurrency class with its own
+limit: by default anything that touches the local machine (shell, file
+reads and writes, skill creation) runs one call at a time in the order the
+model issued them, while web calls run in parallel. ToolMessages are
+appended in the original call order either way.
+
+With a ``stream`` sink, each LLM call is made with ``astream`` and the
+visible text (``<think>`` and XML tool-call blocks stripped incrementally)
+is forwarded as it arrives. When a streamed response turns out to be a tool
+call turn, the sink is told to ``reset`` and discard that call's text.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
 from collections.abc import Awaitable, Callable
-from typing import Any
+from typing import Any, Protocol
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    ToolMessage,
+    message_chunk_to_message,
+)
 
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from src.agent.context import ContextAssembler
+from src.providers.minimax import normalize_messages
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TOOL_CLASSES = {
+    "shell_exec": "local",
+    "file_read": "local",
+    "file_write": "local",
+    "create_skill": "local",
+    "web_search": "web",
+    "scrape_url": "web",
+    "http_request": "web",
+}
+DEFAULT_CLASS_LIMITS = {"local": 1, "web": 4}
+
 
 def _sanitize_minimax_response(content: str) -> tuple[str, bool]:
     """Strip MiniMax XML artifacts from response content.
@@ -29,6 +63,111 @@ def _sanitize_minimax_response(content: str) -> tuple[str, bool]:
     return cleaned.strip(), had_tool_calls
 
 
+_HIDDEN_BLOCKS = {
+    "<think>": "</think>",
+    "<minimax:tool_call>": "</minimax:tool_call>",
+}
+_LONGEST_TAG = max(len(tag) for tag in _HIDDEN_BLOCKS)
+
+
+def _partial_tag_suffix(text: str) -> int:
+    """Length of the longest suffix of ``text`` that could start a hidden block."""
+    for k in range(min(len(text), _LONGEST_TAG - 1), 0, -1):
+        tail = text[-k:]
+        if any(tag.startswith(tail) for tag in _HIDDEN_BLOCKS):
+            return k
+    return 0
+
+
+class StreamSanitizer:
+    """Incremental ``_sanitize_minimax_response`` for streamed text.
+
+    ``feed`` returns the text that is safe to show so far; anything that
+    might be the start of a hidden block is held back until it's resolved.
+    """
+
+    def __init__(self):
+        self.had_tool_calls = False
+        self._buffer = ""
+        self._closing: str | None = None
+        self._started = False
+
+    def feed(self, text: str) -> str:
+        self._buffer += text
+        out = []
+        while self._buffer:
+            if self._closing is not None:
+                end = self._buffer.find(self._closing)
+                if end == -1:
+                    # Keep just enough to recognise a closing tag split across chunks
+                    self._buffer = self._buffer[-(len(self._closing) - 1):]
+                    break
+                self._buffer = self._buffer[end + len(self._closing):]
+                self._closing = None
+                continue
+
+            opening = [(self._buffer.find(tag), tag) for tag in _HIDDEN_BLOCKS]
+            opening = [(i, tag) for i, tag in opening if i != -1]
+            if opening:
+                i, tag = min(opening)
+                out.append(self._buffer[:i])
+                self._buffer = self._buffer[i + len(tag):]
+                self._closing = _HIDDEN_BLOCKS[tag]
+                if tag == "<minimax:tool_call>":
+                    self.had_tool_calls = True
+                continue
+
+            hold = _partial_tag_suffix(self._buffer)
+            out.append(self._buffer[:len(self._buffer) - hold])
+            self._buffer = self._buffer[len(self._buffer) - hold:]
+            break
+        return self._visible("".join(out))
+
+    def flush(self) -> str:
+        """Return held-back text at the end of the stream."""
+        # An unterminated hidden block is dropped
+        text = "" if self._closing is not None else self._buffer
+        self._buffer = ""
+        return self._visible(text)
+
+    def _visible(self, text: str) -> str:
+        if not self._started:
+            # Like the non-streaming strip(), drop leading whitespace
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+
+class TokenSink(Protocol):
+    async def send(self, text: str) -> None: ...
+
+    async def reset(self) -> None: ...
+
+
+async def stream_response(llm: Any, messages: list[BaseMessage], sink: TokenSink) -> AIMessage:
+    """Make one LLM call with ``astream``, forwarding visible text to ``sink``."""
+    sanitizer = StreamSanitizer()
+    message = None
+    tool_turn = False
+    async for chunk in llm.astream(messages):
+        message = chunk if message is None else message + chunk
+        if getattr(chunk, "tool_call_chunks", None):
+            tool_turn = True
+        text = sanitizer.feed(chunk.content if isinstance(chunk.content, str) else "")
+        if text and not tool_turn:
+            await sink.send(text)
+
+    if tool_turn or sanitizer.had_tool_calls:
+        await sink.reset()
+    else:
+        tail = sanitizer.flush()
+        if tail:
+            await sink.send(tail)
+    if message is None:
+        return AIMessage(content="")
+    return message_chunk_to_message(message)
+
+
 async def run_tool_loop(
     *,
     llm: Any,
@@ -36,6 +175,11 @@ async def run_tool_loop(
     tools: list,
     max_iterations: int = 10,
     on_tool_call: Callable[[str, dict], Awaitable[None]] | None = None,
+    context: ContextAssembler | None = None,
+    max_concurrency: int = 4,
+    tool_classes: dict[str, str] | None = None,
+    class_limits: dict[str, int] | None = None,
+    stream: TokenSink | None = None,
 ) -> AIMessage:
     """Run an LLM-tool execution loop until the model produces a final text response.
 
@@ -45,15 +189,25 @@ async def run_tool_loop(
         tools: List of LangChain @tool functions for execution lookup.
         max_iterations: Safety cap on loop iterations.
         on_tool_call: Optional async callback(tool_name, tool_args) for progress reporting.
+        context: Optional assembler that caps tool results and keeps each
+            call within its token budget.
+        max_concurrency: Most tool calls from one response running at once.
+        tool_classes: Tool name to concurrency class; defaults to DEFAULT_TOOL_CLASSES.
+        class_limits: Concurrency class to its limit; defaults to DEFAULT_CLASS_LIMITS.
+        stream: Optional sink that receives response text as it is generated.
 
     Returns:
         The final AIMessage (with text content, no tool_calls).
     """
     tool_map = {t.name: t for t in tools}
     working_messages = list(messages)
+    tool_classes = DEFAULT_TOOL_CLASSES if tool_classes is None else tool_classes
+    class_limits = DEFAULT_CLASS_LIMITS if class_limits is None else class_limits
 
     for iteration in range(max_iterations):
-        response: AIMessage = await llm.ainvoke(working_messages)
+        if context is not None:
+            working_messages = _fit(context, working_messages)
+        response: AIMessage = await _call_llm(llm, working_messages, stream)
         working_messages.append(response)
 
         if not response.tool_calls:
@@ -77,32 +231,87 @@ async def run_tool_loop(
 
             return response
 
-        for tool_call in response.tool_calls:
-            tool_name = tool_call["name"]
-            tool_args = tool_call["args"]
-            tool_call_id = tool_call.get("id", f"call_{iteration}_{tool_name}")
-
-            if on_tool_call:
-                try:
-                    await on_tool_call(tool_name, tool_args)
-                except Exception:
-                    logger.exception("on_tool_call callback failed")
-
-            if tool_name not in tool_map:
-                available = ", ".join(tool_map.keys())
-                result = f"Error: Unknown tool '{tool_name}'. Available: {available}"
-                logger.warning("LLM requested unknown tool: %s", tool_name)
-            else:
-                try:
-                    result = await tool_map[tool_name].ainvoke(tool_args)
-                except Exception as e:
-                    result = f"Error executing {tool_name}: {e}"
-                    logger.exception("Tool %s failed", tool_name)
+        # Semaphores are per response; asyncio wakes waiters in FIFO order,
+        # so calls in a limit-1 class run in the order they were issued
+        turn_slots = asyncio.Semaphore(max(1, max_concurrency))
+        class_slots = {
+            name: asyncio.Semaphore(max(1, limit)) for name, limit in class_limits.items()
+        }
 
+        results = await asyncio.gather(*(
+            _execute_limited(
+                call, tool_map, on_tool_call,
+                turn_slots, class_slots.get(tool_classes.get(call["name"])),
+            )
+            for call in response.tool_calls
+        ))
+
+        for tool_call, result in zip(response.tool_calls, results, strict=True):
+            tool_call_id = tool_call.get("id", f"call_{iteration}_{tool_call['name']}")
+            content = str(result)
+            if context is not None:
+                content = context.fit_tool_result(content)
             working_messages.append(
-                ToolMessage(content=str(result), tool_call_id=tool_call_id)
+                ToolMessage(content=content, tool_call_id=tool_call_id)
             )
 
     logger.warning("Tool loop hit max iterations (%d), returning partial", max_iterations)
-    final = await llm.ainvoke(working_messages)
+    if context is not None:
+        working_messages = _fit(context, working_messages)
+    final = await _call_llm(llm, working_messages, stream)
     return final
+
+
+def _fit(context: ContextAssembler, messages: list[BaseMessage]) -> list[BaseMessage]:
+    # Dropping old messages can leave an assistant turn first, which breaks
+    # the alternation MiniMax requires
+    return normalize_messages(context.fit(messages))
+
+
+async def _call_llm(llm: Any, messages: list[BaseMessage], stream: TokenSink | None) -> AIMessage:
+    if stream is None:
+        return await llm.ainvoke(messages)
+    return await stream_response(llm, messages, stream)
+
+
+async def _execute_limited(
+    tool_call: dict,
+    tool_map: dict,
+    on_tool_call: Callable[[str, dict], Awaitable[None]] | None,
+    turn_slots: asyncio.Semaphore,
+    class_slots: asyncio.Semaphore | None,
+) -> Any:
+    """Run one tool call once its concurrency class and the turn both have room."""
+    # Class first, so calls queued behind a serial class don't hold turn
+    # slots that other classes could use
+    if class_slots is None:
+        async with turn_slots:
+            return await _execute_tool_call(tool_call, tool_map, on_tool_call)
+    async with class_slots, turn_slots:
+        return await _execute_tool_call(tool_call, tool_map, on_tool_call)
+
+
+async def _execute_tool_call(
+    tool_call: dict,
+    tool_map: dict,
+    on_tool_call: Callable[[str, dict], Awaitable[None]] | None,
+) -> Any:
+    """Run one tool call, turning unknown tools and failures into error text."""
+    tool_name = tool_call["name"]
+    tool_args = tool_call["args"]
+
+    if on_tool_call:
+        try:
+            await on_tool_call(tool_name, tool_args)
+        except Exception:
+            logger.exception("on_tool_call callback failed")
+
+    if tool_name not in tool_map:
+        available = ", ".join(tool_map.keys())
+        logger.warning("LLM requested unknown tool: %s", tool_name)
+        return f"Error: Unknown tool '{tool_name}'. Available: {available}"
+    try:
+        return await tool_map[tool_name].ainvoke(tool_args)
+    except Exception as e:
+        logger.exception("Tool %s failed", tool_name)
+        return f"Error executing {tool_name}: {e}"
@@ -0,0 +1,110 @@
+"""Per-turn tool selection, so each request carries only the schemas it needs.
+
+Binding every tool sends every tool's JSON schema with every LLM call, even
+for small talk. ``ToolSelector`` picks a subset for each turn with a cheap
+keyword classifier:
+
+- tools in ``always`` are always bound;
+- tools with a pattern in ``rules`` are bound when the message matches it;
+- tools the model called in the session's last ``sticky_turns`` turns stay
+  bound, so a follow-up like "now do the same for the other one" keeps its
+  tools. Callers report each turn's calls with ``record``, since sessions
+  only keep the final reply;
+- tools with no rule are always bound, so a newly added tool is never
+  hidden by accident.
+
+The subset is fixed for the whole tool loop of a turn. ``bind`` caches the
+bound LLM per tool set, so the same subset isn't re-bound each turn.
+"""
+
+import logging
+import re
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+_URL = r"https?://|www\.|\b[\w-]+\.(?:com|org|net|io|dev|ai)\b"
+
+DEFAULT_TOOL_RULES = {
+    "web_search": (
+        r"\b(search|look\s*up|google|news|latest|current|recent|today|price|weather|"
+        r"who\s+is|what\s+is|find|research)\b"
+    ),
+    "scrape_url": _URL + r"|\b(page|site|website|article|link|url)\b",
+    "http_request": _URL + r"|\b(api|endpoint|fetch|download|json|http)\b",
+    "file_read": r"[~.]?/\w|\b\w+\.(?:py|md|txt|json|ya?ml|log|csv|toml)\b|"
+                 r"\b(file|read|open|log|config|directory|folder)\b",
+    "file_write": r"\b(file|write|save|edit|create|note|config)\b",
+    "shell_exec": (
+        r"\b(run|execute|command|shell|terminal|install|process|disk|cpu|memory|uptime|"
+        r"service|restart|git|pip|docker|systemctl|script)\b"
+    ),
+    "create_skill": r"\b(skill|automate|reusable|every\s+time|whenever)\b",
+}
+DEFAULT_ALWAYS = frozenset({"dispatch_skill"})
+
+
+class ToolSelector:
+    def __init__(
+        self,
+        *,
+        rules: dict[str, str] | None = None,
+        always: frozenset[str] = DEFAULT_ALWAYS,
+        sticky_turns: int = 3,
+        max_bound: int = 16,
+        max_sessions: int = 1024,
+    ):
+        rules = DEFAULT_TOOL_RULES if rules is None else rules
+        self.rules = {name: re.compile(pattern, re.I) for name, pattern in rules.items()}
+        self.always = always
+        self.sticky_turns = sticky_turns
+        self.max_bound = max_bound
+        self.max_sessions = max_sessions
+        self._bound: OrderedDict[tuple[str, ...], object] = OrderedDict()
+        # session id -> tool names called in each of its recent turns
+        self._recent: OrderedDict[str, deque[frozenset[str]]] = OrderedDict()
+
+    def record(self, session_id: str, used: set[str]) -> None:
+        """Note the tools called during one turn of ``session_id``."""
+        turns = self._recent.get(session_id)
+        if turns is None:
+            turns = self._recent[session_id] = deque(maxlen=self.sticky_turns)
+            if len(self._recent) > self.max_sessions:
+                self._recent.popitem(last=False)
+        else:
+            self._recent.move_to_end(session_id)
+        turns.append(frozenset(used))
+
+    def select(self, tools: list, query: str, session_id: str | None = None) -> list:
+        """The tools to bind for one turn, in their original order."""
+        recent = set()
+        for used in self._recent.get(session_id, ()):
+            recent.update(used)
+
+        selected = []
+        for t in tools:
+            rule = self.rules.get(t.name)
+            if (
+                t.name in self.always
+                or rule is None
+                or t.name in recent
+                or rule.search(query)
+            ):
+                selected.append(t)
+        logger.debug("Selected tools: %s", [t.name for t in selected])
+        return selected
+
+    def bind(self, llm, tools: list):
+        """``llm`` bound to ``tools``, reusing an earlier binding of the same set."""
+        if not tools:
+            return llm
+        key = tuple(t.name for t in tools)
+        bound = self._bound.get(key)
+        if bound is None:
+            bound = llm.bind_tools(tools)
+            self._bound[key] = bound
+            if len(self._bound) > self.max_bound:
+                self._bound.popitem(last=False)
+        else:
+            self._bound.move_to_end(key)
+        return bound
@@ -1,5 +1,6 @@
 """Discord bot client — the gateway between Discord and the agent."""
 
+import asyncio
 import logging
 from pathlib import Path
 from typing import Callable, Awaitable
@@ -7,9 +8,10 @@ from typing import Callable, Awaitable
 import discord
 import yaml
 
-from src.agent.core import LLMProviderError
+from src.agent.core import LLMProviderError, SessionBusyError
 from src.bot.filters import MessageAction, evaluate_message
 from src.bot.formatters import split_message
+from src.bot.streaming import MessageStreamer
 from src.memory.store import MessageStore
 from src.settings import Settings
 
@@ -67,22 +69,37 @@ class AssistantBot(discord.Client):
         if action == MessageAction.IGNORE:
             return
 
-        await self._save_incoming(message)
+        message_id = await self._save_incoming(message)
 
         if action == MessageAction.READ_ONLY:
             logger.debug(f"Read-only message from {message.author}: {message.content[:50]}")
             return
 
-        await self._handle_message(message)
+        await self._handle_message(message, message_id)
 
-    async def _handle_message(self, message: discord.Message):
+    async def _handle_message(
+        self, message: discord.Message, message_id: asyncio.Future | None = None,
+    ):
         if self._agent_callback is None:
             await message.channel.send("I received your message. Agent not yet connected.")
             return
 
+        streamer = None
         try:
             async with message.channel.typing():
-                response = await self._agent_callback(message)
+                if self.settings.stream_responses:
+                    streamer = MessageStreamer(
+                        message.channel, edit_interval=self.settings.stream_edit_seconds,
+                    )
+                    response = await self._agent_callback(
+                        message, stream=streamer, message_id=message_id,
+                    )
+                else:
+                    response = await self._agent_callback(message, message_id=message_id)
+        except SessionBusyError as e:
+            logger.info("Rejected message for a busy session: %s", e)
+            await message.channel.send(str(e))
+            return
         except LLMProviderError as e:
             logger.error("LLM provider error: %s (recoverable=%s)", e, e.recoverable)
             if e.recoverable:
@@ -101,16 +118,29 @@ class AssistantBot(discord.Client):
             )
             return
 
+        if streamer is not None and streamer.started:
+            try:
+                await streamer.finish(response)
+            except Exception:
+                logger.exception("Failed to finish streamed reply; sending it whole")
+                streamer = None
+            else:
+                if response:
+                    await self._save_bot_response(message.channel.id, response)
+                return
+
         if response:
             for chunk in split_message(response):
                 await message.channel.send(chunk)
             await self._save_bot_response(message.channel.id, response)
 
-    async def _save_incoming(self, message: discord.Message):
+    async def _save_incoming(self, message: discord.Message) -> asyncio.Future | None:
+        """Queue the message for the log. Returns a future for its row id."""
         if self._message_store is None:
-            return
+            return None
         try:
-            await self._message_store.save_message(
+            # Write-behind: don't hold on_message for the batch commit
+            return self._message_store.enqueue_message(
                 channel_id=str(message.channel.id),
                 user_id=str(message.author.id),
                 user_name=message.author.display_name,
@@ -120,13 +150,14 @@ class AssistantBot(discord.Client):
             )
         except Exception:
             logger.exception("Failed to save incoming message")
+            return None
 
     async def _save_bot_response(self, channel_id: int, content: str):
         if self._message_store is None:
             return
         try:
             bot_name = self.user.name if self.user else "assistant"
-            await self._message_store.save_message(
+            self._message_store.enqueue_message(
                 channel_id=str(channel_id),
                 user_id=str(self.user.id) if self.user else "0",
                 user_name=bot_name,
@@ -0,0 +1,74 @@
+"""Progressive Discord replies for streamed LLM output.
+
+``MessageStreamer`` is the token sink handed to the agent. The first text
+is posted right away and later text is applied as message edits at most
+once per ``edit_interval`` seconds, which keeps well inside Discord's edit
+rate limit. Text past the 2000-character limit rolls over into follow-up
+messages. ``finish`` then makes the posted messages match the final
+response exactly.
+"""
+
+import logging
+import time
+
+import discord
+
+from src.bot.formatters import split_message
+
+logger = logging.getLogger(__name__)
+
+
+class MessageStreamer:
+    def __init__(self, channel: discord.abc.Messageable, *, edit_interval: float = 1.0):
+        self.channel = channel
+        self.edit_interval = edit_interval
+        self._text = ""
+        self._messages: list[discord.Message] = []
+        self._rendered: list[str] = []
+        self._last_render = 0.0
+
+    @property
+    def started(self) -> bool:
+        """Whether anything has been posted yet."""
+        return bool(self._messages)
+
+    async def send(self, text: str) -> None:
+        self._text += text
+        if time.monotonic() - self._last_render >= self.edit_interval:
+            try:
+                await self._render(self._text)
+            except discord.HTTPException:
+                # finish() will try again with the full text
+                logger.warning("Failed to update streamed reply", exc_info=True)
+
+    async def reset(self) -> None:
+        """Discard text from a response that turned out to be a tool call.
+
+        Messages already posted stay up until the next text replaces them.
+        """
+        self._text = ""
+
+    async def finish(self, final: str) -> None:
+        """Make the posted messages show exactly ``final``."""
+        count = await self._render(final)
+        for message in self._messages[count:]:
+            try:
+                await message.delete()
+            except discord.HTTPException:
+                logger.warning("Failed to delete surplus streamed message")
+        del self._messages[count:]
+        del self._rendered[count:]
+
+    async def _render(self, text: str) -> int:
+        """Show ``text`` in the first messages, posting more as needed. Returns how many."""
+        self._last_render = time.monotonic()
+        chunks = split_message(text) if text.strip() else []
+        for i, chunk in enumerate(chunks):
+            if i < len(self._messages):
+                if self._rendered[i] != chunk:
+                    await self._messages[i].edit(content=chunk)
+                    self._rendered[i] = chunk
+            else:
+                self._messages.append(await self.channel.send(chunk))
+                self._rendered.append(chunk)
+        return len(chunks)
@@ -3,10 +3,17 @@
 import logging
 from pathlib import Path
 
+from apscheduler.triggers.interval import IntervalTrigger
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+from src.agent.context import ContextAssembler, ContextBudget
 from src.agent.core import CoreAgent, LLMProviderError
 from src.agent.router import get_session_id
+from src.agent.tool_selection import ToolSelector
 from src.bot.client import AssistantBot
+from src.memory.hybrid import HybridRetriever
 from src.memory.operational import OperationalMemory
+from src.memory.sessions import SessionStore
 from src.memory.store import MessageStore
 from src.memory.vector import VectorMemory
 from src.monitoring import MonitoringChannel
@@ -14,10 +21,16 @@ from src.providers.minimax import create_llm
 from src.scheduler.heartbeat import HeartbeatRunner
 from src.scheduler.jobs import SchedulerManager
 from src.settings import Settings
-from src.skills.loader import load_manifests
+from src.skills.index import SkillIndex
+from src.skills.loader import ManifestCache
+from src.skills.modules import SkillModuleCache
+from src.skills.pool import SkillWorkerPool
 from src.skills.registry import SkillRegistry
+from src.skills.watcher import SkillWatcher
 from src.soul import load_soul
+from src.tools.cache import ToolResultCache
 from src.tools.files import file_read, file_write
+from src.tools.http import HttpClients, set_http_clients
 from src.tools.shell import shell_exec
 from src.tools.skill_author import create_skill_author_tool
 from src.tools.skill_dispatch import create_dispatch_skill_tool
@@ -39,7 +52,11 @@ def create_app() -> AssistantBot:
 
     llm = create_llm(settings)
 
-    vector_memory = VectorMemory(persist_dir=settings.data_dir / "vectors")
+    vector_memory = VectorMemory(
+        persist_dir=settings.data_dir / "vectors",
+        batch_size=settings.vector_batch_size,
+        flush_interval=settings.vector_flush_seconds,
+    )
     logger.info("Vector memory initialized at %s", settings.data_dir / "vectors")
 
     operational_memory = OperationalMemory(memory_dir=settings.memory_dir)
@@ -47,21 +64,62 @@ def create_app() -> AssistantBot:
     logger.info("Operational memory initialized at %s", settings.memory_dir)
 
     # Skill registry — load builtins and user skills
-    registry = SkillRegistry()
+    # Parsed manifests are cached on disk so unchanged skills aren't re-parsed
+    registry = SkillRegistry(ManifestCache(settings.data_dir / "skill_manifests.json"))
     builtin_dir = Path(__file__).parent / "skills" / "builtin"
-    for manifest in load_manifests(builtin_dir):
-        registry.register(manifest)
-        logger.info("Registered builtin skill: %s", manifest.name)
-    for manifest in load_manifests(settings.skills_dir):
-        registry.register(manifest)
-        logger.info("Registered user skill: %s", manifest.name)
+    registry.sync(builtin_dir, settings.skills_dir)
+    logger.info("Registered %d skills", len(registry.all_skills()))
+    skill_watcher = SkillWatcher(
+        registry, [builtin_dir, settings.skills_dir],
+        poll_interval=settings.skill_watch_seconds,
+    )
+
+    # One pooled HTTP session and Firecrawl client for every web tool call
+    http_clients = HttpClients(
+        firecrawl_api_key=(
+            settings.firecrawl_api_key.get_secret_value()
+            if settings.firecrawl_api_key is not None else None
+        ),
+        limit=settings.http_pool_limit,
+        limit_per_host=settings.http_per_host_limit,
+    )
+    set_http_clients(http_clients)
 
     # Core tools available to the agent
     base_tools = [web_search, scrape_url, http_request, shell_exec, file_read, file_write]
 
+    # Cache web results across sessions and sub-agents; the dispatch tool gets
+    # the wrapped tools too, so skills share the cache
+    tool_cache = ToolResultCache(
+        settings.data_dir / "tool_cache.sqlite",
+        max_bytes=settings.tool_cache_mb * 1024 * 1024,
+    )
+    base_tools = tool_cache.wrap(base_tools)
+
+    # Only the skills relevant to each message go into the prompt
+    skill_index = None
+    if settings.skill_index_top_k > 0:
+        skill_index = SkillIndex(
+            registry, DefaultEmbeddingFunction(), top_k=settings.skill_index_top_k,
+        )
+
     # Skill dispatch meta-tool
+    # Dynamic skills run out of process so a slow one can't block the loop
+    skill_bytecode_dir = settings.data_dir / "skill_bytecode"
+    skill_workers = None
+    if settings.skill_workers > 0:
+        skill_workers = SkillWorkerPool(
+            settings.skill_workers,
+            timeout=settings.skill_timeout_seconds,
+            max_memory_mb=settings.skill_memory_mb,
+            max_calls=settings.skill_worker_max_calls,
+            bytecode_dir=skill_bytecode_dir,
+        )
     dispatch_tool = create_dispatch_skill_tool(
         registry=registry, llm=llm, available_tools=base_tools,
+        module_cache=SkillModuleCache(skill_bytecode_dir),
+        workers=skill_workers,
+        skill_index=skill_index,
     )
 
     # Skill authoring tool — lets the agent create new skills
@@ -71,17 +129,41 @@ def create_app() -> AssistantBot:
 
     tools = base_tools + [dispatch_tool, author_tool]
 
+    message_store = MessageStore(
+        settings.data_dir / "messages.sqlite",
+        batch_size=settings.message_store_batch_size,
+        flush_interval_ms=settings.message_store_flush_ms,
+        wal=settings.message_store_wal,
+        read_pool_size=settings.message_store_read_pool,
+    )
+
+    # Conversation state, spilled to disk on eviction and at shutdown
+    session_store = SessionStore(
+        settings.data_dir / "checkpoints.sqlite",
+        max_sessions=settings.session_max_resident,
+        max_messages=settings.session_max_messages,
+        ttl_seconds=settings.session_ttl_seconds,
+    )
+
     agent = CoreAgent(
         llm=llm,
         system_prompt=system_prompt,
+        soul_path=settings.soul_path,
         vector_memory=vector_memory,
         operational_memory=operational_memory,
         tools=tools,
         skill_registry=registry,
+        skill_index=skill_index,
+        tool_selector=ToolSelector() if settings.tool_selection else None,
+        retriever=HybridRetriever(vector_memory, message_store),
+        max_queued_messages=settings.agent_max_queued_messages,
+        session_store=session_store,
+        context=ContextAssembler(ContextBudget(
+            max_tokens=settings.context_max_tokens,
+            history_tokens=settings.context_history_tokens,
+        )),
     )
 
-    message_store = MessageStore(settings.data_dir / "messages.sqlite")
-
     bot = AssistantBot(
         settings=settings,
         agent_callback=None,  # set below after we have monitoring
@@ -102,12 +184,16 @@ def create_app() -> AssistantBot:
     )
 
     # Agent callback — records errors to heartbeat
-    async def agent_callback(message) -> str:
+    async def agent_callback(message, stream=None, message_id=None) -> str:
         try:
             return await agent.invoke(
                 session_id=get_session_id(message),
                 user_message=message.content,
                 user_name=message.author.display_name,
+                stream=stream,
+                message_id=message_id,
+                channel_id=str(message.channel.id),
+                user_id=str(message.author.id),
             )
         except LLMProviderError as e:
             heartbeat.record_error(str(e))
@@ -119,6 +205,17 @@ def create_app() -> AssistantBot:
     scheduler = SchedulerManager()
     scheduler.setup_default_jobs(
         heartbeat_fn=heartbeat.run,
+        compaction_fn=agent.compact_sessions,
+    )
+
+    async def report_tool_cache():
+        await tool_cache.purge_expired()
+        await monitoring.post_tool_cache_report(tool_cache.report())
+
+    scheduler.register_job(
+        "tool_cache_report",
+        report_tool_cache,
+        IntervalTrigger(hours=settings.tool_cache_report_hours),
     )
 
     # Hook into bot lifecycle
@@ -126,6 +223,12 @@ def create_app() -> AssistantBot:
 
     async def on_ready_with_infra():
         await original_on_ready()
+        await session_store.initialize()
+        await tool_cache.initialize()
+        if skill_workers is not None:
+            await skill_workers.start()
+        if settings.skill_watch_seconds > 0:
+            skill_watcher.start()
         await monitoring.initialize()
         scheduler.start()
         await monitoring.post_startup()
@@ -139,6 +242,20 @@ def create_app() -> AssistantBot:
         scheduler.stop()
         await monitoring.post_shutdown()
         logger.info("Scheduler stopped")
+        # Indexing waits on message log row ids, so commit those first
+        await message_store.flush()
+        await agent.drain_indexing()
+        await vector_memory.drain()
+        vector_memory.close()
+        logger.info("Vector memory drained")
+        await agent.drain_compactions()
+        await session_store.close()
+        await tool_cache.close()
+        await http_clients.close()
+        await skill_watcher.stop()
+        if skill_workers is not None:
+            await skill_workers.close()
+        logger.info("Sessions saved")
         await original_close()
 
     bot.close = close_with_infra
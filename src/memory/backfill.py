@@ -0,0 +1,199 @@
+"""Backfill the SQLite message log into vector memory.
+
+Only messages that pass through ``CoreAgent.invoke`` are indexed live, so
+read-only channel traffic never reaches the vector store. This pipeline
+streams ``messages.sqlite`` in id order and embeds pages of rows. With
+``workers > 0`` the embedding runs across a process pool. Rows are
+upserted with deterministic ``msg-<row id>`` ids, the same ids the agent
+indexes logged messages under, so rows already indexed live are replaced
+rather than duplicated. The last indexed row id
+is checkpointed after every page, so an interrupted run resumes where it
+stopped and re-runs only index new rows.
+
+Run with the bot stopped, because Chroma's persistent client is not safe to
+share between processes::
+
+    python -m src.memory.backfill [--batch-size N] [--workers N] [--reset]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.memory.store import MessageStore
+from src.memory.vector import VectorMemory
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = "backfill-checkpoint.json"
+
+
+@dataclass
+class BackfillResult:
+    indexed: int
+    last_id: int
+
+
+def message_doc_id(row_id: int) -> str:
+    return f"msg-{row_id}"
+
+
+def _message_document(message: dict) -> tuple[str, dict]:
+    """Format a stored message the way the agent indexes live messages."""
+    text = f"[{message['user_name']}]: {message['content']}"
+    metadata = {
+        "message_id": message["id"],
+        "channel_id": message["channel_id"],
+        "user_id": message["user_id"],
+        "user_name": message["user_name"],
+        "is_bot": message["is_bot"],
+        "timestamp_us": message["timestamp_us"],
+    }
+    # Chroma rejects None metadata values
+    if message["bot_name"]:
+        metadata["bot_name"] = message["bot_name"]
+    return text, metadata
+
+
+def read_checkpoint(path: Path) -> int:
+    if not path.exists():
+        return 0
+    try:
+        return int(json.loads(path.read_text())["last_id"])
+    except (ValueError, KeyError, json.JSONDecodeError):
+        logger.warning("Ignoring unreadable backfill checkpoint %s", path)
+        return 0
+
+
+def write_checkpoint(path: Path, last_id: int) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"last_id": last_id}))
+    os.replace(tmp, path)
+
+
+# Process-pool workers build their own embedder once and reuse it per chunk
+_worker_embedder = None
+
+
+def _init_worker(embedding_factory: Callable) -> None:
+    global _worker_embedder
+    _worker_embedder = embedding_factory()
+
+
+def _embed_chunk(texts: list[str]) -> list[list[float]]:
+    return [[float(x) for x in vector] for vector in _worker_embedder(texts)]
+
+
+def _default_embedding_factory():
+    from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+    return DefaultEmbeddingFunction()
+
+
+async def backfill_vectors(
+    store: MessageStore,
+    vector_memory: VectorMemory,
+    *,
+    checkpoint_path: Path,
+    batch_size: int = 256,
+    workers: int = 0,
+    embedding_factory: Callable | None = None,
+) -> BackfillResult:
+    """Index every message after the checkpoint into vector memory.
+
+    With ``workers == 0`` the collection's own embedder runs on the vector
+    memory's executor. Otherwise each page is split into ``batch_size``
+    chunks that are embedded in parallel, one per worker process.
+    ``embedding_factory`` must be a picklable zero-argument callable that
+    returns an embedder matching the collection's.
+    """
+    last_id = read_checkpoint(checkpoint_path)
+    indexed = 0
+    pool = None
+    if workers > 0:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            # Spawn, because forking a process that has Chroma's threads running is unsafe
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(embedding_factory or _default_embedding_factory,),
+        )
+
+    try:
+        loop = asyncio.get_running_loop()
+        page_size = batch_size * max(1, workers)
+        async for page in store.iter_messages(after_id=last_id, batch_size=page_size):
+            docs = [(m["id"], *_message_document(m)) for m in page if m["content"].strip()]
+            if docs:
+                ids = [message_doc_id(row_id) for row_id, _, _ in docs]
+                texts = [text for _, text, _ in docs]
+                metadatas = [metadata for _, _, metadata in docs]
+                embeddings = None
+                if pool is not None:
+                    chunks = await asyncio.gather(*(
+                        loop.run_in_executor(pool, _embed_chunk, texts[i:i + batch_size])
+                        for i in range(0, len(texts), batch_size)
+                    ))
+                    embeddings = [vector for chunk in chunks for vector in chunk]
+                await vector_memory.aadd_many(
+                    texts=texts, metadatas=metadatas, ids=ids, embeddings=embeddings,
+                )
+                indexed += len(docs)
+
+            last_id = page[-1]["id"]
+            write_checkpoint(checkpoint_path, last_id)
+            logger.info("Backfilled through message %d (%d indexed this run)", last_id, indexed)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return BackfillResult(indexed=indexed, last_id=last_id)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from src.settings import Settings
+
+    settings = Settings()
+    vector_dir = settings.data_dir / "vectors"
+    checkpoint_path = vector_dir / CHECKPOINT_NAME
+    if args.reset:
+        checkpoint_path.unlink(missing_ok=True)
+
+    store = MessageStore(settings.data_dir / "messages.sqlite")
+    await store.initialize()
+    vector_memory = VectorMemory(persist_dir=vector_dir)
+    try:
+        result = await backfill_vectors(
+            store, vector_memory,
+            checkpoint_path=checkpoint_path,
+            batch_size=args.batch_size,
+            workers=args.workers,
+        )
+    finally:
+        vector_memory.close()
+        await store.close()
+    logger.info(
+        "Backfill complete: %d messages indexed, cursor at %d", result.indexed, result.last_id,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the message log into vector memory")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--reset", action="store_true", help="start again from the first message")
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
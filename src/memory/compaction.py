@@ -1,8 +1,31 @@
-"""Context compaction — summarize old messages when approaching limits."""
+"""Context compaction — summarize old messages when approaching limits.
+
+Summaries are rolling: when a session already starts with a summary, only
+the messages that aged out since then are folded into it. Long deltas are
+folded in chunks of at most ``chunk_chars``, and the running summary is
+capped at ``max_summary_chars``, so every summarization prompt has a fixed
+upper size however long the conversation runs. ``on_checkpoint`` is called
+after each chunk so callers can persist intermediate summaries.
+"""
+
+from collections.abc import Awaitable, Callable
 
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 
+SUMMARY_PREFIX = "[Conversation summary]: "
+
+_SUMMARIZE_PROMPT = (
+    "Summarize the following conversation concisely, preserving key facts, decisions, "
+    "and context that would be needed to continue the conversation."
+)
+_UPDATE_PROMPT = (
+    "Summarize the conversation by updating the running summary with the new messages. "
+    "Preserve key facts, decisions, and context that would be needed to continue the "
+    "conversation, drop details that no longer matter, and reply with the updated "
+    "summary only, in at most {max_words} words."
+)
+
 
 def should_compact(messages: list[BaseMessage], *, max_messages: int = 50) -> bool:
     """Check if the message list needs compaction."""
@@ -10,34 +33,100 @@ def should_compact(messages: list[BaseMessage], *, max_messages: int = 50) -> bo
     return len(non_system) > max_messages
 
 
+def is_summary(message: BaseMessage) -> bool:
+    return isinstance(message, HumanMessage) and str(message.content).startswith(SUMMARY_PREFIX)
+
+
+def _chunks(lines: list[str], max_chars: int) -> list[list[str]]:
+    chunks: list[list[str]] = []
+    size = 0
+    for line in lines:
+        if chunks and size + len(line) <= max_chars:
+            chunks[-1].append(line)
+            size += len(line)
+        else:
+            chunks.append([line])
+            size = len(line)
+    return chunks
+
+
+async def summarize_incremental(
+    previous: str | None,
+    messages: list[BaseMessage],
+    *,
+    llm: ChatOpenAI,
+    truncate: Callable[[str], str] | None = None,
+    chunk_chars: int = 24_000,
+    max_summary_chars: int = 6_000,
+    on_checkpoint: Callable[[str, int], Awaitable[None]] | None = None,
+) -> str:
+    """Fold ``messages`` into the ``previous`` summary and return the new one.
+
+    ``on_checkpoint(summary, folded)`` runs after each chunk with the number
+    of messages folded in so far.
+    """
+    lines = []
+    for m in messages:
+        content = str(m.content)
+        # Keep any single message within a chunk
+        content = truncate(content) if truncate else content
+        lines.append(f"{type(m).__name__}: {content[:chunk_chars]}")
+
+    summary = previous
+    folded = 0
+    for chunk in _chunks(lines, chunk_chars):
+        if summary is None:
+            prompt = [
+                SystemMessage(content=_SUMMARIZE_PROMPT),
+                HumanMessage(content="\n".join(chunk)),
+            ]
+        else:
+            prompt = [
+                SystemMessage(content=_UPDATE_PROMPT.format(max_words=max_summary_chars // 6)),
+                HumanMessage(content=(
+                    f"Running summary:\n{summary}\n\nNew messages:\n" + "\n".join(chunk)
+                )),
+            ]
+        response = await llm.ainvoke(prompt)
+        summary = str(response.content)[:max_summary_chars]
+        folded += len(chunk)
+        if on_checkpoint is not None:
+            await on_checkpoint(summary, folded)
+    return summary or ""
+
+
 async def compact_messages(
     messages: list[BaseMessage],
     *,
     llm: ChatOpenAI,
     keep_recent: int = 10,
+    truncate: Callable[[str], str] | None = None,
+    on_checkpoint: Callable[[str, int], Awaitable[None]] | None = None,
 ) -> list[BaseMessage]:
-    """Compact old messages into a summary, keeping recent ones intact."""
+    """Compact old messages into a summary, keeping recent ones intact.
+
+    A leading summary from an earlier compaction is extended with just the
+    messages after it rather than summarized again. ``truncate`` shortens
+    each old message before it goes into the summarization prompt, so one
+    huge paste can't blow up that call.
+    """
+    keep_recent = max(1, keep_recent)
     if len(messages) <= keep_recent:
         return messages
 
     old_messages = messages[:-keep_recent]
     recent_messages = messages[-keep_recent:]
 
-    conversation_text = "\n".join(
-        f"{type(m).__name__}: {m.content}" for m in old_messages
-    )
-
-    summary_prompt = [
-        SystemMessage(
-            content="Summarize the following conversation concisely, preserving key facts, decisions, and context that would be needed to continue the conversation."
-        ),
-        HumanMessage(content=conversation_text),
-    ]
-
-    response = await llm.ainvoke(summary_prompt)
+    previous = None
+    if is_summary(old_messages[0]):
+        previous = str(old_messages[0].content)[len(SUMMARY_PREFIX):]
+        old_messages = old_messages[1:]
+    if not old_messages:
+        return messages
 
-    summary_msg = HumanMessage(
-        content=f"[Conversation summary]: {response.content}"
+    summary = await summarize_incremental(
+        previous, old_messages, llm=llm, truncate=truncate, on_checkpoint=on_checkpoint,
     )
+    summary_msg = HumanMessage(content=f"{SUMMARY_PREFIX}{summary}")
 
     return [summary_msg] + recent_messages
@@ -0,0 +1,166 @@
+"""Hybrid retrieval — vector similarity fused with message-log BM25.
+
+Semantic candidates come from ``VectorMemory`` and keyword candidates from
+the FTS5 index in ``MessageStore``. The two ranked lists are merged with
+weighted reciprocal-rank fusion (~70% semantic / 30% keyword by default,
+per the design doc). The fused score is then scaled by an exponential
+recency decay. Both sides honour the same session/user/channel filters.
+
+A session filter is turned into the channel or user it covers (see
+``session_scope``). The agent's live indexing and the backfill both write
+``channel_id``, ``user_id`` and ``user_name`` metadata, so every vector
+document can be matched that way.
+"""
+
+import asyncio
+import logging
+import math
+import time
+
+from src.memory.store import MessageStore
+from src.memory.vector import VectorMemory
+
+logger = logging.getLogger(__name__)
+
+DAY_US = 86_400 * 1_000_000
+
+
+def session_scope(session_id: str | None) -> tuple[str | None, str | None]:
+    """The ``(channel_id, user_id)`` a session covers.
+
+    Session ids are ``channel-<channel id>`` or ``dm-<user id>``, see agent.router.
+    """
+    kind, _, ident = (session_id or "").partition("-")
+    if kind == "channel" and ident:
+        return ident, None
+    if kind == "dm" and ident:
+        return None, ident
+    return None, None
+
+
+class HybridRetriever:
+    def __init__(
+        self,
+        vector_memory: VectorMemory,
+        message_store: MessageStore | None = None,
+        *,
+        semantic_weight: float = 0.7,
+        keyword_weight: float = 0.3,
+        recency_weight: float = 0.3,
+        half_life_days: float = 30.0,
+        rrf_k: int = 60,
+        candidates: int = 4,
+    ):
+        self.vector_memory = vector_memory
+        self.message_store = message_store
+        self.semantic_weight = semantic_weight
+        self.keyword_weight = keyword_weight
+        self.recency_weight = recency_weight
+        self.half_life_days = half_life_days
+        self.rrf_k = rrf_k
+        # Each side fetches k * candidates results before fusion
+        self.candidates = candidates
+
+    async def search(
+        self,
+        query: str,
+        *,
+        k: int = 5,
+        session_id: str | None = None,
+        user_name: str | None = None,
+        channel_id: str | None = None,
+        exclude_text: str | None = None,
+    ) -> list[dict]:
+        """Return the top ``k`` fused results as ``{"text", "metadata", "score"}``.
+
+        ``exclude_text`` drops keyword hits whose content equals it, so the
+        message being answered (already in the log) isn't returned as context.
+        """
+        fetch = k * self.candidates
+        scope_channel, user_id = session_scope(session_id)
+        channel_id = channel_id or scope_channel
+        semantic, keyword = await asyncio.gather(
+            self._semantic(query, fetch, user_id, user_name, channel_id),
+            self._keyword(query, fetch, user_id, user_name, channel_id, exclude_text),
+        )
+        now_us = time.time_ns() // 1000
+
+        fused: dict[str, dict] = {}
+        for weight, ranked in ((self.semantic_weight, semantic), (self.keyword_weight, keyword)):
+            for rank, item in enumerate(ranked, start=1):
+                entry = fused.setdefault(item["text"], {**item, "score": 0.0})
+                entry["score"] += weight / (self.rrf_k + rank)
+
+        for entry in fused.values():
+            entry["score"] *= self._recency_factor(entry["metadata"], now_us)
+
+        ranked = sorted(fused.values(), key=lambda e: e["score"], reverse=True)
+        return ranked[:k]
+
+    def _recency_factor(self, metadata: dict, now_us: int) -> float:
+        """Blend of 1.0 and an exponential decay by age.
+
+        Items without a timestamp get no recency boost.
+        """
+        ts = metadata.get("timestamp_us")
+        decay = 0.0
+        if isinstance(ts, (int, float)) and self.half_life_days > 0:
+            age_days = max(0, now_us - ts) / DAY_US
+            decay = math.pow(0.5, age_days / self.half_life_days)
+        return (1 - self.recency_weight) + self.recency_weight * decay
+
+    async def _semantic(self, query, fetch, user_id, user_name, channel_id) -> list[dict]:
+        clauses = [
+            {key: value}
+            for key, value in (
+                ("user_id", user_id),
+                ("user_name", user_name),
+                ("channel_id", channel_id),
+            )
+            if value is not None
+        ]
+        where = None
+        if len(clauses) == 1:
+            where = clauses[0]
+        elif clauses:
+            where = {"$and": clauses}
+        try:
+            results = await self.vector_memory.asearch(query, k=fetch, where=where)
+        except Exception:
+            logger.exception("Semantic retrieval failed")
+            return []
+        return [{"text": r["text"], "metadata": r["metadata"]} for r in results]
+
+    async def _keyword(
+        self, query, fetch, user_id, user_name, channel_id, exclude_text,
+    ) -> list[dict]:
+        if self.message_store is None:
+            return []
+        try:
+            rows = await self.message_store.search_messages(
+                query=query, limit=fetch, channel_id=channel_id, match_any=True,
+            )
+        except Exception:
+            logger.exception("Keyword retrieval failed")
+            return []
+
+        results = []
+        for row in rows:
+            if exclude_text is not None and row["content"] == exclude_text:
+                continue
+            if user_name is not None and row["user_name"] != user_name:
+                continue
+            if user_id is not None and row["user_id"] != user_id:
+                continue
+            results.append({
+                # Same format the agent and the backfill index, so hits fuse by text
+                "text": f"[{row['user_name']}]: {row['content']}",
+                "metadata": {
+                    "message_id": row["id"],
+                    "channel_id": row["channel_id"],
+                    "user_id": row["user_id"],
+                    "user_name": row["user_name"],
+                    "timestamp_us": row["timestamp_us"],
+                },
+            })
+        return results
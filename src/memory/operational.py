@@ -15,6 +15,13 @@ class OperationalMemory:
         self.safety_rules_path = memory_dir / "safety-rules.md"
         self.preferences_path = memory_dir / "preferences.md"
         self.operational_notes_path = memory_dir / "operational-notes.md"
+        # Bumped on every in-process write so prompt caches can invalidate
+        # without touching the disk
+        self.version = 0
+
+    @property
+    def paths(self) -> list[Path]:
+        return [self.safety_rules_path, self.preferences_path, self.operational_notes_path]
 
     def initialize(self):
         self.memory_dir.mkdir(parents=True, exist_ok=True)
@@ -30,16 +37,19 @@ class OperationalMemory:
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
         with open(self.safety_rules_path, "a") as f:
             f.write(f"- [{timestamp}] {rule}\n")
+        self.version += 1
 
     def update_preference(self, key: str, value: str):
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
         with open(self.preferences_path, "a") as f:
             f.write(f"- **{key}** [{timestamp}]: {value}\n")
+        self.version += 1
 
     def add_operational_note(self, note: str):
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
         with open(self.operational_notes_path, "a") as f:
             f.write(f"- [{timestamp}] {note}\n")
+        self.version += 1
 
     def read_all(self) -> dict[str, str]:
         result = {}
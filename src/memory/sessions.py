@@ -0,0 +1,243 @@
+"""Bounded session store with SQLite spill.
+
+``CoreAgent`` keeps each session's message list here. Resident sessions are
+held in LRU order and evicted once there are more than ``max_sessions`` of
+them, more than ``max_messages`` messages across all of them, or a session
+has been idle for ``ttl_seconds``. With a ``db_path`` an evicted session is
+serialized to SQLite and restored the next time it is checked out, and
+``close`` spills every resident session so conversations survive a
+restart. Without one, evicted sessions are dropped.
+
+The database also keeps every rolling summary compaction produces for a
+session (``save_summary``), as checkpoints of what was folded away.
+
+A session is checked out for the length of a turn and is never evicted
+while checked out.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import aiosqlite
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionStats:
+    evicted: int = 0
+    restored: int = 0
+
+
+class SessionStore:
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        *,
+        max_sessions: int = 256,
+        max_messages: int = 10_000,
+        ttl_seconds: float = 6 * 3600,
+    ):
+        self.db_path = db_path
+        self.max_sessions = max(1, max_sessions)
+        self.max_messages = max_messages
+        self.ttl_seconds = ttl_seconds
+        self.stats = SessionStats()
+        self._db: aiosqlite.Connection | None = None
+        self._sessions: OrderedDict[str, list[BaseMessage]] = OrderedDict()
+        self._last_used: dict[str, float] = {}
+        self._checked_out: dict[str, int] = {}
+        # Evicted sessions whose spill write hasn't finished yet
+        self._spilling: dict[str, list[BaseMessage]] = {}
+
+    async def initialize(self) -> None:
+        if self.db_path is None or self._db is not None:
+            return
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = await aiosqlite.connect(self.db_path)
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                messages TEXT NOT NULL,
+                updated_at INTEGER NOT NULL
+            )
+        """)
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                summary TEXT NOT NULL,
+                messages INTEGER NOT NULL,
+                created_at INTEGER NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            )
+        """)
+        await self._db.commit()
+
+    async def close(self) -> None:
+        """Spill every resident session and close the database."""
+        if self._db is None:
+            return
+        await self._spill(list(self._sessions.items()))
+        await self._db.close()
+        self._db = None
+
+    @property
+    def resident_sessions(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def resident_messages(self) -> int:
+        return sum(len(messages) for messages in self._sessions.values())
+
+    def session_ids(self) -> list[str]:
+        """Ids of resident sessions, least recently used first."""
+        return list(self._sessions)
+
+    def get(self, session_id: str) -> list[BaseMessage]:
+        """Return the resident message list, creating an empty one.
+
+        Does not look at disk; use ``checkout`` for a session that may have
+        been evicted.
+        """
+        if session_id not in self._sessions:
+            self._sessions[session_id] = []
+        self._touch(session_id)
+        return self._sessions[session_id]
+
+    def peek(self, session_id: str) -> list[BaseMessage] | None:
+        """The resident message list, or None, without counting as a use."""
+        return self._sessions.get(session_id)
+
+    @asynccontextmanager
+    async def checkout(
+        self, session_id: str, *, touch: bool = True,
+    ) -> AsyncIterator[list[BaseMessage]]:
+        """Hold a session resident (restoring it if needed) for a turn.
+
+        The list may be mutated in place. Limits are enforced on exit.
+        Background work passes ``touch=False`` so it doesn't refresh the
+        session's LRU position or idle timer.
+        """
+        self._checked_out[session_id] = self._checked_out.get(session_id, 0) + 1
+        try:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = await self._restore(session_id)
+            if touch or session_id not in self._last_used:
+                self._touch(session_id)
+            yield session
+        finally:
+            remaining = self._checked_out[session_id] - 1
+            if remaining:
+                self._checked_out[session_id] = remaining
+            else:
+                del self._checked_out[session_id]
+            if touch and session_id in self._sessions:
+                self._touch(session_id)
+            await self.enforce_limits()
+
+    async def enforce_limits(self) -> int:
+        """Evict idle and least recently used sessions. Returns how many."""
+        now = time.monotonic()
+        count = len(self._sessions)
+        total = self.resident_messages
+        victims = []
+        # Oldest first, so idle sessions are always at the front
+        for session_id, messages in self._sessions.items():
+            over = count > self.max_sessions or total > self.max_messages
+            idle = now - self._last_used[session_id] > self.ttl_seconds
+            if not (over or idle):
+                break
+            if session_id in self._checked_out:
+                continue
+            victims.append((session_id, messages))
+            count -= 1
+            total -= len(messages)
+
+        if not victims:
+            return 0
+        for session_id, messages in victims:
+            del self._sessions[session_id]
+            del self._last_used[session_id]
+            self._spilling[session_id] = messages
+        self.stats.evicted += len(victims)
+        logger.debug("Evicting %d sessions", len(victims))
+        try:
+            await self._spill(victims)
+        finally:
+            for session_id, messages in victims:
+                if self._spilling.get(session_id) is messages:
+                    del self._spilling[session_id]
+        return len(victims)
+
+    async def save_summary(self, session_id: str, summary: str, messages: int) -> None:
+        """Checkpoint a rolling summary that folded in ``messages`` more messages."""
+        if self._db is None:
+            return
+        await self._db.execute(
+            """INSERT INTO summaries (session_id, seq, summary, messages, created_at)
+               SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ?
+               FROM summaries WHERE session_id = ?""",
+            (session_id, summary, messages, time.time_ns() // 1000, session_id),
+        )
+        await self._db.commit()
+
+    async def summaries(self, session_id: str) -> list[dict]:
+        """Summary checkpoints for a session, oldest first."""
+        if self._db is None:
+            return []
+        cursor = await self._db.execute(
+            "SELECT seq, summary, messages, created_at FROM summaries "
+            "WHERE session_id = ? ORDER BY seq",
+            (session_id,),
+        )
+        return [
+            {"seq": seq, "summary": summary, "messages": messages, "created_at_us": created}
+            for seq, summary, messages, created in await cursor.fetchall()
+        ]
+
+    def _touch(self, session_id: str) -> None:
+        self._sessions.move_to_end(session_id)
+        self._last_used[session_id] = time.monotonic()
+
+    async def _restore(self, session_id: str) -> list[BaseMessage]:
+        messages = self._spilling.get(session_id)
+        if messages is None and self._db is not None:
+            cursor = await self._db.execute(
+                "SELECT messages FROM sessions WHERE session_id = ?", (session_id,),
+            )
+            row = await cursor.fetchone()
+            if row is not None:
+                messages = messages_from_dict(json.loads(row[0]))
+                self.stats.restored += 1
+        # A concurrent checkout may have restored it while we were reading
+        return self._sessions.setdefault(session_id, messages or [])
+
+    async def _spill(self, sessions: list[tuple[str, list[BaseMessage]]]) -> None:
+        if self._db is None or not sessions:
+            return
+        now_us = time.time_ns() // 1000
+        rows = [
+            (session_id, json.dumps(messages_to_dict(messages)), now_us)
+            for session_id, messages in sessions
+        ]
+        try:
+            await self._db.executemany(
+                "INSERT OR REPLACE INTO sessions (session_id, messages, updated_at) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+            await self._db.commit()
+        except Exception:
+            logger.exception("Failed to spill %d sessions; keeping them in memory", len(rows))
+            for session_id, messages in sessions:
+                self._sessions.setdefault(session_id, messages)
+                self._last_used.setdefault(session_id, time.monotonic())
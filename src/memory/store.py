@@ -1,20 +1,103 @@
-"""SQLite message log — full history, never deleted."""
+"""SQLite message log — full history, never deleted.
 
-from datetime import datetime, timezone
+Writes go through a write-behind queue: ``enqueue_message`` appends a row to
+an in-memory batch and returns a future for its row id. The batch is
+committed as a single transaction once it reaches ``batch_size`` rows or
+``flush_interval_ms`` after the first pending row, whichever comes first.
+``save_message`` is the awaitable form for callers that need the id. Reads
+flush pending writes first, so callers always see their own messages.
+
+With ``wal=True`` the database runs in WAL journal mode with tuned pragmas,
+and ``read_pool_size`` read-only connections serve ``get_messages`` and
+``search_messages`` so history lookups don't queue behind inserts on the
+writer connection's worker thread.
+
+Keyword search runs against ``messages_fts``, an FTS5 index over
+``messages.content`` kept in sync by triggers. Schema changes are versioned
+with ``PRAGMA user_version`` and applied once by ``initialize``. Each
+migration runs in one transaction together with its version bump, so an
+interrupted migration leaves the previous schema intact.
+
+Timestamps are stored as integer microseconds since the Unix epoch and
+returned as ISO strings (plus ``timestamp_us``). Channel history pages by
+row id (``before_id`` / ``after_id``) rather than OFFSET, so every page is an
+index seek on ``(channel_id, id)`` regardless of how far back it is.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
 import aiosqlite
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_CACHE_SIZE_KIB = 64 * 1024
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+_INSERT_SQL = """INSERT INTO messages
+               (timestamp, channel_id, user_id, user_name, content, is_bot, bot_name)
+               VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+
+@dataclass
+class WriteStats:
+    """Counters for the write-behind queue, used to measure batching gains."""
+
+    rows: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    flush_seconds: float = 0.0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.rows / self.batches if self.batches else 0.0
+
 
 class MessageStore:
-    def __init__(self, db_path: Path):
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        batch_size: int = 32,
+        flush_interval_ms: float = 50,
+        wal: bool = False,
+        read_pool_size: int = 0,
+        mmap_size: int = DEFAULT_MMAP_SIZE,
+        cache_size_kib: int = DEFAULT_CACHE_SIZE_KIB,
+    ):
         self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval_ms) / 1000
+        self.wal = wal
+        self.read_pool_size = max(0, read_pool_size)
+        self.mmap_size = mmap_size
+        self.cache_size_kib = cache_size_kib
+        self.stats = WriteStats()
         self._db: aiosqlite.Connection | None = None
+        self._readers: list[aiosqlite.Connection] = []
+        self._idle_readers: asyncio.Queue[aiosqlite.Connection] | None = None
+        self._pending: list[tuple[tuple, asyncio.Future]] = []
+        self._flush_lock = asyncio.Lock()
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
 
     async def initialize(self):
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._db = await aiosqlite.connect(self.db_path)
         self._db.row_factory = aiosqlite.Row
+        if self.wal:
+            await self._db.execute("PRAGMA journal_mode=WAL")
+            await self._db.execute("PRAGMA synchronous=NORMAL")
+            await self._apply_cache_pragmas(self._db)
         await self._db.execute("""
             CREATE TABLE IF NOT EXISTS messages (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -31,48 +114,245 @@ class MessageStore:
             "CREATE INDEX IF NOT EXISTS idx_messages_channel ON messages(channel_id, timestamp)"
         )
         await self._db.commit()
+        await self._migrate()
+
+        if self.read_pool_size:
+            self._idle_readers = asyncio.Queue()
+            uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+            for _ in range(self.read_pool_size):
+                reader = await aiosqlite.connect(uri, uri=True)
+                reader.row_factory = aiosqlite.Row
+                await reader.execute("PRAGMA query_only=ON")
+                await self._apply_cache_pragmas(reader)
+                self._readers.append(reader)
+                self._idle_readers.put_nowait(reader)
+
+    async def _migrate(self) -> None:
+        """Apply schema migrations newer than the database's user_version."""
+        cursor = await self._db.execute("PRAGMA user_version")
+        (version,) = await cursor.fetchone()
+        for target, migration in enumerate(_MIGRATIONS, start=1):
+            if version >= target:
+                continue
+            logger.info("Migrating message store to schema version %d", target)
+            # Explicit, because the sqlite3 module autocommits DDL outside one
+            await self._db.execute("BEGIN")
+            try:
+                await migration(self._db)
+                await self._db.execute(f"PRAGMA user_version={target}")
+            except BaseException:
+                await self._db.rollback()
+                raise
+            await self._db.commit()
+
+    async def _apply_cache_pragmas(self, conn: aiosqlite.Connection) -> None:
+        await conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        # Negative cache_size is in KiB rather than pages
+        await conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
 
     async def close(self):
         if self._db:
+            await self.flush()
+            for reader in self._readers:
+                await reader.close()
+            self._readers.clear()
+            self._idle_readers = None
             await self._db.close()
+            self._db = None
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a pooled read-only connection, or the writer if there is no pool."""
+        assert self._db is not None
+        if self._idle_readers is None:
+            yield self._db
+            return
+        reader = await self._idle_readers.get()
+        try:
+            yield reader
+        finally:
+            self._idle_readers.put_nowait(reader)
+
+    def enqueue_message(
+        self, *, channel_id: str, user_id: str, user_name: str,
+        content: str, is_bot: bool, bot_name: str | None,
+    ) -> asyncio.Future:
+        """Queue a message for the next batch commit without waiting for it.
+
+        Returns a future that resolves to the row id once the batch commits.
+        Callers that do not need the id may drop it; failures are logged here.
+        """
+        assert self._db is not None
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Mark exceptions as retrieved so fire-and-forget callers don't warn
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        params = (
+            time.time_ns() // 1000, channel_id, user_id,
+            user_name, content, int(is_bot), bot_name,
+        )
+        self._pending.append((params, future))
+
+        if len(self._pending) >= self.batch_size or self.flush_interval == 0:
+            self._schedule_flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(self.flush_interval, self._schedule_flush)
+        return future
 
     async def save_message(
         self, *, channel_id: str, user_id: str, user_name: str,
         content: str, is_bot: bool, bot_name: str | None,
     ) -> int:
-        assert self._db is not None
-        cursor = await self._db.execute(
-            """INSERT INTO messages (timestamp, channel_id, user_id, user_name, content, is_bot, bot_name)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (datetime.now(timezone.utc).isoformat(), channel_id, user_id,
-             user_name, content, int(is_bot), bot_name),
+        """Queue a message and wait for its batch to commit. Returns the row id."""
+        return await self.enqueue_message(
+            channel_id=channel_id, user_id=user_id, user_name=user_name,
+            content=content, is_bot=is_bot, bot_name=bot_name,
         )
-        await self._db.commit()
-        return cursor.lastrowid
 
-    async def get_messages(self, *, channel_id: str, limit: int = 50) -> list[dict]:
+    def _schedule_flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> None:
+        """Commit all pending writes, ``batch_size`` rows per transaction."""
+        async with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            while self._pending and self._db is not None:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                await self._commit_batch(batch)
+
+    async def _commit_batch(self, batch: list[tuple[tuple, asyncio.Future]]) -> None:
+        started = time.perf_counter()
+        try:
+            row_ids = []
+            for params, _ in batch:
+                cursor = await self._db.execute(_INSERT_SQL, params)
+                row_ids.append(cursor.lastrowid)
+            await self._db.commit()
+        except Exception as e:
+            logger.exception("Failed to commit batch of %d messages", len(batch))
+            self.stats.failed_batches += 1
+            try:
+                await self._db.rollback()
+            except Exception:
+                logger.exception("Rollback after failed batch also failed")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.stats.rows += len(batch)
+        self.stats.batches += 1
+        self.stats.flush_seconds += time.perf_counter() - started
+        for (_, future), row_id in zip(batch, row_ids, strict=True):
+            if not future.done():
+                future.set_result(row_id)
+
+    async def get_messages(
+        self, *, channel_id: str, limit: int = 50,
+        before_id: int | None = None, after_id: int | None = None,
+    ) -> list[dict]:
+        """Return up to ``limit`` messages from a channel, oldest first.
+
+        With no cursor this is the most recent page. ``before_id`` pages back
+        from (and excludes) that row; ``after_id`` pages forward from it.
+        """
         assert self._db is not None
-        cursor = await self._db.execute(
-            "SELECT * FROM messages WHERE channel_id = ? ORDER BY timestamp DESC LIMIT ?",
-            (channel_id, limit),
-        )
-        rows = await cursor.fetchall()
-        return [self._row_to_dict(row) for row in reversed(rows)]
+        await self.flush()
+        where = "channel_id = ?"
+        params: list = [channel_id]
+        if before_id is not None:
+            where += " AND id < ?"
+            params.append(before_id)
+        if after_id is not None:
+            where += " AND id > ?"
+            params.append(after_id)
+        params.append(limit)
+
+        if after_id is not None and before_id is None:
+            sql = f"SELECT * FROM messages WHERE {where} ORDER BY id LIMIT ?"
+        else:
+            # Newest page first via the index, then flip it to chronological order
+            sql = (
+                f"SELECT * FROM (SELECT * FROM messages WHERE {where} ORDER BY id DESC LIMIT ?)"
+                " ORDER BY id"
+            )
+        async with self._reader() as db:
+            cursor = await db.execute(sql, params)
+            rows = await cursor.fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    async def iter_messages(
+        self, *, after_id: int = 0, batch_size: int = 500,
+    ) -> AsyncIterator[list[dict]]:
+        """Stream every message in id order, one page per iteration.
+
+        Pages are keyset queries on the primary key, so a scan resumed from
+        a checkpointed ``after_id`` costs the same as one from the start.
+        """
+        assert self._db is not None
+        await self.flush()
+        cursor_id = after_id
+        while True:
+            async with self._reader() as db:
+                cursor = await db.execute(
+                    "SELECT * FROM messages WHERE id > ? ORDER BY id LIMIT ?",
+                    (cursor_id, batch_size),
+                )
+                rows = await cursor.fetchall()
+            if not rows:
+                return
+            page = [self._row_to_dict(row) for row in rows]
+            cursor_id = page[-1]["id"]
+            yield page
+
+    async def search_messages(
+        self, *, query: str, limit: int = 20, channel_id: str | None = None,
+        match_any: bool = False,
+    ) -> list[dict]:
+        """Full-text search over message content, best bm25 matches first.
 
-    async def search_messages(self, *, query: str, limit: int = 20) -> list[dict]:
+        Bare words match whole terms, ``"quoted text"`` matches a phrase and a
+        trailing ``*`` matches a prefix (``deploy*``). All terms must match
+        unless ``match_any`` is set, which suits retrieval with a whole chat
+        message as the query. Each result carries a ``snippet`` with the
+        matched terms in Discord bold.
+        """
         assert self._db is not None
-        cursor = await self._db.execute(
-            "SELECT * FROM messages WHERE content LIKE ? ORDER BY timestamp DESC LIMIT ?",
-            (f"%{query}%", limit),
+        match = to_fts_query(query, match_any=match_any)
+        if not match:
+            return []
+        await self.flush()
+        sql = (
+            "SELECT m.*, snippet(messages_fts, 0, '**', '**', '…', 16) AS snippet,"
+            " bm25(messages_fts) AS rank"
+            " FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid"
+            " WHERE messages_fts MATCH ?"
         )
-        rows = await cursor.fetchall()
-        return [self._row_to_dict(row) for row in rows]
+        params: list = [match]
+        if channel_id is not None:
+            sql += " AND m.channel_id = ?"
+            params.append(channel_id)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        async with self._reader() as db:
+            cursor = await db.execute(sql, params)
+            rows = await cursor.fetchall()
+        return [self._row_to_dict(row, ranked=True) for row in rows]
 
     @staticmethod
-    def _row_to_dict(row) -> dict:
-        return {
+    def _row_to_dict(row, *, ranked: bool = False) -> dict:
+        result = {
             "id": row["id"],
-            "timestamp": row["timestamp"],
+            "timestamp": _us_to_iso(row["timestamp"]),
+            "timestamp_us": row["timestamp"],
             "channel_id": row["channel_id"],
             "user_id": row["user_id"],
             "user_name": row["user_name"],
@@ -80,3 +360,120 @@ class MessageStore:
             "is_bot": bool(row["is_bot"]),
             "bot_name": row["bot_name"],
         }
+        if ranked:
+            result["snippet"] = row["snippet"]
+            result["rank"] = row["rank"]
+        return result
+
+
+def _iso_to_us(value: str | None) -> int:
+    """Convert a legacy ISO-8601 timestamp to epoch microseconds (0 if unparseable)."""
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return 0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _us_to_iso(value: int) -> str:
+    return (_EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+_FTS_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def to_fts_query(query: str, *, match_any: bool = False) -> str:
+    """Translate a user search string into a safe FTS5 MATCH expression.
+
+    Every term is quoted so FTS5 operators and punctuation in chat text can't
+    produce syntax errors. Quoted phrases stay phrases and a trailing ``*``
+    becomes a prefix query. Terms are ANDed together, or ORed with
+    ``match_any``.
+    """
+    terms = []
+    for phrase, word in _FTS_TOKEN.findall(query):
+        if phrase:
+            terms.append('"' + phrase.replace('"', '""') + '"')
+            continue
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return (" OR " if match_any else " ").join(terms)
+
+
+async def _create_fts_index(db: aiosqlite.Connection) -> None:
+    """v1: FTS5 index over message content, kept in sync by triggers.
+
+    Existing rows are backfilled with a one-time ``rebuild``.
+    """
+    await db.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+            content, content='messages', content_rowid='id', tokenize='unicode61'
+        )
+    """)
+    await _create_fts_triggers(db)
+    await db.execute("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')")
+
+
+async def _create_fts_triggers(db: aiosqlite.Connection) -> None:
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+            INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+        END
+    """)
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+            INSERT INTO messages_fts(messages_fts, rowid, content)
+                VALUES ('delete', old.id, old.content);
+        END
+    """)
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+            INSERT INTO messages_fts(messages_fts, rowid, content)
+                VALUES ('delete', old.id, old.content);
+            INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+        END
+    """)
+
+
+async def _integer_timestamps(db: aiosqlite.Connection) -> None:
+    """v2: ISO text timestamps -> integer epoch microseconds, keyset indexes.
+
+    SQLite can't change a column type in place, so the table is rebuilt with
+    the same row ids. The FTS index is keyed by those ids and stays valid;
+    its triggers are dropped with the old table and recreated here.
+    """
+    await db.create_function("iso_to_us", 1, _iso_to_us, deterministic=True)
+    # Left behind by a run before migrations were transactional
+    await db.execute("DROP TABLE IF EXISTS messages_v2")
+    await db.execute("""
+        CREATE TABLE messages_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp INTEGER NOT NULL,
+            channel_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            user_name TEXT NOT NULL,
+            content TEXT NOT NULL,
+            is_bot INTEGER NOT NULL DEFAULT 0,
+            bot_name TEXT
+        )
+    """)
+    await db.execute("""
+        INSERT INTO messages_v2
+            (id, timestamp, channel_id, user_id, user_name, content, is_bot, bot_name)
+        SELECT id, iso_to_us(timestamp), channel_id, user_id, user_name, content, is_bot, bot_name
+        FROM messages ORDER BY id
+    """)
+    await db.execute("DROP TABLE messages")
+    await db.execute("ALTER TABLE messages_v2 RENAME TO messages")
+    # History pages seek on (channel_id, id); time-range lookups use the
+    # timestamp index, which also carries the rowid.
+    await db.execute("CREATE INDEX idx_messages_channel_id ON messages(channel_id, id)")
+    await db.execute("CREATE INDEX idx_messages_channel ON messages(channel_id, timestamp)")
+    await _create_fts_triggers(db)
+
+
+_MIGRATIONS = [_create_fts_index, _integer_timestamps]
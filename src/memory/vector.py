@@ -1,41 +1,338 @@
-"""Vector store with hybrid search using ChromaDB."""
+"""Vector store with hybrid search using ChromaDB.
 
+Chroma embeds and queries synchronously, so the async API (``asearch``,
+``aadd``, ``add_in_background``) runs those calls on a small dedicated
+thread pool to keep the discord.py event loop free.
+
+Background adds go through an ingestion buffer. Documents accumulate and
+are written with one ``collection.upsert`` per batch, so the embedding model
+runs one forward pass per batch rather than per message. A batch is written
+when the buffer reaches ``batch_size``, when its oldest item is
+``flush_interval`` seconds old, or on ``drain``/``close``. Each buffered item
+is also appended to a journal file next to the collection. Anything left in
+the journal after a crash is replayed on the next start; upserts by id make
+the replay idempotent. At most ``max_pending`` documents can be waiting at
+once; past that, ``add_in_background`` waits up to ``max_wait`` seconds for
+room (backpressure) and then drops the document, so a broken embedder can
+never block its callers for good.
+
+Document ids are a hash of the text and metadata unless the caller supplies
+one (the backfill uses SQLite row ids). That keeps them stable across
+restarts, deletions and processes sharing the store. The collection size is
+counted once at startup and then tracked in memory, so queries don't pay
+for ``collection.count()``.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 import chromadb
 
+logger = logging.getLogger(__name__)
+
+JOURNAL_NAME = "ingest-journal.jsonl"
+
 
 class VectorMemory:
-    def __init__(self, persist_dir: Path):
+    def __init__(
+        self,
+        persist_dir: Path,
+        *,
+        embedding_function=None,
+        max_workers: int = 1,
+        max_pending: int = 64,
+        max_wait: float = 5.0,
+        batch_size: int = 32,
+        flush_interval: float = 2.0,
+    ):
         self._client = chromadb.PersistentClient(path=str(persist_dir))
+        collection_kwargs = {}
+        if embedding_function is not None:
+            collection_kwargs["embedding_function"] = embedding_function
         self._collection = self._client.get_or_create_collection(
             name="messages",
             metadata={"hnsw:space": "cosine"},
+            **collection_kwargs,
         )
-        self._id_counter = self._collection.count()
-
-    def add(self, *, text: str, metadata: dict) -> str:
-        doc_id = f"doc-{self._id_counter}"
-        self._id_counter += 1
-        self._collection.add(
-            documents=[text],
-            metadatas=[metadata],
-            ids=[doc_id],
+        self._size = self._collection.count()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="vector-memory",
         )
-        return doc_id
+        self._max_pending = max_pending
+        self.max_wait = max_wait
+        self.dropped = 0
+        self._slots: asyncio.Semaphore | None = None
+        self._background: set[asyncio.Task] = set()
+
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._journal_dir = Path(persist_dir)
+        self._journal_path = self._journal_dir / JOURNAL_NAME
+        self._segment_ids = itertools.count()
+        self._buffer: list[dict] = []
+        self._buffer_segments: list[Path] = []
+        self._buffer_lock = threading.Lock()
+        self._inflight = 0
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._recover_journal()
+
+    @staticmethod
+    def content_id(text: str, metadata: dict) -> str:
+        """Deterministic document id derived from the text and its metadata."""
+        payload = json.dumps([text, metadata], sort_keys=True, default=str)
+        return "doc-" + hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    @property
+    def size(self) -> int:
+        """Number of documents in the collection, tracked without a count() query."""
+        return self._size
+
+    def refresh_size(self) -> int:
+        """Re-read the size from the collection, e.g. after another process wrote to it."""
+        self._size = self._collection.count()
+        return self._size
+
+    def add(self, *, text: str, metadata: dict, doc_id: str | None = None) -> str:
+        return self.add_many(
+            texts=[text], metadatas=[metadata],
+            ids=[doc_id] if doc_id is not None else None,
+        )[0]
 
-    def search(self, query: str, *, k: int = 5) -> list[dict]:
-        if self._collection.count() == 0:
+    def add_many(
+        self, *, texts: list[str], metadatas: list[dict], ids: list[str] | None = None,
+        embeddings: list[list[float]] | None = None,
+    ) -> list[str]:
+        """Upsert many documents with one embedding pass. Returns their ids.
+
+        Pass precomputed ``embeddings`` to skip the collection's embedder.
+        """
+        if ids is None:
+            ids = [self.content_id(t, m) for t, m in zip(texts, metadatas, strict=True)]
+        if not texts:
+            return ids
+
+        unique_ids = ids
+        if len(set(ids)) != len(ids):
+            # Chroma rejects repeated ids in one call; the last copy wins
+            latest = {doc_id: i for i, doc_id in enumerate(ids)}
+            keep = sorted(latest.values())
+            unique_ids = [ids[i] for i in keep]
+            texts = [texts[i] for i in keep]
+            metadatas = [metadatas[i] for i in keep]
+            if embeddings is not None:
+                embeddings = [embeddings[i] for i in keep]
+
+        # Upserts of existing ids replace rather than grow the collection
+        existing = self._collection.get(ids=unique_ids, include=[])["ids"]
+        self._collection.upsert(
+            documents=texts, metadatas=metadatas, ids=unique_ids, embeddings=embeddings,
+        )
+        self._size += len(unique_ids) - len(existing)
+        return ids
+
+    def search(self, query: str, *, k: int = 5, where: dict | None = None) -> list[dict]:
+        return self.search_many([query], k=k, where=where)[0]
+
+    def search_many(
+        self, queries: list[str], *, k: int = 5, where: dict | None = None,
+    ) -> list[list[dict]]:
+        """Run several queries in one collection call; one result list per query.
+
+        ``where`` is a Chroma metadata filter applied to every query.
+        """
+        if not queries:
             return []
+        if self._size == 0:
+            return [[] for _ in queries]
         results = self._collection.query(
-            query_texts=[query],
-            n_results=min(k, self._collection.count()),
+            query_texts=queries,
+            n_results=min(k, self._size),
+            where=where or None,
         )
+        distances = results.get("distances")
+        batches = []
+        for q in range(len(queries)):
+            items = []
+            for i in range(len(results["documents"][q])):
+                items.append({
+                    "text": results["documents"][q][i],
+                    "metadata": results["metadatas"][q][i],
+                    "distance": distances[q][i] if distances else None,
+                })
+            batches.append(items)
+        return batches
+
+    # -- Ingestion buffer -------------------------------------------------
+
+    def _recover_journal(self) -> None:
+        """Replay documents that were buffered but never written before a crash."""
+        paths = sorted(self._journal_dir.glob("ingest-journal*.jsonl"))
         items = []
-        for i in range(len(results["documents"][0])):
-            items.append({
-                "text": results["documents"][0][i],
-                "metadata": results["metadatas"][0][i],
-                "distance": results["distances"][0][i] if results.get("distances") else None,
-            })
-        return items
+        for path in paths:
+            for line in path.read_text().splitlines():
+                try:
+                    items.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from the crash; everything before it is intact
+                    logger.warning("Skipping unreadable journal line in %s", path.name)
+        if items:
+            logger.info("Recovering %d un-flushed vector documents", len(items))
+            self._write_batch(items)
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def _buffer_add(self, text: str, metadata: dict, doc_id: str | None) -> tuple[str, int]:
+        item = {"id": doc_id or self.content_id(text, metadata), "text": text, "metadata": metadata}
+        with self._buffer_lock:
+            self._buffer.append(item)
+            with open(self._journal_path, "a") as f:
+                f.write(json.dumps(item) + "\n")
+            return item["id"], len(self._buffer)
+
+    def _write_batch(self, batch: list[dict]) -> None:
+        self.add_many(
+            texts=[item["text"] for item in batch],
+            metadatas=[item["metadata"] for item in batch],
+            ids=[item["id"] for item in batch],
+        )
+
+    def flush(self) -> int:
+        """Write everything in the ingestion buffer. Returns the number written.
+
+        The buffer and journal are swapped out under the lock, so producers
+        are only blocked for the swap and not for the embedding pass.
+        """
+        with self._buffer_lock:
+            if not self._buffer:
+                return 0
+            batch, self._buffer = self._buffer, []
+            segments, self._buffer_segments = self._buffer_segments, []
+            if self._journal_path.exists():
+                segment = self._journal_dir / f"ingest-journal-{next(self._segment_ids)}.jsonl"
+                self._journal_path.rename(segment)
+                segments.append(segment)
+            self._inflight += len(batch)
+
+        try:
+            self._write_batch(batch)
+        except Exception:
+            # Put the batch back in front of newer items; its journal segments
+            # stay on disk until a later flush succeeds
+            with self._buffer_lock:
+                self._buffer[:0] = batch
+                self._buffer_segments[:0] = segments
+                self._inflight -= len(batch)
+            raise
+
+        with self._buffer_lock:
+            self._inflight -= len(batch)
+        for segment in segments:
+            segment.unlink(missing_ok=True)
+        return len(batch)
+
+    # -- Async API --------------------------------------------------------
+
+    async def _run(self, fn, /, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def asearch(
+        self, query: str, *, k: int = 5, where: dict | None = None,
+    ) -> list[dict]:
+        """Non-blocking ``search``."""
+        return await self._run(self.search, query, k=k, where=where)
+
+    async def asearch_many(
+        self, queries: list[str], *, k: int = 5, where: dict | None = None,
+    ) -> list[list[dict]]:
+        """Non-blocking ``search_many``."""
+        return await self._run(self.search_many, queries, k=k, where=where)
+
+    async def aadd(self, *, text: str, metadata: dict, doc_id: str | None = None) -> str:
+        """Non-blocking ``add``."""
+        return await self._run(self.add, text=text, metadata=metadata, doc_id=doc_id)
+
+    async def aadd_many(self, **kwargs) -> list[str]:
+        """Non-blocking ``add_many``."""
+        return await self._run(self.add_many, **kwargs)
+
+    @property
+    def pending_count(self) -> int:
+        """Documents buffered or being written but not yet in the collection."""
+        return len(self._buffer) + self._inflight
+
+    async def add_in_background(
+        self, *, text: str, metadata: dict, doc_id: str | None = None,
+    ) -> str | None:
+        """Buffer a document for the next batch write and return its id.
+
+        Returns as soon as the document is journaled. If ``max_pending``
+        documents are already waiting, first waits for a batch to finish;
+        if none does within ``max_wait`` the document is dropped and None
+        is returned.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_pending)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.max_wait)
+        except TimeoutError:
+            self.dropped += 1
+            logger.warning(
+                "Vector ingestion backed up (%d pending); dropped a document (%d so far)",
+                self.pending_count, self.dropped,
+            )
+            return None
+
+        doc_id, buffered = self._buffer_add(text, metadata, doc_id)
+        if buffered >= min(self.batch_size, self._max_pending):
+            self._schedule_flush()
+        elif self._flush_timer is None:
+            loop = asyncio.get_running_loop()
+            self._flush_timer = loop.call_later(self.flush_interval, self._schedule_flush)
+        return doc_id
+
+    def _schedule_flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        task = asyncio.get_running_loop().create_task(self._flush_in_executor())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _flush_in_executor(self) -> None:
+        try:
+            written = await self._run(self.flush)
+        except Exception:
+            logger.exception("Vector batch write failed, retrying in %.1fs", self.flush_interval)
+            if self._flush_timer is None:
+                loop = asyncio.get_running_loop()
+                self._flush_timer = loop.call_later(self.flush_interval, self._schedule_flush)
+            return
+        if self._slots is not None:
+            for _ in range(written):
+                self._slots.release()
+
+    async def drain(self) -> None:
+        """Write everything buffered and wait for in-flight batches."""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self._buffer:
+            await self._flush_in_executor()
+
+    def close(self) -> None:
+        """Write any buffered documents and shut down the executor."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        self._executor.shutdown(wait=True)
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Final vector flush failed; the journal will be replayed on start")
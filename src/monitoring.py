@@ -52,6 +52,9 @@ class MonitoringChannel:
     async def post_compaction(self, session_id: str):
         await self.post(f"\U0001f4e6 **Compaction:** Session `{session_id}` was compacted")
 
+    async def post_tool_cache_report(self, report: str):
+        await self.post(f"\U0001f4be **Tool cache**\n{report}")
+
     async def post_subagent_complete(self, name: str, summary: str):
         await self.post(f"\u2705 **Sub-agent `{name}` complete:** {summary[:200]}")
 
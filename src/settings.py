@@ -16,6 +16,35 @@ class Settings(BaseSettings):
     firecrawl_api_key: SecretStr | None = None
     monitoring_channel_id: int = 0
     assistant_home: Path = Path.home() / ".assistant"
+    message_store_batch_size: int = 32
+    message_store_flush_ms: int = 50
+    message_store_wal: bool = True
+    message_store_read_pool: int = 2
+    vector_batch_size: int = 32
+    vector_flush_seconds: float = 2.0
+    agent_max_queued_messages: int = 8
+    session_max_resident: int = 256
+    session_max_messages: int = 10_000
+    session_ttl_seconds: float = 6 * 3600
+    context_max_tokens: int = 32_000
+    context_history_tokens: int = 16_000
+    stream_responses: bool = True
+    stream_edit_seconds: float = 1.0
+    tool_cache_mb: int = 32
+    tool_cache_report_hours: float = 6.0
+    http_pool_limit: int = 100
+    http_per_host_limit: int = 10
+    # Dynamic skills run in worker processes; 0 runs them in the bot process
+    skill_workers: int = 2
+    skill_timeout_seconds: float = 60.0
+    skill_memory_mb: int = 1024
+    skill_worker_max_calls: int = 100
+    # Poll interval when watchfiles isn't installed; 0 disables watching
+    skill_watch_seconds: float = 5.0
+    # Skills listed per turn, picked by embedding similarity; 0 lists them all
+    skill_index_top_k: int = 8
+    # Bind only the tools a message looks like it needs, per turn
+    tool_selection: bool = True
 
     @property
     def soul_path(self) -> Path:
@@ -0,0 +1,97 @@
+"""Embedding index for routing messages to relevant skills.
+
+Listing every skill in the system prompt costs a line per skill on every
+turn, however many the agent has written. ``SkillIndex`` embeds each
+skill's name, description and trigger and picks only the ``top_k`` closest
+to the current message. Skills named verbatim in the message always make
+the list. Embeddings are cached by the text they were made from, so when
+the registry changes only new or edited skills are embedded again.
+
+``embed`` is any callable mapping a list of texts to vectors, such as a
+Chroma embedding function. It runs in a worker thread.
+"""
+
+import asyncio
+import logging
+import re
+from collections.abc import Callable, Sequence
+
+import numpy as np
+
+from src.skills.loader import SkillManifest
+from src.skills.registry import SkillRegistry
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[list[str]], Sequence[Sequence[float]]]
+
+
+def _skill_text(skill: SkillManifest) -> str:
+    return f"{skill.name}: {skill.description}. Use when: {skill.trigger}"
+
+
+class SkillIndex:
+    def __init__(self, registry: SkillRegistry, embed: Embedder, *, top_k: int = 5):
+        self.registry = registry
+        self.embed = embed
+        self.top_k = top_k
+        self._vectors: dict[str, np.ndarray] = {}
+        self._skills: list[SkillManifest] = []
+        self._matrix: np.ndarray | None = None
+        self._version: int | None = None
+        self._lock = asyncio.Lock()
+
+    async def search(self, query: str, k: int | None = None) -> list[SkillManifest]:
+        """The skills most relevant to ``query``, best first."""
+        k = self.top_k if k is None else k
+        skills = self.registry.all_skills()
+        if len(skills) <= k:
+            return skills
+
+        named = [s for s in skills if re.search(rf"\b{re.escape(s.name)}\b", query, re.I)]
+        await self._refresh()
+        (query_vector,) = await asyncio.to_thread(self._embed, [query])
+        scores = self._matrix @ query_vector
+        ranked = [self._skills[i] for i in np.argsort(-scores)]
+
+        picked = named[:k]
+        for skill in ranked:
+            if len(picked) >= k:
+                break
+            if skill not in picked:
+                picked.append(skill)
+        return picked
+
+    async def render(self, query: str) -> str:
+        """The skill index section for one message, in ``get_skill_index`` format."""
+        try:
+            skills = await self.search(query)
+        except Exception:
+            logger.exception("Skill search failed; listing every skill")
+            return self.registry.get_skill_index()
+        if not skills:
+            return "No skills available."
+        return self.registry.format_index(skills)
+
+    async def _refresh(self) -> None:
+        async with self._lock:
+            if self._version == self.registry.version and self._matrix is not None:
+                return
+            version = self.registry.version
+            skills = self.registry.all_skills()
+            texts = [_skill_text(s) for s in skills]
+            missing = [t for t in dict.fromkeys(texts) if t not in self._vectors]
+            if missing:
+                vectors = await asyncio.to_thread(self._embed, missing)
+                self._vectors.update(zip(missing, vectors, strict=True))
+                logger.info("Embedded %d skills for routing", len(missing))
+            live = set(texts)
+            self._vectors = {t: v for t, v in self._vectors.items() if t in live}
+            self._skills = skills
+            self._matrix = np.stack([self._vectors[t] for t in texts])
+            self._version = version
+
+    def _embed(self, texts: list[str]) -> list[np.ndarray]:
+        vectors = np.asarray(self.embed(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return list(vectors / np.where(norms == 0, 1, norms))
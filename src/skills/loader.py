@@ -1,5 +1,12 @@
-"""Skill manifest discovery, loading, and hot-reload."""
+"""Skill manifest discovery, loading, and hot-reload.
 
+Parsing YAML is the slow part of a scan, so ``ManifestCache`` keeps the
+parsed contents of each ``manifest.yaml`` keyed by its mtime and size. With
+a ``path`` the cache is saved as JSON, which lets the startup scan skip
+parsing every manifest that hasn't changed since the last run.
+"""
+
+import json
 import logging
 from dataclasses import dataclass
 from pathlib import Path
@@ -22,7 +29,82 @@ class SkillManifest:
     path: Path
 
 
-def load_manifests(skills_dir: Path) -> list[SkillManifest]:
+def _manifest_from_data(data: dict, skill_dir: Path) -> SkillManifest:
+    return SkillManifest(
+        name=data["name"],
+        description=data["description"],
+        trigger=data["trigger"],
+        permissions=data.get("permissions", []),
+        entry_point=data.get("entry_point", "tool.py"),
+        author=data.get("author", "unknown"),
+        trusted=data.get("trusted", False),
+        created=str(data.get("created", "unknown")),
+        path=skill_dir,
+    )
+
+
+class ManifestCache:
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        # manifest.yaml path -> (mtime_ns, size, parsed data)
+        self._entries: dict[str, tuple[int, int, dict]] = {}
+        self._dirty = False
+        if path is not None and path.exists():
+            try:
+                raw = json.loads(path.read_text())
+                self._entries = {k: (v[0], v[1], v[2]) for k, v in raw.items()}
+            except (OSError, ValueError, TypeError, IndexError):
+                logger.warning("Ignoring unreadable manifest cache %s", path)
+
+    def read(self, manifest_path: Path) -> dict:
+        """Parsed contents of ``manifest_path``, re-parsed only if it changed."""
+        st = manifest_path.stat()
+        key = str(manifest_path)
+        entry = self._entries.get(key)
+        if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+            return entry[2]
+        with open(manifest_path) as f:
+            data = yaml.safe_load(f)
+        self._entries[key] = (st.st_mtime_ns, st.st_size, data)
+        self._dirty = True
+        return data
+
+    def forget(self, manifest_path: Path) -> None:
+        if self._entries.pop(str(manifest_path), None) is not None:
+            self._dirty = True
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._entries, default=str))
+            tmp.replace(self.path)
+            self._dirty = False
+        except OSError:
+            logger.warning("Failed to save manifest cache %s", self.path, exc_info=True)
+
+
+def load_manifest(skill_dir: Path, cache: ManifestCache | None = None) -> SkillManifest | None:
+    """Load one skill directory's manifest, or None if it has no valid one."""
+    manifest_path = skill_dir / "manifest.yaml"
+    if not manifest_path.exists():
+        logger.warning(f"Skill {skill_dir.name}: no manifest.yaml, skipping")
+        return None
+    try:
+        if cache is not None:
+            data = cache.read(manifest_path)
+        else:
+            with open(manifest_path) as f:
+                data = yaml.safe_load(f)
+        return _manifest_from_data(data, skill_dir)
+    except Exception as e:
+        logger.error(f"Failed to load {skill_dir.name}: {e}")
+        return None
+
+
+def load_manifests(skills_dir: Path, cache: ManifestCache | None = None) -> list[SkillManifest]:
     """Discover and load all skill manifests from a directory."""
     manifests = []
     if not skills_dir.exists():
@@ -31,25 +113,8 @@ def load_manifests(skills_dir: Path) -> list[SkillManifest]:
     for skill_dir in sorted(skills_dir.iterdir()):
         if not skill_dir.is_dir():
             continue
-        manifest_path = skill_dir / "manifest.yaml"
-        if not manifest_path.exists():
-            logger.warning(f"Skill {skill_dir.name}: no manifest.yaml, skipping")
-            continue
-        try:
-            with open(manifest_path) as f:
-                data = yaml.safe_load(f)
-            manifests.append(SkillManifest(
-                name=data["name"],
-                description=data["description"],
-                trigger=data["trigger"],
-                permissions=data.get("permissions", []),
-                entry_point=data.get("entry_point", "tool.py"),
-                author=data.get("author", "unknown"),
-                trusted=data.get("trusted", False),
-                created=data.get("created", "unknown"),
-                path=skill_dir,
-            ))
-        except Exception as e:
-            logger.error(f"Failed to load {skill_dir.name}: {e}")
+        manifest = load_manifest(skill_dir, cache)
+        if manifest is not None:
+            manifests.append(manifest)
 
     return manifests
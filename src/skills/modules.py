@@ -0,0 +1,92 @@
+"""Compiled-module cache for dynamic skills.
+
+Importing a skill's entry point on every dispatch re-reads, re-compiles and
+re-executes it. ``SkillModuleCache`` keeps each loaded module keyed by its
+path and reuses it for as long as the file's mtime and size are unchanged.
+When those do change, the source is hashed. A module whose content is the
+same is kept; otherwise it is executed again.
+
+With a ``cache_dir``, compiled bytecode is also written there, keyed by the
+source hash and interpreter version, so after a restart an unchanged skill
+is executed without being compiled again. Keying on the hash rather than
+mtime means an edit can never be masked by stale bytecode.
+"""
+
+import hashlib
+import importlib.util
+import logging
+import marshal
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from types import CodeType, ModuleType
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CachedModule:
+    mtime_ns: int
+    size: int
+    digest: str
+    module: ModuleType
+
+
+class SkillModuleCache:
+    def __init__(self, cache_dir: Path | None = None):
+        self.cache_dir = cache_dir
+        self._modules: dict[Path, _CachedModule] = {}
+        self.hits = 0
+        self.loads = 0
+
+    def load(self, name: str, entry: Path) -> ModuleType:
+        """Return the module for ``entry``, executing it only if it changed."""
+        path = entry.resolve()
+        st = path.stat()
+        cached = self._modules.get(path)
+        if cached is not None and (cached.mtime_ns, cached.size) == (st.st_mtime_ns, st.st_size):
+            self.hits += 1
+            return cached.module
+
+        source = path.read_bytes()
+        digest = hashlib.sha256(source).hexdigest()
+        if cached is not None and cached.digest == digest:
+            # Touched but not edited
+            cached.mtime_ns, cached.size = st.st_mtime_ns, st.st_size
+            self.hits += 1
+            return cached.module
+
+        code = self._compile(path, source, digest)
+        spec = importlib.util.spec_from_file_location(f"skill_{name}", str(path))
+        module = importlib.util.module_from_spec(spec)
+        exec(code, module.__dict__)
+        self.loads += 1
+        self._modules[path] = _CachedModule(st.st_mtime_ns, st.st_size, digest, module)
+        return module
+
+    def invalidate(self, entry: Path) -> None:
+        self._modules.pop(entry.resolve(), None)
+
+    def _bytecode_path(self, digest: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{digest}.{sys.implementation.cache_tag}.bin"
+
+    def _compile(self, path: Path, source: bytes, digest: str) -> CodeType:
+        cached = self._bytecode_path(digest)
+        if cached is not None and cached.exists():
+            try:
+                return marshal.loads(cached.read_bytes())
+            except (OSError, EOFError, ValueError, TypeError):
+                logger.warning("Discarding unreadable skill bytecode %s", cached)
+
+        code = compile(source, str(path), "exec", dont_inherit=True)
+        if cached is not None:
+            try:
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                tmp = cached.with_suffix(".tmp")
+                tmp.write_bytes(marshal.dumps(code))
+                tmp.replace(cached)
+            except OSError:
+                logger.warning("Failed to write skill bytecode %s", cached, exc_info=True)
+        return code
@@ -0,0 +1,174 @@
+"""Pre-started worker processes for running dynamic skills off the event loop.
+
+An agent-authored skill that computes for a while or makes a blocking call
+would stall every channel if it ran in the bot process. ``SkillWorkerPool``
+keeps ``size`` worker processes (``src.skills.worker``) and sends each
+dispatch to an idle one over its stdin/stdout pipes. A call that overruns
+``timeout`` has its worker killed and replaced, and a worker that dies
+(for example past its ``max_memory_mb`` address-space limit) is replaced
+as well. Workers are also replaced after ``max_calls`` calls, so leaks in
+skill code don't accumulate.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+# Largest reply line a worker may send; skill results are strings
+_PIPE_LIMIT = 16 * 1024 * 1024
+
+
+class _Worker:
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.calls = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+
+class SkillWorkerPool:
+    def __init__(
+        self,
+        size: int = 2,
+        *,
+        timeout: float = 60.0,
+        max_memory_mb: int = 1024,
+        max_calls: int = 100,
+        bytecode_dir: Path | None = None,
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.max_calls = max_calls
+        self.bytecode_dir = bytecode_dir
+        self._idle: asyncio.Queue[_Worker] = asyncio.Queue()
+        self._workers: set[_Worker] = set()
+        self._replacing: set[asyncio.Task] = set()
+        self._next_id = 0
+        self._started = False
+        self._closed = False
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        for _ in range(self.size):
+            await self._idle.put(await self._spawn())
+        logger.info("Started %d skill workers", self.size)
+
+    async def close(self) -> None:
+        self._closed = True
+        # Replacements see _closed and only finish stopping their worker
+        await asyncio.gather(*self._replacing, return_exceptions=True)
+        for worker in list(self._workers):
+            await self._stop(worker)
+
+    async def run(self, name: str, path: Path, entry_point: str, input_text: str) -> str:
+        """Run a skill's ``run(input_text)`` in a worker and return its result."""
+        await self.start()
+        if len(self._workers) + len(self._replacing) < self.size:
+            # A replacement failed to start earlier; try again
+            self._idle.put_nowait(await self._spawn())
+        worker = await self._idle.get()
+        if not worker.alive:
+            self._discard(worker)
+            worker = await self._spawn()
+
+        self._next_id += 1
+        request = {
+            "id": self._next_id,
+            "name": name,
+            "path": str(path),
+            "entry_point": entry_point,
+            "input": input_text,
+        }
+        try:
+            reply = await asyncio.wait_for(self._call(worker, request), self.timeout)
+        except TimeoutError:
+            logger.warning("Skill '%s' timed out after %.0fs; killing worker", name, self.timeout)
+            self._replace(worker, kill=True)
+            return f"Skill '{name}' timed out after {self.timeout:.0f}s"
+        except (ConnectionError, EOFError, ValueError):
+            logger.exception("Skill worker died running '%s'", name)
+            self._replace(worker, kill=True)
+            return f"Skill '{name}' failed: worker process exited"
+        except BaseException:
+            # Cancelled mid-call; the worker's pipe state is unknown
+            self._replace(worker, kill=True)
+            raise
+
+        worker.calls += 1
+        if worker.calls >= self.max_calls:
+            self._replace(worker)
+        else:
+            self._idle.put_nowait(worker)
+        return reply["result"]
+
+    async def _call(self, worker: _Worker, request: dict) -> dict:
+        worker.process.stdin.write((json.dumps(request) + "\n").encode())
+        await worker.process.stdin.drain()
+        line = await worker.process.stdout.readline()
+        if not line:
+            raise EOFError("worker closed its output")
+        reply = json.loads(line)
+        if reply.get("id") != request["id"]:
+            raise ValueError(f"reply for request {reply.get('id')}, expected {request['id']}")
+        return reply
+
+    async def _spawn(self) -> _Worker:
+        args = [sys.executable, "-m", "src.skills.worker"]
+        if self.max_memory_mb:
+            args += ["--max-memory-mb", str(self.max_memory_mb)]
+        if self.bytecode_dir is not None:
+            args += ["--bytecode-dir", str(self.bytecode_dir)]
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            cwd=_PROJECT_ROOT,
+            limit=_PIPE_LIMIT,
+        )
+        worker = _Worker(process)
+        self._workers.add(worker)
+        return worker
+
+    def _replace(self, worker: _Worker, *, kill: bool = False) -> None:
+        """Stop ``worker`` and start a fresh one in the background."""
+        self._discard(worker)
+        task = asyncio.create_task(self._do_replace(worker, kill))
+        self._replacing.add(task)
+        task.add_done_callback(self._replacing.discard)
+
+    async def _do_replace(self, worker: _Worker, kill: bool) -> None:
+        await self._stop(worker, kill=kill)
+        if self._closed:
+            return
+        try:
+            self._idle.put_nowait(await self._spawn())
+        except Exception:
+            logger.exception("Failed to start replacement skill worker")
+
+    async def _stop(self, worker: _Worker, *, kill: bool = False) -> None:
+        self._discard(worker)
+        if not worker.alive:
+            return
+        if not kill:
+            # Closing stdin ends the worker's request loop
+            worker.process.stdin.close()
+            try:
+                await asyncio.wait_for(worker.process.wait(), 2)
+                return
+            except TimeoutError:
+                pass
+        worker.process.kill()
+        await worker.process.wait()
+
+    def _discard(self, worker: _Worker) -> None:
+        self._workers.discard(worker)
@@ -1,29 +1,80 @@
-"""Skill registry for routing — builds condensed index for system prompt."""
+"""Skill registry for routing — builds condensed index for system prompt.
+
+Skills are tracked per directory, so a change to one skill only re-reads
+that skill. ``refresh`` updates a single skill directory. ``sync`` scans
+skill roots but re-reads only the directories whose ``manifest.yaml`` has
+changed since the last scan, and drops skills whose directory is gone.
+``version`` only moves when a skill actually changes, so an idle rescan
+doesn't invalidate the cached system prompt.
+
+When several directories define the same skill name, the one under the
+root listed last in ``sync`` wins (user skills over builtins), however the
+directories were loaded or edited.
+"""
 
 import logging
+import re
 from pathlib import Path
 
-from src.skills.loader import SkillManifest, load_manifests
+from src.skills.loader import ManifestCache, SkillManifest, load_manifest
 
 logger = logging.getLogger(__name__)
 
 
+def _normalize(name: str) -> str:
+    return re.sub(r"[\s_-]+", "-", name.strip().lower())
+
+
+def _signature(skill_dir: Path) -> tuple[int, int] | None:
+    try:
+        st = (skill_dir / "manifest.yaml").stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 class SkillRegistry:
-    def __init__(self):
+    def __init__(self, manifest_cache: ManifestCache | None = None):
         self._skills: dict[str, SkillManifest] = {}
+        # Every loaded skill by directory, including ones shadowed by name
+        self._by_dir: dict[Path, SkillManifest] = {}
+        # Manifest signature per directory as of the last sync
+        self._seen: dict[Path, tuple[int, int] | None] = {}
+        # Skill roots in increasing precedence, as passed to sync
+        self._roots: list[Path] = []
+        self.manifest_cache = manifest_cache or ManifestCache()
+        # Bumped whenever the set of skills changes, for prompt caching
+        self.version = 0
 
     def register(self, manifest: SkillManifest):
         self._skills[manifest.name] = manifest
+        self._by_dir[manifest.path] = manifest
+        self.version += 1
 
     def get(self, name: str) -> SkillManifest | None:
         return self._skills.get(name)
 
+    def find(self, name: str) -> SkillManifest | None:
+        """Look up a skill by name, ignoring case and ``-``/``_``/space differences."""
+        manifest = self._skills.get(name)
+        if manifest is not None:
+            return manifest
+        wanted = _normalize(name)
+        for skill in self._skills.values():
+            if _normalize(skill.name) == wanted:
+                return skill
+        return None
+
     def get_skill_index(self) -> str:
         """Build condensed skill index for injection into system prompt."""
         if not self._skills:
             return "No skills available."
+        return self.format_index(self._skills.values())
+
+    @staticmethod
+    def format_index(skills) -> str:
         lines = []
-        for skill in self._skills.values():
+        for skill in skills:
             trust = "trusted" if skill.trusted else "untrusted"
             lines.append(f"- **{skill.name}** ({trust}): {skill.trigger}")
         return "\n".join(lines)
@@ -31,15 +82,81 @@ class SkillRegistry:
     def all_skills(self) -> list[SkillManifest]:
         return list(self._skills.values())
 
+    def refresh(self, skill_dir: Path) -> SkillManifest | None:
+        """Add, update or remove the skill in one directory.
+
+        Returns the skill's manifest, or None if the directory no longer
+        holds a valid skill.
+        """
+        self._seen[skill_dir] = _signature(skill_dir)
+        manifest = load_manifest(skill_dir, self.manifest_cache) if skill_dir.is_dir() else None
+        if manifest is None:
+            self._remove_dir(skill_dir)
+            return None
+        old = self._by_dir.get(skill_dir)
+        if old is not None and old.name != manifest.name:
+            self._remove_dir(skill_dir)
+        if old != manifest:
+            self._by_dir[skill_dir] = manifest
+            self.version += 1
+            self._resolve(manifest.name)
+            logger.info("Loaded skill: %s", manifest.name)
+        return manifest
+
+    def sync(self, *dirs: Path) -> bool:
+        """Bring the registry up to date with ``dirs``, reading only what changed.
+
+        Returns whether any skill was added, changed or removed.
+        """
+        version = self.version
+        self._roots = [root for root in dirs if root]
+        present: set[Path] = set()
+        for root in dirs:
+            if not root or not root.exists():
+                continue
+            for skill_dir in sorted(root.iterdir()):
+                if not skill_dir.is_dir() or skill_dir.name.startswith(("_", ".")):
+                    continue
+                present.add(skill_dir)
+                signature = _signature(skill_dir)
+                if skill_dir in self._seen and self._seen[skill_dir] == signature:
+                    continue
+                self.refresh(skill_dir)
+        roots = set(self._roots)
+        for skill_dir in [d for d in self._seen if d.parent in roots and d not in present]:
+            del self._seen[skill_dir]
+            self.manifest_cache.forget(skill_dir / "manifest.yaml")
+            self._remove_dir(skill_dir)
+        self.manifest_cache.save()
+        return self.version != version
+
     def reload(self, *dirs: Path) -> int:
-        """Re-scan directories and reload all skill manifests.
+        """Re-scan directories and reload changed skill manifests.
 
         Returns the number of skills loaded.
         """
-        self._skills.clear()
-        for d in dirs:
-            if d and d.exists():
-                for manifest in load_manifests(d):
-                    self.register(manifest)
-                    logger.info("Loaded skill: %s", manifest.name)
+        self.sync(*dirs)
         return len(self._skills)
+
+    def _remove_dir(self, skill_dir: Path) -> None:
+        manifest = self._by_dir.pop(skill_dir, None)
+        if manifest is None:
+            return
+        if self._skills.get(manifest.name) is manifest:
+            logger.info("Removed skill: %s", manifest.name)
+        self.version += 1
+        self._resolve(manifest.name)
+
+    def _precedence(self, manifest: SkillManifest) -> int:
+        try:
+            return self._roots.index(manifest.path.parent)
+        except ValueError:
+            return -1
+
+    def _resolve(self, name: str) -> None:
+        """Point ``name`` at its highest-precedence directory, or drop it."""
+        candidates = [m for m in self._by_dir.values() if m.name == name]
+        if candidates:
+            self._skills[name] = max(candidates, key=self._precedence)
+        else:
+            self._skills.pop(name, None)
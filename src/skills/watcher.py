@@ -0,0 +1,84 @@
+"""Keep the skill registry in step with hand-edited skill directories.
+
+``SkillWatcher`` uses filesystem notifications (inotify on Linux) through
+the optional ``watchfiles`` package, refreshing just the skill directories
+that changed. Without it, the watcher falls back to calling
+``SkillRegistry.sync`` every ``poll_interval`` seconds. That is one stat
+per skill, and only changed manifests are re-read.
+"""
+
+import asyncio
+import contextlib
+import logging
+from pathlib import Path
+
+from src.skills.registry import SkillRegistry
+
+logger = logging.getLogger(__name__)
+
+try:
+    from watchfiles import awatch
+except ImportError:  # optional dependency
+    awatch = None
+
+
+class SkillWatcher:
+    def __init__(self, registry: SkillRegistry, dirs: list[Path], *, poll_interval: float = 5.0):
+        self.registry = registry
+        self.dirs = [d for d in dirs if d]
+        self.poll_interval = poll_interval
+        self._task: asyncio.Task | None = None
+        self._stop = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stop.clear()
+        roots = [d for d in self.dirs if d.exists()]
+        if awatch is not None and roots:
+            self._task = asyncio.create_task(self._watch(roots))
+        else:
+            self._task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _poll(self) -> None:
+        logger.info("Polling skill directories every %.0fs", self.poll_interval)
+        while not self._stop.is_set():
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if self.registry.sync(*self.dirs):
+                    logger.info("Skill registry updated from disk")
+            except Exception:
+                logger.exception("Skill directory scan failed")
+
+    async def _watch(self, roots: list[Path]) -> None:
+        logger.info("Watching skill directories for changes")
+        async for changes in awatch(*roots, stop_event=self._stop):
+            try:
+                self.apply_changes([Path(path) for _, path in changes])
+            except Exception:
+                logger.exception("Failed to apply skill directory changes")
+
+    def apply_changes(self, paths: list[Path]) -> None:
+        """Refresh the skill directories that contain ``paths``."""
+        skill_dirs = set()
+        for path in paths:
+            for root in self.dirs:
+                try:
+                    relative = path.relative_to(root)
+                except ValueError:
+                    continue
+                if relative.parts and not relative.parts[0].startswith(("_", ".")):
+                    skill_dirs.add(root / relative.parts[0])
+        for skill_dir in sorted(skill_dirs):
+            self.registry.refresh(skill_dir)
+        if skill_dirs:
+            self.registry.manifest_cache.save()
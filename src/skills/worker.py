@@ -0,0 +1,83 @@
+"""Worker process that runs dynamic skills for ``SkillWorkerPool``.
+
+Run as ``python -m src.skills.worker``. Requests arrive on stdin and
+replies go out on the original stdout, one JSON object per line:
+
+    {"id": 1, "name": "...", "path": "...", "entry_point": "tool.py", "input": "..."}
+    {"id": 1, "result": "..."}
+
+Whatever a skill prints is redirected to stderr so it can't corrupt the
+protocol. Modules are kept in a per-worker ``SkillModuleCache`` and every
+call runs on the same event loop, so a warm worker only executes the
+skill's ``run()``. This module deliberately imports nothing heavy, which
+keeps worker start-up fast and inside the memory limit.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+from src.skills.modules import SkillModuleCache
+
+
+def _limit_memory(max_mb: int) -> None:
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return
+    limit = max_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def run_request(request: dict, cache: SkillModuleCache, loop: asyncio.AbstractEventLoop) -> str:
+    name = request["name"]
+    entry_point = request["entry_point"]
+    entry = Path(request["path"]) / entry_point
+    if not entry.exists():
+        return f"Skill '{name}' entry point not found: {entry}"
+
+    try:
+        module = cache.load(name, entry)
+    except Exception as e:
+        return f"Failed to load skill '{name}': {e}"
+
+    run_fn = getattr(module, "run", None)
+    if run_fn is None:
+        return f"Skill '{name}' has no run() function in {entry_point}"
+
+    try:
+        return str(loop.run_until_complete(run_fn(request["input"])))
+    except Exception as e:
+        return f"Skill '{name}' failed: {e}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-memory-mb", type=int, default=0)
+    parser.add_argument("--bytecode-dir", type=Path, default=None)
+    args = parser.parse_args()
+
+    # Keep the real stdout for replies and send everything else to stderr
+    replies = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    if args.max_memory_mb:
+        _limit_memory(args.max_memory_mb)
+
+    cache = SkillModuleCache(args.bytecode_dir)
+    loop = asyncio.new_event_loop()
+    for line in sys.stdin:
+        request = json.loads(line)
+        try:
+            result = run_request(request, cache, loop)
+        except BaseException as e:  # MemoryError, SystemExit from a skill
+            result = f"Skill '{request.get('name')}' failed: {e!r}"
+        replies.write(json.dumps({"id": request["id"], "result": result}) + "\n")
+        replies.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Tool result cache — reuse recent web results across sessions and sub-agents.
+
+``ToolResultCache.wrap`` returns copies of LangChain tools whose results are
+cached by tool name and arguments. Only tools with a TTL in ``ttls`` are
+cached, and the tools in ``NEVER_CACHE`` (side effects) never are, whatever
+the configuration says. Entries live in a size-bounded in-memory LRU and,
+after ``initialize``, in an optional SQLite tier that survives restarts.
+Identical calls that are already in flight share one execution.
+
+Per-tool hit and miss counts are kept in ``stats``; ``report`` formats them
+for the monitoring channel.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import aiosqlite
+from langchain_core.tools import BaseTool, StructuredTool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTLS = {
+    "web_search": 600.0,
+    "scrape_url": 900.0,
+    "http_request": 300.0,
+}
+
+# Tools with side effects; caching them would skip the effect
+NEVER_CACHE = frozenset({"shell_exec", "file_write", "create_skill", "dispatch_skill"})
+
+# Failure messages the tools return instead of raising
+_FAILURE_PREFIXES = ("Error", "Search failed:", "Scrape failed:")
+
+
+@dataclass
+class ToolCacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ToolResultCache:
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        *,
+        ttls: dict[str, float] | None = None,
+        max_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.db_path = db_path
+        ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.ttls = {name: ttl for name, ttl in ttls.items() if name not in NEVER_CACHE}
+        self.max_bytes = max_bytes
+        self.stats: dict[str, ToolCacheStats] = {}
+        self._db: aiosqlite.Connection | None = None
+        # key -> (expires_at, result); expiry is wall-clock so it survives restarts
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def initialize(self) -> None:
+        if self.db_path is None or self._db is not None:
+            return
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = await aiosqlite.connect(self.db_path)
+        await self._db.execute("""
+            CREATE TABLE IF NOT EXISTS tool_results (
+                key TEXT PRIMARY KEY,
+                tool TEXT NOT NULL,
+                result TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        await self._db.execute("DELETE FROM tool_results WHERE expires_at <= ?", (time.time(),))
+        await self._db.commit()
+
+    async def close(self) -> None:
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    def wrap(self, tools: list[BaseTool]) -> list[BaseTool]:
+        """Return ``tools`` with every cacheable one replaced by a caching copy."""
+        return [self._wrap_tool(t) if t.name in self.ttls else t for t in tools]
+
+    def _wrap_tool(self, original: BaseTool) -> BaseTool:
+        async def cached(**kwargs) -> str:
+            return await self.get_or_call(
+                original.name, kwargs, lambda: original.ainvoke(kwargs),
+            )
+
+        return StructuredTool.from_function(
+            coroutine=cached,
+            name=original.name,
+            description=original.description,
+            args_schema=original.args_schema,
+        )
+
+    @staticmethod
+    def key(tool_name: str, args: dict) -> str:
+        return json.dumps([tool_name, args], sort_keys=True, default=str)
+
+    async def get_or_call(
+        self, tool_name: str, args: dict, call: Callable[[], Awaitable[str]],
+    ) -> str:
+        """Return a fresh cached result, or run ``call`` and cache what it returns."""
+        stats = self.stats.setdefault(tool_name, ToolCacheStats())
+        key = self.key(tool_name, args)
+
+        result = self._get_memory(key)
+        if result is None:
+            result = await self._get_disk(key)
+            if result is not None:
+                stats.disk_hits += 1
+        if result is not None:
+            stats.hits += 1
+            return result
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            stats.hits += 1
+            return await asyncio.shield(inflight)
+
+        stats.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = str(await call())
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark it retrieved for when nobody else was waiting
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if not result.startswith(_FAILURE_PREFIXES) and "is not configured" not in result:
+                await self._put(key, tool_name, result, time.time() + self.ttls[tool_name])
+            return result
+        finally:
+            del self._inflight[key]
+
+    def _get_memory(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.time():
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    async def _get_disk(self, key: str) -> str | None:
+        if self._db is None:
+            return None
+        try:
+            cursor = await self._db.execute(
+                "SELECT result, expires_at FROM tool_results WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            )
+            row = await cursor.fetchone()
+        except Exception:
+            logger.exception("Tool cache disk read failed")
+            return None
+        if row is None:
+            return None
+        result, expires_at = row
+        self._put_memory(key, result, expires_at)
+        return result
+
+    async def _put(self, key: str, tool_name: str, result: str, expires_at: float) -> None:
+        self._put_memory(key, result, expires_at)
+        if self._db is None:
+            return
+        try:
+            await self._db.execute(
+                "INSERT OR REPLACE INTO tool_results (key, tool, result, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, tool_name, result, expires_at),
+            )
+            await self._db.commit()
+        except Exception:
+            logger.exception("Tool cache disk write failed")
+
+    def _put_memory(self, key: str, result: str, expires_at: float) -> None:
+        size = len(result.encode())
+        if size > self.max_bytes:
+            return
+        self._evict(key)
+        self._entries[key] = (expires_at, result)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1].encode())
+
+    async def purge_expired(self) -> None:
+        """Drop expired entries from both tiers."""
+        now = time.time()
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            self._evict(key)
+        if self._db is not None:
+            await self._db.execute("DELETE FROM tool_results WHERE expires_at <= ?", (now,))
+            await self._db.commit()
+
+    def report(self) -> str:
+        """One line per tool with hits, misses and hit rate."""
+        if not self.stats:
+            return "No cacheable tool calls yet."
+        lines = []
+        for name, s in sorted(self.stats.items()):
+            lines.append(
+                f"`{name}`: {s.hits} hits ({s.disk_hits} from disk), "
+                f"{s.misses} misses, {s.hit_rate:.0%} hit rate"
+            )
+        lines.append(f"{len(self._entries)} entries, {self._bytes / 1024:.0f} KiB in memory")
+        return "\n".join(lines)
@@ -1,21 +1,39 @@
 """File system tools with safety checks."""
 
+import asyncio
 import logging
 from pathlib import Path
 
 from langchain_core.tools import tool
 
+from src.tools.reading import CHUNK_SIZE, CappedReader
+
 logger = logging.getLogger(__name__)
 
-MAX_READ_SIZE = 500_000  # 500KB
+MAX_READ_SIZE = 500_000  # 500KB per read
+
+
+def _read_range(p: Path, offset: int, length: int) -> str:
+    reader = CappedReader(length, start=offset)
+    with p.open("rb") as f:
+        f.seek(offset)
+        while chunk := f.read(CHUNK_SIZE):
+            if not reader.feed(chunk):
+                break
+    return reader.text()
 
 
 @tool
-async def file_read(path: str) -> str:
+async def file_read(path: str, offset: int = 0, length: int = MAX_READ_SIZE) -> str:
     """Read the contents of a file.
 
+    Large files are returned a page at a time; a truncated result says which
+    offset to pass to read the next page.
+
     Args:
         path: Absolute or relative path to the file to read.
+        offset: Byte offset to start reading from.
+        length: Maximum number of bytes to read (at most 500KB).
     """
     try:
         p = Path(path)
@@ -23,10 +41,10 @@ async def file_read(path: str) -> str:
             return f"Error: File not found: {path}"
         if not p.is_file():
             return f"Error: Not a file: {path}"
-        content = p.read_text()
-        if len(content) > MAX_READ_SIZE:
-            content = content[:MAX_READ_SIZE] + "\n[Truncated]"
-        return content
+        if offset < 0 or length <= 0:
+            return "Error: offset must be >= 0 and length > 0"
+        length = min(length, MAX_READ_SIZE)
+        return await asyncio.to_thread(_read_range, p, offset, length)
     except Exception as e:
         return f"Error reading file: {e}"
 
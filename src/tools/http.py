@@ -0,0 +1,100 @@
+"""Application-scoped HTTP clients shared by the web tools.
+
+Building an ``aiohttp.ClientSession`` or an ``AsyncFirecrawl`` client per
+tool call pays for a new connection pool, DNS lookup and TLS handshake
+every time. ``HttpClients`` owns one of each for the life of the bot. The
+aiohttp connector keeps connections alive, caches DNS answers and limits
+connections in total and per host. ``main`` installs the registry with
+``set_http_clients`` and closes it on shutdown. Anything that runs without
+one (scripts, tests) gets a default built from ``Settings`` on first use.
+"""
+
+import asyncio
+import logging
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClients:
+    def __init__(
+        self,
+        *,
+        firecrawl_api_key: str | None = None,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        dns_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+    ):
+        self.firecrawl_api_key = firecrawl_api_key
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self._session: aiohttp.ClientSession | None = None
+        self._session_loop: asyncio.AbstractEventLoop | None = None
+        self._firecrawl = None
+
+    async def session(self) -> aiohttp.ClientSession:
+        """The shared aiohttp session, created on first use.
+
+        A session is tied to the event loop it was created on, so a new one
+        is made if the loop has changed (repeated ``asyncio.run`` calls).
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+        return self._session
+
+    def firecrawl(self):
+        """The shared async Firecrawl client, or None if no API key is configured."""
+        if self._firecrawl is None:
+            if not self.firecrawl_api_key:
+                logger.warning("FIRECRAWL_API_KEY not set")
+                return None
+            from firecrawl import AsyncFirecrawl
+            self._firecrawl = AsyncFirecrawl(api_key=self.firecrawl_api_key)
+        return self._firecrawl
+
+    async def close(self) -> None:
+        if (
+            self._session is not None and not self._session.closed
+            and self._session_loop is asyncio.get_running_loop()
+        ):
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+        # AsyncFirecrawl has no public close; its pooled httpx client is
+        # released with the object
+        self._firecrawl = None
+
+
+_clients: HttpClients | None = None
+
+
+def set_http_clients(clients: HttpClients | None) -> None:
+    global _clients
+    _clients = clients
+
+
+def get_http_clients() -> HttpClients:
+    """The installed registry, or a default one built from Settings once."""
+    global _clients
+    if _clients is None:
+        api_key = None
+        try:
+            from src.settings import Settings
+            key = Settings().firecrawl_api_key
+            api_key = key.get_secret_value() if key is not None else None
+        except Exception:
+            logger.exception("Failed to load settings for HTTP clients")
+        _clients = HttpClients(firecrawl_api_key=api_key)
+    return _clients
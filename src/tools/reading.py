@@ -0,0 +1,57 @@
+"""Bounded, incremental reading for tools that return file or HTTP bodies.
+
+``CappedReader`` is fed raw byte chunks as they arrive and decodes them
+incrementally, keeping at most ``limit`` bytes after skipping the first
+``skip``. Callers stop reading as soon as ``feed`` returns False, so a
+multi-gigabyte file or download costs no more memory than the cap. When
+the cap is hit, ``next_offset`` is where the following page starts. It
+never points into the middle of a multi-byte character.
+"""
+
+import codecs
+
+CHUNK_SIZE = 64 * 1024
+
+
+class CappedReader:
+    def __init__(self, limit: int, *, skip: int = 0, encoding: str = "utf-8", start: int = 0):
+        self.limit = limit
+        self.skip = skip
+        # Absolute offset of the first byte kept, for next_offset
+        self.start = start + skip
+        try:
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError:
+            self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._parts: list[str] = []
+        self.consumed = 0
+        self.truncated = False
+
+    def feed(self, data: bytes) -> bool:
+        """Take the next chunk. Returns False once the cap is hit and reading should stop."""
+        if self.skip:
+            skipped = min(self.skip, len(data))
+            data = data[skipped:]
+            self.skip -= skipped
+        room = self.limit - self.consumed
+        if len(data) > room:
+            data = data[:room]
+            self.truncated = True
+        self.consumed += len(data)
+        self._parts.append(self._decoder.decode(data))
+        return not self.truncated
+
+    @property
+    def next_offset(self) -> int:
+        # Bytes of a character split by the cap stay in the decoder; the next
+        # page starts with them
+        pending = len(self._decoder.getstate()[0])
+        return self.start + self.consumed - pending
+
+    def text(self) -> str:
+        """The decoded text, with a note on how to continue if it was cut off."""
+        if self.truncated:
+            return "".join(self._parts) + (
+                f"\n[Truncated: pass offset={self.next_offset} to read more]"
+            )
+        return "".join(self._parts) + self._decoder.decode(b"", final=True)
@@ -76,9 +76,8 @@ def create_skill_author_tool(*, skills_dir: Path, registry: SkillRegistry):
             # Write code
             (skill_dir / "tool.py").write_text(code)
 
-            # Reload registry to pick up the new skill
-            builtin_dir = Path(__file__).parent.parent / "skills" / "builtin"
-            registry.reload(builtin_dir, skills_dir)
+            # Register just the new skill
+            registry.refresh(skill_dir)
 
             logger.info("Created new skill: %s", name)
             return (
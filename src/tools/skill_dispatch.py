@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
-import importlib.util
 import logging
 from typing import TYPE_CHECKING
 
 from langchain_core.tools import tool
 
+from src.skills.modules import SkillModuleCache
+
 if TYPE_CHECKING:
+    from src.skills.index import SkillIndex
+    from src.skills.pool import SkillWorkerPool
     from src.skills.registry import SkillRegistry
 
 logger = logging.getLogger(__name__)
@@ -28,14 +31,30 @@ RESTRICTED_TOOLS = {"shell_exec"}
 # (enforced at dispatch time via wrapper)
 SANDBOXED_TOOLS = {"file_write"}
 
+# Used when the caller doesn't supply a cache; memory only
+_default_modules = SkillModuleCache()
+
 
-def create_dispatch_skill_tool(*, registry: SkillRegistry, llm, available_tools: list):
+def create_dispatch_skill_tool(
+    *,
+    registry: SkillRegistry,
+    llm,
+    available_tools: list,
+    module_cache: SkillModuleCache | None = None,
+    workers: SkillWorkerPool | None = None,
+    skill_index: SkillIndex | None = None,
+):
     """Factory: create a dispatch_skill @tool closure bound to a registry and LLM.
 
     Args:
         registry: The skill registry to look up skills.
         llm: The LLM instance for sub-agent execution.
         available_tools: The full list of available tool objects.
+        module_cache: Cache for dynamic skill modules run in-process.
+        workers: Worker pool to run dynamic skills out of process. When
+            given, ``module_cache`` is unused; each worker keeps its own.
+        skill_index: Used to suggest close matches for an unknown skill
+            name instead of listing every skill.
     """
     tool_map = {t.name: t for t in available_tools}
 
@@ -47,10 +66,21 @@ def create_dispatch_skill_tool(*, registry: SkillRegistry, llm, available_tools:
             skill_name: The name of the skill to invoke (from the skill index).
             input_text: The input text/query to pass to the skill.
         """
-        manifest = registry.get(skill_name)
+        manifest = registry.find(skill_name)
         if manifest is None:
+            if skill_index is not None:
+                try:
+                    similar = [s.name for s in await skill_index.search(skill_name)]
+                except Exception:
+                    logger.exception("Skill search failed for '%s'", skill_name)
+                else:
+                    return (
+                        f"Unknown skill '{skill_name}'. "
+                        f"Closest matches: {', '.join(similar) or 'none'}"
+                    )
             available = [s.name for s in registry.all_skills()]
             return f"Unknown skill '{skill_name}'. Available: {', '.join(available) or 'none'}"
+        skill_name = manifest.name
 
         # Filter tools by manifest permissions
         permitted_tools = _filter_tools(manifest, tool_map)
@@ -59,7 +89,7 @@ def create_dispatch_skill_tool(*, registry: SkillRegistry, llm, available_tools:
         if skill_name in BUILTIN_RUNNERS:
             return await _run_builtin(skill_name, input_text, llm, permitted_tools)
         else:
-            return await _run_dynamic_skill(manifest, input_text)
+            return await _run_dynamic_skill(manifest, input_text, module_cache, workers)
 
     return dispatch_skill
 
@@ -110,18 +140,32 @@ async def _run_builtin(skill_name: str, input_text: str, llm, tools: list) -> st
         return f"Skill '{skill_name}' failed: {e}"
 
 
-async def _run_dynamic_skill(manifest, input_text: str) -> str:
-    """Run a user/agent-authored dynamic skill by importing its entry point."""
+async def _run_dynamic_skill(
+    manifest,
+    input_text: str,
+    module_cache: SkillModuleCache | None = None,
+    workers: SkillWorkerPool | None = None,
+) -> str:
+    """Run a user/agent-authored dynamic skill by importing its entry point.
+
+    The module is reused across calls until its file changes. With
+    ``workers`` the skill runs in a worker process instead of this one.
+    """
     entry = manifest.path / manifest.entry_point
     if not entry.exists():
         return f"Skill '{manifest.name}' entry point not found: {entry}"
 
+    if workers is not None:
+        try:
+            return await workers.run(
+                manifest.name, manifest.path, manifest.entry_point, input_text,
+            )
+        except Exception as e:
+            logger.exception("Skill worker pool failed running '%s'", manifest.name)
+            return f"Skill '{manifest.name}' failed: {e}"
+
     try:
-        spec = importlib.util.spec_from_file_location(
-            f"skill_{manifest.name}", str(entry)
-        )
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        module = (module_cache or _default_modules).load(manifest.name, entry)
     except Exception as e:
         logger.exception("Failed to load dynamic skill '%s'", manifest.name)
         return f"Failed to load skill '{manifest.name}': {e}"
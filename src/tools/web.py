@@ -1,14 +1,21 @@
-"""Web research tools — search, fetch, and browse via Firecrawl."""
+"""Web research tools — search, fetch, and browse via Firecrawl.
+
+Connections come from the shared registry in ``src.tools.http``.
+"""
 
 import logging
 from urllib.parse import urlparse
 
+import aiohttp
 from langchain_core.tools import tool
 
+from src.tools.http import get_http_clients
+from src.tools.reading import CHUNK_SIZE, CappedReader
+
 logger = logging.getLogger(__name__)
 
 BLOCKED_PROTOCOLS = {"file", "ftp", "data", "javascript"}
-MAX_RESPONSE_SIZE = 100_000  # 100KB text limit
+MAX_RESPONSE_SIZE = 100_000  # 100KB per request
 
 
 def sanitize_url(url: str) -> str:
@@ -24,15 +31,9 @@ def sanitize_url(url: str) -> str:
 
 
 def _get_firecrawl_client():
-    """Get an async Firecrawl client, or None if not configured."""
+    """Get the shared async Firecrawl client, or None if not configured."""
     try:
-        from firecrawl import AsyncFirecrawl
-        from src.settings import Settings
-        settings = Settings()
-        if settings.firecrawl_api_key is None:
-            logger.warning("FIRECRAWL_API_KEY not set")
-            return None
-        return AsyncFirecrawl(api_key=settings.firecrawl_api_key.get_secret_value())
+        return get_http_clients().firecrawl()
     except Exception:
         logger.exception("Failed to create Firecrawl client")
         return None
@@ -95,24 +96,40 @@ async def scrape_url(url: str) -> str:
 
 
 @tool
-async def http_request(url: str) -> str:
+async def http_request(url: str, offset: int = 0, length: int = MAX_RESPONSE_SIZE) -> str:
     """Fetch raw content from a URL (no rendering or markdown conversion).
 
     Use scrape_url for clean content. This is for raw HTTP when needed.
+    Large bodies are returned a page at a time; a truncated result says
+    which offset to pass to read the next page.
 
     Args:
         url: The URL to fetch. Must be http or https.
+        offset: Byte offset into the body to start from.
+        length: Maximum number of bytes to return (at most 100KB).
     """
-    import aiohttp
-
+    if offset < 0 or length <= 0:
+        return "Error: offset must be >= 0 and length > 0"
+    length = min(length, MAX_RESPONSE_SIZE)
     url = sanitize_url(url)
-    async with aiohttp.ClientSession() as session:
-        async with session.get(
-            url,
-            max_redirects=5,
-            timeout=aiohttp.ClientTimeout(total=30),
-        ) as response:
-            text = await response.text()
-            if len(text) > MAX_RESPONSE_SIZE:
-                text = text[:MAX_RESPONSE_SIZE] + "\n[Truncated]"
-            return text
+    # Ask for one byte past the page so a full page can be told from the end
+    headers = {"Range": f"bytes={offset}-{offset + length}"} if offset else None
+    session = await get_http_clients().session()
+    async with session.get(
+        url,
+        headers=headers,
+        max_redirects=5,
+        timeout=aiohttp.ClientTimeout(total=30),
+    ) as response:
+        if response.status == 416:
+            return f"Error: offset {offset} is past the end of the content"
+        # Servers that ignore Range send the whole body; skip to the offset
+        skip = offset if response.status != 206 else 0
+        reader = CappedReader(
+            length, skip=skip, encoding=response.charset or "utf-8",
+            start=offset - skip,
+        )
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            if not reader.feed(chunk):
+                break
+        return reader.text()
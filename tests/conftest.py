@@ -1 +1,29 @@
 """Shared test fixtures."""
+
+import hashlib
+import math
+import re
+
+import pytest
+
+
+class HashingEmbedding:
+    """Offline bag-of-words embedding so vector tests don't download a model."""
+
+    dims = 64
+
+    def __call__(self, input):
+        vectors = []
+        for text in input:
+            vec = [0.0] * self.dims
+            for word in re.findall(r"\w+", text.lower()):
+                digest = hashlib.md5(word.encode()).digest()
+                vec[digest[0] % self.dims] += 1.0
+            norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+            vectors.append([v / norm for v in vec])
+        return vectors
+
+
+@pytest.fixture
+def hashing_embedding():
+    return HashingEmbedding()
@@ -1,10 +1,12 @@
 """Tests for cross-session context injection."""
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from src.agent.core import CoreAgent
+from src.memory.backfill import message_doc_id
 from src.memory.vector import VectorMemory
 from src.memory.operational import OperationalMemory
 
@@ -75,6 +77,8 @@ async def test_agent_indexes_messages(mock_llm, vector_memory):
     )
 
     await agent.invoke(session_id="dm-1", user_message="I love sushi", user_name="Alice")
+    await agent.drain_indexing()
+    await vector_memory.drain()
 
     # The message should now be searchable
     results = vector_memory.search("sushi", k=1)
@@ -87,3 +91,173 @@ async def test_agent_works_without_memory(mock_llm):
     agent = CoreAgent(llm=mock_llm, system_prompt="Be helpful")
     result = await agent.invoke(session_id="dm-1", user_message="Hi", user_name="Alice")
     assert result == "Response"
+
+
+@pytest.mark.asyncio
+async def test_agent_uses_async_vector_api(mock_llm):
+    vm = MagicMock()
+    vm.asearch = AsyncMock(return_value=[{"text": "Alice likes tea", "metadata": {}}])
+    vm.add_in_background = AsyncMock()
+
+    agent = CoreAgent(llm=mock_llm, system_prompt="Be helpful", vector_memory=vm)
+    await agent.invoke(session_id="dm-1", user_message="What does Alice drink?", user_name="Bob")
+    await agent.drain_indexing()
+
+    vm.asearch.assert_awaited_once()
+    vm.search.assert_not_called()
+    vm.add_in_background.assert_awaited_once()
+    vm.add.assert_not_called()
+    call_args = mock_llm.ainvoke.call_args[0][0]
+    assert "Alice likes tea" in " ".join(m.content for m in call_args)
+
+
+@pytest.mark.asyncio
+async def test_logged_message_indexed_under_backfill_id(mock_llm):
+    vm = MagicMock()
+    vm.asearch = AsyncMock(return_value=[])
+    vm.add_in_background = AsyncMock()
+    agent = CoreAgent(llm=mock_llm, system_prompt="Be helpful", vector_memory=vm)
+
+    row_id = asyncio.get_running_loop().create_future()
+    await agent.invoke(session_id="dm-1", user_message="Hi", user_name="Bob", message_id=row_id)
+    row_id.set_result(42)
+    await agent.drain_indexing()
+
+    kwargs = vm.add_in_background.await_args.kwargs
+    assert kwargs["doc_id"] == message_doc_id(42)
+    assert kwargs["metadata"]["message_id"] == 42
+
+
+@pytest.mark.asyncio
+async def test_unlogged_message_indexed_by_content(mock_llm):
+    vm = MagicMock()
+    vm.asearch = AsyncMock(return_value=[])
+    vm.add_in_background = AsyncMock()
+    agent = CoreAgent(llm=mock_llm, system_prompt="Be helpful", vector_memory=vm)
+
+    row_id = asyncio.get_running_loop().create_future()
+    row_id.set_exception(RuntimeError("disk full"))
+    await agent.invoke(session_id="dm-1", user_message="Hi", user_name="Bob", message_id=row_id)
+    await agent.drain_indexing()
+
+    assert vm.add_in_background.await_args.kwargs["doc_id"] is None
+
+
+@pytest.mark.asyncio
+async def test_system_prompt_cached_between_turns(mock_llm, opmem):
+    agent = CoreAgent(llm=mock_llm, system_prompt="Be helpful", operational_memory=opmem)
+    await agent.invoke(session_id="dm-1", user_message="Hello", user_name="Alice")
+    await agent.invoke(session_id="dm-1", user_message="Again", user_name="Alice")
+    assert agent.prompt_cache_stats.rebuilds == 1
+    assert agent.prompt_cache_stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_does_no_disk_io(mock_llm, opmem, monkeypatch):
+    agent = CoreAgent(llm=mock_llm, system_prompt="Be helpful", operational_memory=opmem)
+    agent._build_system_prompt()
+    monkeypatch.setattr(opmem, "read_all", lambda: pytest.fail("read on cache hit"))
+    monkeypatch.setattr(
+        "src.agent.core._file_signature", lambda p: pytest.fail("stat on cache hit"),
+    )
+    agent._build_system_prompt()
+    assert agent.prompt_cache_stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_operational_memory_write_invalidates_prompt(mock_llm, opmem):
+    agent = CoreAgent(llm=mock_llm, system_prompt="Be helpful", operational_memory=opmem)
+    agent._build_system_prompt()
+    opmem.append_safety_rule("Never visit badsite.com")
+    assert "badsite.com" in agent._build_system_prompt()
+    assert agent.prompt_cache_stats.rebuilds == 2
+
+
+@pytest.mark.asyncio
+async def test_hand_edited_files_invalidate_prompt(mock_llm, opmem, tmp_path):
+    soul = tmp_path / "SOUL.md"
+    soul.write_text("Original soul")
+    agent = CoreAgent(
+        llm=mock_llm, system_prompt="unused", soul_path=soul,
+        operational_memory=opmem, prompt_stat_interval=0,
+    )
+    assert agent._build_system_prompt().startswith("Original soul")
+
+    soul.write_text("Edited soul, longer")
+    assert agent._build_system_prompt().startswith("Edited soul, longer")
+
+    opmem.preferences_path.write_text("# Preferences\n\n- terse replies please\n")
+    assert "terse replies" in agent._build_system_prompt()
+    assert agent.prompt_cache_stats.rebuilds == 3
+
+
+@pytest.mark.asyncio
+async def test_skill_registry_change_invalidates_prompt(mock_llm):
+    from pathlib import Path
+
+    from src.skills.loader import SkillManifest
+    from src.skills.registry import SkillRegistry
+
+    registry = SkillRegistry()
+    agent = CoreAgent(llm=mock_llm, system_prompt="Be helpful", skill_registry=registry)
+    assert "weather" not in agent._build_system_prompt()
+    registry.register(SkillManifest(
+        name="weather", description="Weather", trigger="weather questions",
+        permissions=[], entry_point="tool.py", author="human", trusted=True,
+        created="2026-01-01", path=Path("/tmp/weather"),
+    ))
+    assert "weather" in agent._build_system_prompt()
+
+
+@pytest.mark.asyncio
+async def test_skill_index_lists_only_relevant_skills(mock_llm):
+    from pathlib import Path
+
+    from src.skills.index import SkillIndex
+    from src.skills.loader import SkillManifest
+    from src.skills.registry import SkillRegistry
+
+    registry = SkillRegistry()
+    for name, trigger in [("forecast", "weather"), ("ticker", "stock prices")]:
+        registry.register(SkillManifest(
+            name=name, description=name, trigger=trigger, permissions=[],
+            entry_point="tool.py", author="human", trusted=True,
+            created="2026-01-01", path=Path(f"/tmp/{name}"),
+        ))
+    index = SkillIndex(
+        registry,
+        lambda texts: [[float("weather" in t), float("stock" in t)] for t in texts],
+        top_k=1,
+    )
+    agent = CoreAgent(
+        llm=mock_llm, system_prompt="Be helpful", skill_registry=registry, skill_index=index,
+    )
+
+    await agent.invoke(session_id="s", user_message="what's the weather?", user_name="u")
+
+    system = mock_llm.ainvoke.call_args[0][0][0].content
+    assert "**forecast**" in system
+    assert "**ticker**" not in system
+    assert "forecast" not in agent._build_system_prompt()
+
+
+@pytest.mark.asyncio
+async def test_reply_does_not_wait_for_indexing(mock_llm):
+    import asyncio
+
+    vm = MagicMock()
+    vm.asearch = AsyncMock(return_value=[])
+    stuck = asyncio.Event()
+
+    async def blocked_add(**kwargs):
+        await stuck.wait()
+
+    vm.add_in_background = blocked_add
+    agent = CoreAgent(llm=mock_llm, system_prompt="Be helpful", vector_memory=vm)
+
+    result = await asyncio.wait_for(
+        agent.invoke(session_id="dm-1", user_message="hello", user_name="Bob"), 1,
+    )
+    assert result == "Response"
+    stuck.set()
+    await agent.drain_indexing()
@@ -0,0 +1,105 @@
+"""Tests for token-budgeted context assembly."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from src.agent.context import ContextAssembler, ContextBudget, estimate_tokens
+from src.agent.core import CoreAgent
+
+
+def _assembler(**budget):
+    return ContextAssembler(ContextBudget(**budget))
+
+
+def test_under_budget_is_unchanged():
+    history = [HumanMessage(content="hi"), AIMessage(content="hello")]
+    messages = _assembler().assemble(system_prompt="sys", retrieved=["a fact"], history=history)
+    assert [m.content for m in messages] == [
+        "sys", "[Retrieved context]:\n- a fact", "hi", "hello",
+    ]
+
+
+def test_largest_message_is_truncated_first():
+    pasted = "x" * 40_000
+    history = [
+        HumanMessage(content="small question"),
+        HumanMessage(content=pasted),
+        AIMessage(content="short answer"),
+        HumanMessage(content="latest"),
+    ]
+    assembler = _assembler(max_tokens=2_000)
+    messages = assembler.assemble(system_prompt="sys", retrieved=[], history=history)
+
+    assert assembler.history_tokens(messages) <= 2_000
+    assert [m.content for m in messages if m.content != messages[2].content] == [
+        "sys", "small question", "short answer", "latest",
+    ]
+    assert "truncated" in messages[2].content
+    # The session itself is untouched
+    assert history[1].content == pasted
+
+
+def test_oldest_messages_dropped_once_all_are_small():
+    history = [HumanMessage(content=f"message {i} " + "y" * 700) for i in range(20)]
+    assembler = _assembler(max_tokens=1_500, min_message_tokens=200)
+    messages = assembler.fit([SystemMessage(content="sys")] + history)
+
+    assert assembler.history_tokens(messages) <= 1_500
+    assert messages[0].content == "sys"
+    assert messages[-1].content.startswith("message 19")
+    assert not any(m.content.startswith("message 0 ") for m in messages)
+
+
+def test_retrieved_context_respects_its_share():
+    retrieved = [f"fact {i} " + "z" * 400 for i in range(10)]
+    messages = _assembler(retrieved_tokens=250).assemble(
+        system_prompt="sys", retrieved=retrieved, history=[HumanMessage(content="q")],
+    )
+    block = messages[1].content
+    assert "fact 1 " in block and "fact 2 " not in block
+
+
+def test_tool_pairs_are_never_dropped():
+    call = AIMessage(content="", tool_calls=[{"name": "t", "args": {}, "id": "c1"}])
+    messages = [
+        SystemMessage(content="sys"),
+        HumanMessage(content="old " * 500),
+        call,
+        ToolMessage(content="r" * 20_000, tool_call_id="c1"),
+        HumanMessage(content="now"),
+    ]
+    fitted = _assembler(max_tokens=800).fit(messages)
+    assert call in fitted
+    assert any(isinstance(m, ToolMessage) and len(m.content) < 20_000 for m in fitted)
+
+
+def test_pluggable_tokenizer():
+    words = ContextAssembler(count_tokens=lambda text: len(text.split()))
+    assert words.message_tokens(HumanMessage(content="one two three")) == 3 + 4
+    assert estimate_tokens("abcd" * 10) == 10
+
+
+def test_fit_tool_result_caps_large_output():
+    text = _assembler(tool_result_tokens=100).fit_tool_result("w" * 100_000)
+    assert estimate_tokens(text) <= 100
+
+
+@pytest.mark.asyncio
+async def test_agent_prompt_is_bounded_and_large_sessions_compact():
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=MagicMock(content="ok"))
+    agent = CoreAgent(
+        llm=llm, system_prompt="System",
+        context=_assembler(max_tokens=3_000, history_tokens=2_000),
+    )
+
+    await agent.invoke(session_id="dm-1", user_message="log: " + "e" * 50_000, user_name="A")
+    sent = llm.ainvoke.call_args_list[0][0][0]
+    assert agent.context.history_tokens(sent) <= 3_000
+
+    await agent.drain_compactions()
+    # One oversized message crosses the token limit despite the low count
+    summary_calls = [c for c in llm.ainvoke.call_args_list if "Summarize" in c[0][0][0].content]
+    assert len(summary_calls) == 1
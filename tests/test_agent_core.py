@@ -1,12 +1,13 @@
 """Tests for the LangGraph-based core agent."""
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from openai import AuthenticationError, RateLimitError, APIConnectionError, APIStatusError
 from httpx import Response, Request
 
-from src.agent.core import CoreAgent, LLMProviderError
+from src.agent.core import CoreAgent, LLMProviderError, SessionBusyError
 
 
 @pytest.fixture
@@ -68,6 +69,7 @@ async def test_agent_compacts_long_sessions():
 
     for i in range(12):
         await agent.invoke(session_id="dm-1", user_message=f"Msg {i}", user_name="Alice")
+    await agent.drain_compactions()
 
     session = agent._get_session("dm-1")
     # 12 human + 12 AI = 24 without compaction, should be compacted
@@ -143,3 +145,285 @@ async def test_server_error_raises_recoverable():
         await agent.invoke(session_id="dm-1", user_message="Hi", user_name="Alice")
 
     assert exc_info.value.recoverable
+
+
+def _gated_llm():
+    """LLM whose first call blocks until the returned event is set."""
+    gate = asyncio.Event()
+    calls = []
+
+    async def ainvoke(messages):
+        calls.append(messages)
+        n = len(calls)
+        if n == 1:
+            await gate.wait()
+        return MagicMock(content=f"reply {n}")
+
+    llm = MagicMock()
+    llm.ainvoke = ainvoke
+    return llm, gate, calls
+
+
+@pytest.mark.asyncio
+async def test_messages_during_a_turn_are_coalesced():
+    llm, gate, calls = _gated_llm()
+    agent = CoreAgent(llm=llm, system_prompt="System")
+
+    first = asyncio.create_task(agent.invoke(
+        session_id="channel-1", user_message="one", user_name="A",
+    ))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(agent.invoke(
+        session_id="channel-1", user_message="two", user_name="B",
+    ))
+    third = asyncio.create_task(agent.invoke(
+        session_id="channel-1", user_message="three", user_name="C",
+    ))
+    await asyncio.sleep(0)
+    gate.set()
+
+    assert await asyncio.gather(first, second, third) == ["reply 1", "", "reply 2"]
+    assert len(calls) == 2
+    second_turn = " ".join(m.content for m in calls[1])
+    assert "[B]: two" in second_turn and "[C]: three" in second_turn
+    assert [m.content for m in agent._get_session("channel-1")] == [
+        "[A]: one", "reply 1", "[B]: two", "[C]: three", "reply 2",
+    ]
+    assert agent._lanes == {}
+
+
+@pytest.mark.asyncio
+async def test_sessions_do_not_block_each_other():
+    llm, gate, calls = _gated_llm()
+    agent = CoreAgent(llm=llm, system_prompt="System")
+
+    blocked = asyncio.create_task(agent.invoke(
+        session_id="channel-1", user_message="hi", user_name="A",
+    ))
+    await asyncio.sleep(0)
+    assert await agent.invoke(session_id="channel-2", user_message="hi", user_name="B") == "reply 2"
+    gate.set()
+    assert await blocked == "reply 1"
+
+
+@pytest.mark.asyncio
+async def test_full_session_queue_rejects_messages():
+    llm, gate, _ = _gated_llm()
+    agent = CoreAgent(llm=llm, system_prompt="System", max_queued_messages=1)
+
+    first = asyncio.create_task(agent.invoke(
+        session_id="channel-1", user_message="one", user_name="A",
+    ))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(agent.invoke(
+        session_id="channel-1", user_message="two", user_name="A",
+    ))
+    await asyncio.sleep(0)
+
+    with pytest.raises(SessionBusyError) as exc_info:
+        await agent.invoke(session_id="channel-1", user_message="three", user_name="A")
+    assert not isinstance(exc_info.value, LLMProviderError)
+
+    gate.set()
+    assert await asyncio.gather(first, queued) == ["reply 1", "reply 2"]
+
+
+@pytest.mark.asyncio
+async def test_failed_coalesced_turn_rolls_back_only_its_messages():
+    gate = asyncio.Event()
+    calls = 0
+
+    async def ainvoke(messages):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await gate.wait()
+            return MagicMock(content="ok")
+        raise APIConnectionError(request=Request("POST", "https://api.minimax.io/v1"))
+
+    llm = MagicMock()
+    llm.ainvoke = ainvoke
+    agent = CoreAgent(llm=llm, system_prompt="System")
+
+    first = asyncio.create_task(agent.invoke(
+        session_id="channel-1", user_message="one", user_name="A",
+    ))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(agent.invoke(
+        session_id="channel-1", user_message="two", user_name="A",
+    ))
+    third = asyncio.create_task(agent.invoke(
+        session_id="channel-1", user_message="three", user_name="A",
+    ))
+    await asyncio.sleep(0)
+    gate.set()
+
+    assert await first == "ok"
+    assert await second == ""
+    with pytest.raises(LLMProviderError):
+        await third
+    assert [m.content for m in agent._get_session("channel-1")] == ["[A]: one", "ok"]
+
+
+@pytest.mark.asyncio
+async def test_evicted_session_is_restored_for_next_turn(mock_llm, tmp_path):
+    from src.memory.sessions import SessionStore
+
+    store = SessionStore(tmp_path / "checkpoints.sqlite", max_sessions=1)
+    await store.initialize()
+    agent = CoreAgent(llm=mock_llm, system_prompt="System", session_store=store)
+
+    await agent.invoke(session_id="dm-1", user_message="My name is Alice", user_name="Alice")
+    await agent.invoke(session_id="dm-2", user_message="Hi", user_name="Bob")
+    assert store.stats.evicted == 1
+
+    await agent.invoke(session_id="dm-1", user_message="What's my name?", user_name="Alice")
+    sent = " ".join(m.content for m in mock_llm.ainvoke.call_args[0][0])
+    assert "My name is Alice" in sent
+    await store.close()
+
+
+def _slow_summary_llm():
+    """LLM that answers turns immediately but blocks summaries on an event."""
+    gate = asyncio.Event()
+    summaries = []
+
+    async def ainvoke(messages):
+        if "Summarize" in messages[0].content:
+            summaries.append(messages)
+            await gate.wait()
+            return MagicMock(content="summary")
+        return MagicMock(content="Response")
+
+    llm = MagicMock()
+    llm.ainvoke = ainvoke
+    return llm, gate, summaries
+
+
+@pytest.mark.asyncio
+async def test_compaction_runs_off_the_response_path():
+    llm, gate, summaries = _slow_summary_llm()
+    agent = CoreAgent(llm=llm, system_prompt="System", max_session_messages=10)
+
+    for i in range(6):
+        assert await agent.invoke(
+            session_id="dm-1", user_message=f"Msg {i}", user_name="A",
+        ) == "Response"
+    await asyncio.sleep(0)
+    # The threshold was crossed but the summary is still pending
+    assert len(summaries) == 1
+
+    # Turns keep going during compaction without starting a second one
+    await agent.invoke(session_id="dm-1", user_message="Msg 6", user_name="A")
+    await asyncio.sleep(0)
+    assert len(summaries) == 1
+
+    gate.set()
+    await agent.drain_compactions()
+    session = agent._get_session("dm-1")
+    assert session[0].content == "[Conversation summary]: summary"
+    # Messages added while summarizing are kept
+    assert session[-2].content == "[A]: Msg 6"
+    assert len(session) == 1 + 10 + 2
+
+
+@pytest.mark.asyncio
+async def test_scheduled_compaction_runs_ahead_of_the_threshold():
+    llm, gate, summaries = _slow_summary_llm()
+    gate.set()
+    agent = CoreAgent(llm=llm, system_prompt="System", max_session_messages=20)
+    for i in range(6):
+        await agent.invoke(session_id="dm-1", user_message=f"Msg {i}", user_name="A")
+    await agent.invoke(session_id="dm-2", user_message="Hi", user_name="B")
+    assert summaries == []
+
+    assert await agent.compact_sessions() == 1
+    assert agent._get_session("dm-1")[0].content == "[Conversation summary]: summary"
+    assert len(agent._get_session("dm-2")) == 2
+
+
+@pytest.mark.asyncio
+async def test_scheduled_compaction_leaves_session_recency_alone():
+    llm, gate, _ = _slow_summary_llm()
+    gate.set()
+    agent = CoreAgent(llm=llm, system_prompt="System", max_session_messages=20)
+    for i in range(6):
+        await agent.invoke(session_id="dm-1", user_message=f"Msg {i}", user_name="A")
+    await agent.invoke(session_id="dm-2", user_message="Hi", user_name="B")
+    last_used = dict(agent._sessions._last_used)
+
+    assert await agent.compact_sessions() == 1
+    # dm-1 was compacted but not used, so it is still first in line for eviction
+    assert agent._sessions.session_ids() == ["dm-1", "dm-2"]
+    assert agent._sessions._last_used == last_used
+
+
+@pytest.mark.asyncio
+async def test_tool_selector_binds_per_turn(mock_llm):
+    from src.agent.tool_selection import ToolSelector
+
+    web = MagicMock()
+    web.name = "web_search"
+    mock_llm.bind_tools = MagicMock(return_value=MagicMock(
+        ainvoke=AsyncMock(return_value=MagicMock(content="Found it", tool_calls=[])),
+    ))
+    agent = CoreAgent(
+        llm=mock_llm, system_prompt="You are helpful.", tools=[web],
+        tool_selector=ToolSelector(),
+    )
+
+    # Small talk goes out without any tool schemas
+    assert await agent.invoke(
+        session_id="s", user_message="hi there", user_name="u",
+    ) == "Hello!"
+    mock_llm.bind_tools.assert_not_called()
+    assert "## Tools" not in mock_llm.ainvoke.call_args[0][0][0].content
+
+    await agent.invoke(session_id="s", user_message="search the news", user_name="u")
+    mock_llm.bind_tools.assert_called_once_with([web])
+
+
+@pytest.mark.asyncio
+async def test_tools_used_in_a_turn_stay_bound_for_follow_ups():
+    from langchain_core.messages import AIMessage
+    from langchain_core.tools import tool
+
+    from src.agent.tool_selection import ToolSelector
+
+    @tool
+    async def shell_exec(command: str) -> str:
+        """Run a shell command.
+
+        Args:
+            command: The command to run.
+        """
+        return "42% used"
+
+    class FakeLLM:
+        def __init__(self):
+            self.responses = [
+                AIMessage(content="", tool_calls=[
+                    {"name": "shell_exec", "args": {"command": "df"}, "id": "c1"},
+                ]),
+                AIMessage(content="Disk is 42% full."),
+                AIMessage(content="The other one is fine."),
+            ]
+            self.prompts = []
+
+        def bind_tools(self, tools):
+            return self
+
+        async def ainvoke(self, messages):
+            self.prompts.append(messages[0].content)
+            return self.responses.pop(0)
+
+    llm = FakeLLM()
+    agent = CoreAgent(
+        llm=llm, system_prompt="You are helpful.", tools=[shell_exec],
+        tool_selector=ToolSelector(),
+    )
+
+    await agent.invoke(session_id="s", user_message="check disk usage", user_name="u")
+    await agent.invoke(session_id="s", user_message="and the other one?", user_name="u")
+
+    assert "shell_exec" in llm.prompts[-1]
@@ -6,6 +6,7 @@ import pytest
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langchain_core.tools import tool
 
+from src.agent.context import ContextAssembler, ContextBudget
 from src.agent.tool_loop import run_tool_loop
 
 
@@ -85,6 +86,36 @@ async def test_tool_call_executes_and_loops(tools):
     assert tool_msgs[0].content == "5"
 
 
+@pytest.mark.asyncio
+async def test_fitting_keeps_a_human_message_first(tools):
+    """Dropping the user's message to fit must not leave the tool call first."""
+    responses = [
+        _make_ai_with_tool_calls([{
+            "name": "add_numbers",
+            "args": {"a": 2, "b": 3},
+            "id": "call_1",
+        }]),
+        _make_final_ai("The sum is 5"),
+    ]
+    calls = []
+
+    async def ainvoke(messages):
+        calls.append(list(messages))
+        return responses[len(calls) - 1]
+
+    llm = MagicMock()
+    llm.ainvoke = ainvoke
+    context = ContextAssembler(ContextBudget(max_tokens=60, min_message_tokens=100))
+
+    messages = [SystemMessage(content="sys"), HumanMessage(content="please add these " * 40)]
+    await run_tool_loop(llm=llm, messages=messages, tools=tools, context=context)
+
+    second_call = calls[1]
+    assert isinstance(second_call[0], SystemMessage)
+    assert isinstance(second_call[1], HumanMessage)
+    assert isinstance(second_call[-1], ToolMessage)
+
+
 @pytest.mark.asyncio
 async def test_multiple_tool_calls_in_one_response(tools):
     """LLM requests multiple tool calls in a single response."""
@@ -278,3 +309,194 @@ async def test_minimax_xml_tool_call_with_real_tool_available(tools):
 
     assert result.content == "The sum is 5"
     assert llm.ainvoke.call_count == 3
+
+
+def _timed_tools(log):
+    """Tools that record start/end events around a short sleep."""
+    import asyncio
+
+    @tool
+    async def web_search(query: str) -> str:
+        """Search the web.
+
+        Args:
+            query: Search query.
+        """
+        log.append(("start", query))
+        await asyncio.sleep(0.05)
+        log.append(("end", query))
+        return f"results for {query}"
+
+    @tool
+    async def shell_exec(command: str) -> str:
+        """Run a shell command.
+
+        Args:
+            command: Command to run.
+        """
+        log.append(("start", command))
+        await asyncio.sleep(0.01)
+        log.append(("end", command))
+        return f"ran {command}"
+
+    return [web_search, shell_exec]
+
+
+@pytest.mark.asyncio
+async def test_independent_tool_calls_run_concurrently():
+    import time
+
+    log = []
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(side_effect=[
+        _make_ai_with_tool_calls([
+            {"name": "web_search", "args": {"query": f"q{i}"}, "id": f"call_{i}"}
+            for i in range(3)
+        ]),
+        _make_final_ai("Done"),
+    ])
+
+    started = time.perf_counter()
+    await run_tool_loop(llm=llm, messages=[HumanMessage(content="go")], tools=_timed_tools(log))
+    assert time.perf_counter() - started < 0.14
+    # All three started before any finished
+    assert [event for event, _ in log[:3]] == ["start"] * 3
+
+    tool_msgs = [m for m in llm.ainvoke.call_args_list[1][0][0] if isinstance(m, ToolMessage)]
+    assert [m.tool_call_id for m in tool_msgs] == ["call_0", "call_1", "call_2"]
+    assert [m.content for m in tool_msgs] == ["results for q0", "results for q1", "results for q2"]
+
+
+@pytest.mark.asyncio
+async def test_serial_class_runs_in_issue_order():
+    log = []
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(side_effect=[
+        _make_ai_with_tool_calls([
+            {"name": "shell_exec", "args": {"command": "first"}, "id": "call_1"},
+            {"name": "web_search", "args": {"query": "web"}, "id": "call_2"},
+            {"name": "shell_exec", "args": {"command": "second"}, "id": "call_3"},
+        ]),
+        _make_final_ai("Done"),
+    ])
+
+    await run_tool_loop(llm=llm, messages=[HumanMessage(content="go")], tools=_timed_tools(log))
+
+    shell_events = [entry for entry in log if entry[1] != "web"]
+    assert shell_events == [
+        ("start", "first"), ("end", "first"), ("start", "second"), ("end", "second"),
+    ]
+    # The web call overlapped the shell calls
+    assert log.index(("start", "web")) < log.index(("end", "first"))
+
+
+@pytest.mark.asyncio
+async def test_turn_concurrency_limit():
+    log = []
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(side_effect=[
+        _make_ai_with_tool_calls([
+            {"name": "web_search", "args": {"query": f"q{i}"}, "id": f"call_{i}"}
+            for i in range(4)
+        ]),
+        _make_final_ai("Done"),
+    ])
+
+    await run_tool_loop(
+        llm=llm, messages=[HumanMessage(content="go")], tools=_timed_tools(log),
+        max_concurrency=2,
+    )
+
+    running = peak = 0
+    for event, _ in log:
+        running += 1 if event == "start" else -1
+        peak = max(peak, running)
+    assert peak == 2
+
+
+def _streaming_llm(*responses):
+    """LLM whose astream yields the given chunk lists, one list per call."""
+    from langchain_core.messages import AIMessageChunk
+
+    calls = iter(responses)
+
+    def astream(messages):
+        chunks = next(calls)
+
+        async def gen():
+            for chunk in chunks:
+                yield chunk if isinstance(chunk, AIMessageChunk) else AIMessageChunk(content=chunk)
+        return gen()
+
+    llm = MagicMock()
+    llm.astream = astream
+    return llm
+
+
+class _Sink:
+    def __init__(self):
+        self.events = []
+
+    async def send(self, text):
+        self.events.append(text)
+
+    async def reset(self):
+        self.events.append(None)
+
+
+@pytest.mark.parametrize("chunks", [
+    ["<think>plan</think>Hello ", "world"],
+    ["<thi", "nk>pl", "an</th", "ink>  Hello", " world"],
+    ["Hello <", "minimax:tool_call>x</minimax:tool_call", ">world"],
+])
+def test_stream_sanitizer_matches_batch_sanitizer(chunks):
+    from src.agent.tool_loop import StreamSanitizer, _sanitize_minimax_response
+
+    sanitizer = StreamSanitizer()
+    streamed = "".join(sanitizer.feed(c) for c in chunks) + sanitizer.flush()
+    assert streamed == _sanitize_minimax_response("".join(chunks))[0]
+
+
+def test_stream_sanitizer_holds_back_partial_tags():
+    from src.agent.tool_loop import StreamSanitizer
+
+    sanitizer = StreamSanitizer()
+    assert sanitizer.feed("a < b and <th") == "a < b and "
+    assert sanitizer.feed("ink>secret") == ""
+    assert sanitizer.feed("</think>c") == "c"
+
+
+@pytest.mark.asyncio
+async def test_final_turn_is_streamed(tools):
+    from langchain_core.messages import AIMessageChunk
+
+    llm = _streaming_llm(
+        [AIMessageChunk(content="", tool_call_chunks=[
+            {"name": "greet", "args": '{"name": "Bob"}', "id": "call_1", "index": 0},
+        ])],
+        ["<think>hmm</think>", "Hello", ", Bob!"],
+    )
+    sink = _Sink()
+
+    result = await run_tool_loop(
+        llm=llm, messages=[HumanMessage(content="greet bob")], tools=tools, stream=sink,
+    )
+
+    assert result.content == "Hello, Bob!"
+    # The tool-call turn showed nothing and was reset; the final turn streamed
+    assert sink.events == [None, "Hello", ", Bob!"]
+
+
+@pytest.mark.asyncio
+async def test_streamed_text_before_tool_call_is_reset(tools):
+    from langchain_core.messages import AIMessageChunk
+
+    llm = _streaming_llm(
+        ["Let me check", AIMessageChunk(content="", tool_call_chunks=[
+            {"name": "greet", "args": '{"name": "Al"}', "id": "call_1", "index": 0},
+        ])],
+        ["Done"],
+    )
+    sink = _Sink()
+    await run_tool_loop(llm=llm, messages=[HumanMessage(content="hi")], tools=tools, stream=sink)
+    assert sink.events == ["Let me check", None, "Done"]
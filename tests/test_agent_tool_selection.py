@@ -0,0 +1,66 @@
+"""Tests for per-turn tool selection."""
+
+from unittest.mock import MagicMock
+
+from src.agent.tool_selection import ToolSelector
+
+
+def _tools(*names):
+    tools = []
+    for name in names:
+        t = MagicMock()
+        t.name = name
+        tools.append(t)
+    return tools
+
+
+ALL = _tools("web_search", "scrape_url", "shell_exec", "file_read", "dispatch_skill", "custom")
+
+
+def _names(tools):
+    return [t.name for t in tools]
+
+
+def test_small_talk_binds_only_unruled_and_always_tools():
+    selected = ToolSelector().select(ALL, "hey, how are you doing?")
+    assert _names(selected) == ["dispatch_skill", "custom"]
+
+
+def test_message_keywords_select_tools():
+    selector = ToolSelector()
+    assert "web_search" in _names(selector.select(ALL, "search for the latest news"))
+    assert "scrape_url" in _names(selector.select(ALL, "summarize https://example.com/post"))
+    assert "shell_exec" in _names(selector.select(ALL, "check disk usage"))
+    assert "file_read" in _names(selector.select(ALL, "look at ~/notes/todo.md"))
+
+
+def test_recently_used_tools_stay_bound():
+    selector = ToolSelector(sticky_turns=2)
+    selector.record("s", {"shell_exec"})
+    assert "shell_exec" in _names(selector.select(ALL, "thanks, and the other one?", "s"))
+    assert "shell_exec" not in _names(selector.select(ALL, "thanks, and the other one?", "t"))
+
+    selector.record("s", set())
+    selector.record("s", set())
+    assert "shell_exec" not in _names(selector.select(ALL, "thanks, and the other one?", "s"))
+
+
+def test_bind_caches_per_tool_set():
+    llm = MagicMock()
+    selector = ToolSelector(max_bound=2)
+    a, b, c = _tools("a"), _tools("b"), _tools("c")
+
+    first = selector.bind(llm, a)
+    assert selector.bind(llm, a) is first
+    assert llm.bind_tools.call_count == 1
+
+    selector.bind(llm, b)
+    selector.bind(llm, c)  # evicts "a"
+    selector.bind(llm, a)
+    assert llm.bind_tools.call_count == 4
+
+
+def test_bind_without_tools_returns_plain_llm():
+    llm = MagicMock()
+    assert ToolSelector().bind(llm, []) is llm
+    llm.bind_tools.assert_not_called()
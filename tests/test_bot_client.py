@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from src.agent.core import SessionBusyError
 from src.bot.client import AssistantBot
 
 
@@ -83,3 +84,53 @@ async def test_on_message_ignores_ignored_channel(bot):
 
     await bot.on_message(msg)
     callback.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_streamed_reply_is_not_sent_twice(bot):
+    bot._user = MagicMock()
+    bot._user.id = 999
+
+    msg = MagicMock()
+    msg.author.id = 123
+    msg.author.bot = False
+    msg.author.display_name = "Alice"
+    msg.content = "Hello"
+    msg.channel.type.name = "private"
+    msg.channel.name = None
+    msg.channel.send = AsyncMock(return_value=MagicMock(edit=AsyncMock()))
+    msg.mentions = []
+    msg.guild = None
+
+    async def callback(message, stream=None, message_id=None):
+        await stream.send("Hi ")
+        await stream.send("Alice!")
+        return "Hi Alice!"
+
+    bot._agent_callback = callback
+    await bot.on_message(msg)
+
+    msg.channel.send.assert_awaited_once_with("Hi ")
+    msg.channel.send.return_value.edit.assert_awaited_with(content="Hi Alice!")
+
+
+@pytest.mark.asyncio
+async def test_busy_session_gets_its_own_reply(bot):
+    bot._user = MagicMock()
+    bot._user.id = 999
+
+    msg = MagicMock()
+    msg.author.id = 123
+    msg.author.bot = False
+    msg.author.display_name = "Alice"
+    msg.content = "Hello"
+    msg.channel.type.name = "private"
+    msg.channel.name = None
+    msg.channel.send = AsyncMock()
+    msg.mentions = []
+    msg.guild = None
+
+    bot._agent_callback = AsyncMock(side_effect=SessionBusyError("Please wait for a reply."))
+    await bot.on_message(msg)
+
+    msg.channel.send.assert_awaited_once_with("Please wait for a reply.")
@@ -0,0 +1,76 @@
+"""Tests for progressive Discord replies."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.bot.streaming import MessageStreamer
+
+
+def _channel():
+    channel = MagicMock()
+    posted = []
+
+    async def send(content):
+        message = MagicMock()
+        message.content = content
+
+        async def edit(content):
+            message.content = content
+        message.edit = AsyncMock(side_effect=edit)
+        message.delete = AsyncMock()
+        posted.append(message)
+        return message
+
+    channel.send = AsyncMock(side_effect=send)
+    return channel, posted
+
+
+@pytest.mark.asyncio
+async def test_first_text_is_posted_immediately_and_edits_are_rate_limited():
+    channel, posted = _channel()
+    streamer = MessageStreamer(channel, edit_interval=60)
+
+    await streamer.send("Hel")
+    assert streamer.started
+    assert [m.content for m in posted] == ["Hel"]
+
+    await streamer.send("lo")
+    posted[0].edit.assert_not_called()
+
+    await streamer.finish("Hello")
+    assert [m.content for m in posted] == ["Hello"]
+
+
+@pytest.mark.asyncio
+async def test_long_output_rolls_over_to_new_messages():
+    channel, posted = _channel()
+    streamer = MessageStreamer(channel, edit_interval=0)
+
+    for _ in range(5):
+        await streamer.send("x" * 500)
+    assert len(posted) == 2
+    assert all(len(m.content) <= 2000 for m in posted)
+    assert "".join(m.content for m in posted) == "x" * 2500
+
+
+@pytest.mark.asyncio
+async def test_finish_replaces_interim_text_and_deletes_surplus():
+    channel, posted = _channel()
+    streamer = MessageStreamer(channel, edit_interval=0)
+
+    await streamer.send("y" * 2500)
+    await streamer.reset()
+    await streamer.finish("Short answer")
+
+    assert posted[0].content == "Short answer"
+    posted[1].delete.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_nothing_posted_without_text():
+    channel, posted = _channel()
+    streamer = MessageStreamer(channel)
+    await streamer.reset()
+    assert not streamer.started
+    assert posted == []
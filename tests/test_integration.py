@@ -41,6 +41,8 @@ async def test_full_message_flow(tmp_path):
     assert result == "Hello Alice!"
 
     # Verify message was indexed in vector store
+    await agent.drain_indexing()
+    await vector_mem.drain()
     results = vector_mem.search("Alice", k=1)
     assert len(results) >= 1
 
@@ -0,0 +1,90 @@
+"""Tests for the message log -> vector memory backfill."""
+
+import pytest
+
+from src.memory.backfill import (
+    CHECKPOINT_NAME,
+    backfill_vectors,
+    read_checkpoint,
+)
+from src.memory.store import MessageStore
+from src.memory.vector import VectorMemory
+from tests.conftest import HashingEmbedding
+
+
+@pytest.fixture
+async def store(tmp_path):
+    s = MessageStore(tmp_path / "messages.sqlite")
+    await s.initialize()
+    yield s
+    await s.close()
+
+
+@pytest.fixture
+def vector_memory(tmp_path, hashing_embedding):
+    vm = VectorMemory(persist_dir=tmp_path / "vectors", embedding_function=hashing_embedding)
+    yield vm
+    vm.close()
+
+
+async def _seed(store, count, *, start=0):
+    for i in range(start, start + count):
+        await store.save_message(
+            channel_id=f"ch-{i % 2}", user_id="u1", user_name="Alice",
+            content=f"message number {i}", is_bot=False, bot_name=None,
+        )
+
+
+@pytest.mark.asyncio
+async def test_backfill_indexes_all_messages(store, vector_memory, tmp_path):
+    await _seed(store, 7)
+    checkpoint = tmp_path / CHECKPOINT_NAME
+    result = await backfill_vectors(
+        store, vector_memory, checkpoint_path=checkpoint, batch_size=3,
+    )
+    assert result.indexed == 7
+    assert read_checkpoint(checkpoint) == result.last_id == 7
+    got = vector_memory._collection.get(ids=["msg-1"])
+    assert got["documents"] == ["[Alice]: message number 0"]
+    assert got["metadatas"][0]["channel_id"] == "ch-0"
+    assert "bot_name" not in got["metadatas"][0]
+
+
+@pytest.mark.asyncio
+async def test_backfill_resumes_from_checkpoint(store, vector_memory, tmp_path):
+    checkpoint = tmp_path / CHECKPOINT_NAME
+    await _seed(store, 4)
+    await backfill_vectors(store, vector_memory, checkpoint_path=checkpoint)
+
+    await _seed(store, 3, start=4)
+    result = await backfill_vectors(store, vector_memory, checkpoint_path=checkpoint)
+    assert result.indexed == 3
+    assert vector_memory._collection.count() == 7
+
+    # Nothing new: a re-run is a no-op
+    result = await backfill_vectors(store, vector_memory, checkpoint_path=checkpoint)
+    assert result.indexed == 0
+
+
+@pytest.mark.asyncio
+async def test_backfill_rerun_from_scratch_is_idempotent(store, vector_memory, tmp_path):
+    checkpoint = tmp_path / CHECKPOINT_NAME
+    await _seed(store, 5)
+    await backfill_vectors(store, vector_memory, checkpoint_path=checkpoint)
+    checkpoint.unlink()
+    await backfill_vectors(store, vector_memory, checkpoint_path=checkpoint)
+    assert vector_memory._collection.count() == 5
+
+
+@pytest.mark.asyncio
+async def test_backfill_with_process_pool(store, vector_memory, tmp_path):
+    await _seed(store, 6)
+    result = await backfill_vectors(
+        store, vector_memory,
+        checkpoint_path=tmp_path / CHECKPOINT_NAME,
+        batch_size=2, workers=2, embedding_factory=HashingEmbedding,
+    )
+    assert result.indexed == 6
+    results = vector_memory.search("message number 3", k=1)
+    assert results[0]["metadata"]["message_id"] == 4
+
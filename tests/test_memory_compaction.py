@@ -6,7 +6,7 @@ import pytest
 
 from langchain_core.messages import AIMessage, HumanMessage
 
-from src.memory.compaction import should_compact, compact_messages
+from src.memory.compaction import SUMMARY_PREFIX, compact_messages, should_compact
 
 
 def test_should_compact_under_limit():
@@ -57,3 +57,47 @@ async def test_compact_short_list_no_op():
     result = await compact_messages(messages, llm=mock_llm, keep_recent=10)
     assert result == messages
     mock_llm.ainvoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_compact_folds_only_the_new_delta_into_existing_summary():
+    mock_llm = MagicMock()
+    mock_llm.ainvoke = AsyncMock(return_value=MagicMock(content="Updated summary"))
+
+    messages = [HumanMessage(content=f"{SUMMARY_PREFIX}Earlier summary")]
+    messages += [HumanMessage(content=f"msg-{i}") for i in range(15)]
+
+    result = await compact_messages(messages, llm=mock_llm, keep_recent=5)
+
+    prompt = mock_llm.ainvoke.call_args[0][0][1].content
+    assert "Earlier summary" in prompt
+    assert "msg-9" in prompt and "msg-10" not in prompt
+    assert result[0].content == f"{SUMMARY_PREFIX}Updated summary"
+    assert len(result) == 6
+
+
+@pytest.mark.asyncio
+async def test_summary_prompt_stays_bounded_for_long_deltas():
+    prompts = []
+
+    async def ainvoke(messages):
+        prompts.append(sum(len(m.content) for m in messages))
+        return MagicMock(content="s" * 10_000)
+
+    mock_llm = MagicMock()
+    mock_llm.ainvoke = ainvoke
+    checkpoints = []
+
+    async def on_checkpoint(summary, folded):
+        checkpoints.append(folded)
+
+    messages = [AIMessage(content="x" * 1_000) for _ in range(200)]
+    await compact_messages(
+        messages, llm=mock_llm, keep_recent=1, on_checkpoint=on_checkpoint,
+    )
+
+    assert len(prompts) > 1
+    # Summary is capped, so every prompt is chunk + summary + instructions
+    assert max(prompts) < 24_000 + 6_000 + 1_000
+    assert checkpoints[-1] == 199
+    assert checkpoints == sorted(checkpoints)
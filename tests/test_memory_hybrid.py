@@ -0,0 +1,137 @@
+"""Tests for hybrid (semantic + keyword) retrieval."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.agent.core import CoreAgent
+from src.memory.backfill import backfill_vectors
+from src.memory.hybrid import DAY_US, HybridRetriever
+from src.memory.store import MessageStore
+from src.memory.vector import VectorMemory
+
+
+@pytest.fixture
+def vector_memory(tmp_path, hashing_embedding):
+    vm = VectorMemory(persist_dir=tmp_path / "vectors", embedding_function=hashing_embedding)
+    yield vm
+    vm.close()
+
+
+@pytest.fixture
+async def store(tmp_path):
+    s = MessageStore(tmp_path / "messages.sqlite")
+    await s.initialize()
+    yield s
+    await s.close()
+
+
+def _now_us():
+    return time.time_ns() // 1000
+
+
+@pytest.mark.asyncio
+async def test_filters_by_session(vector_memory):
+    vector_memory.add(
+        text="[Alice]: pizza plans", metadata={"user_id": "1", "user_name": "Alice"},
+    )
+    vector_memory.add(
+        text="[Bob]: pizza plans too", metadata={"user_id": "2", "user_name": "Bob"},
+    )
+    retriever = HybridRetriever(vector_memory)
+
+    results = await retriever.search("pizza", k=5, session_id="dm-2")
+    assert [r["text"] for r in results] == ["[Bob]: pizza plans too"]
+
+    results = await retriever.search("pizza", k=5, session_id="dm-1", user_name="Alice")
+    assert [r["text"] for r in results] == ["[Alice]: pizza plans"]
+
+
+@pytest.mark.asyncio
+async def test_recency_breaks_ties(vector_memory):
+    now = _now_us()
+    vector_memory.add(text="[Alice]: deploy plan", metadata={"timestamp_us": now - 365 * DAY_US})
+    vector_memory.add(text="[Alice]: deploy plan!", metadata={"timestamp_us": now})
+    retriever = HybridRetriever(vector_memory, semantic_weight=1.0)
+
+    results = await retriever.search("deploy plan", k=2)
+    assert results[0]["text"] == "[Alice]: deploy plan!"
+    assert results[0]["score"] > results[1]["score"]
+
+
+@pytest.mark.asyncio
+async def test_keyword_hits_fuse_with_semantic(vector_memory, store):
+    await store.save_message(
+        channel_id="ch-1", user_id="u1", user_name="Alice",
+        content="the release codename is bluebird", is_bot=False, bot_name=None,
+    )
+    await store.save_message(
+        channel_id="ch-1", user_id="u2", user_name="Bob",
+        content="unrelated chatter", is_bot=False, bot_name=None,
+    )
+    vector_memory.add(
+        text="[Alice]: the release codename is bluebird",
+        metadata={"user_name": "Alice", "timestamp_us": _now_us()},
+    )
+    vector_memory.add(text="[Carol]: lunch?", metadata={"user_name": "Carol"})
+    retriever = HybridRetriever(vector_memory, store)
+
+    results = await retriever.search("bluebird", k=3)
+    assert results[0]["text"] == "[Alice]: the release codename is bluebird"
+    # Found by both sides, so it outranks a semantic-only hit
+    assert results[0]["score"] > results[-1]["score"]
+
+
+@pytest.mark.asyncio
+async def test_keyword_side_maps_session_to_channel_and_excludes_query(vector_memory, store):
+    for channel in ("ch-1", "ch-2"):
+        await store.save_message(
+            channel_id=channel, user_id="u1", user_name="Alice",
+            content=f"bluebird in {channel}", is_bot=False, bot_name=None,
+        )
+    await store.save_message(
+        channel_id="ch-1", user_id="u1", user_name="Alice",
+        content="what about bluebird", is_bot=False, bot_name=None,
+    )
+    retriever = HybridRetriever(vector_memory, store)
+
+    results = await retriever.search(
+        "what about bluebird", k=5, session_id="channel-ch-1",
+        exclude_text="what about bluebird",
+    )
+    assert [r["text"] for r in results] == ["[Alice]: bluebird in ch-1"]
+
+
+@pytest.mark.asyncio
+async def test_live_and_backfilled_documents_match_the_same_filters(
+    vector_memory, store, tmp_path,
+):
+    # Read-only channel traffic only reaches vector memory through the backfill
+    await store.save_message(
+        channel_id="ch-1", user_id="u1", user_name="Alice",
+        content="the pizza order is in", is_bot=False, bot_name=None,
+    )
+    await backfill_vectors(store, vector_memory, checkpoint_path=tmp_path / "checkpoint.json")
+
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=MagicMock(content="Noted"))
+    agent = CoreAgent(llm=llm, system_prompt="System", vector_memory=vector_memory)
+    await agent.invoke(
+        session_id="channel-ch-1", user_message="pizza at noon?", user_name="Bob",
+        channel_id="ch-1", user_id="u2",
+    )
+    await agent.invoke(session_id="dm-u2", user_message="pizza for me too", user_name="Bob")
+    await agent.drain_indexing()
+    await vector_memory.drain()
+
+    retriever = HybridRetriever(vector_memory)
+    both = {"[Alice]: the pizza order is in", "[Bob]: pizza at noon?"}
+    results = await retriever.search("pizza", k=5, channel_id="ch-1")
+    assert {r["text"] for r in results} == both
+    results = await retriever.search("pizza", k=5, session_id="channel-ch-1")
+    assert {r["text"] for r in results} == both
+    results = await retriever.search("pizza", k=5, session_id="dm-u1")
+    assert [r["text"] for r in results] == ["[Alice]: the pizza order is in"]
+    results = await retriever.search("pizza", k=5, session_id="dm-u2")
+    assert {r["text"] for r in results} == {"[Bob]: pizza at noon?", "[Bob]: pizza for me too"}
@@ -0,0 +1,107 @@
+"""Tests for the bounded session store."""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.memory.sessions import SessionStore
+
+
+async def _turn(store, session_id, text):
+    async with store.checkout(session_id) as session:
+        session.append(HumanMessage(content=text))
+        session.append(AIMessage(content=f"re: {text}"))
+
+
+@pytest.mark.asyncio
+async def test_lru_session_is_spilled_and_restored(tmp_path):
+    store = SessionStore(tmp_path / "checkpoints.sqlite", max_sessions=2)
+    await store.initialize()
+    await _turn(store, "a", "one")
+    await _turn(store, "b", "two")
+    await _turn(store, "a", "three")
+    await _turn(store, "c", "four")
+
+    # "b" was least recently used
+    assert store.resident_sessions == 2
+    assert store.stats.evicted == 1
+
+    async with store.checkout("b") as session:
+        assert [m.content for m in session] == ["two", "re: two"]
+        assert isinstance(session[1], AIMessage)
+    assert store.stats.restored == 1
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_message_budget_evicts(tmp_path):
+    store = SessionStore(tmp_path / "checkpoints.sqlite", max_messages=5)
+    await store.initialize()
+    await _turn(store, "a", "one")
+    await _turn(store, "b", "two")
+    assert store.resident_sessions == 2
+    await _turn(store, "c", "three")
+    assert store.resident_sessions == 2
+    assert store.resident_messages <= 5
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_expire(tmp_path):
+    store = SessionStore(tmp_path / "checkpoints.sqlite", ttl_seconds=0)
+    await store.initialize()
+    await _turn(store, "a", "one")
+    assert store.resident_sessions == 0
+    async with store.checkout("a") as session:
+        assert len(session) == 2
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_checked_out_session_is_not_evicted(tmp_path):
+    store = SessionStore(tmp_path / "checkpoints.sqlite", max_sessions=1)
+    await store.initialize()
+    async with store.checkout("a") as session:
+        session.append(HumanMessage(content="in flight"))
+        await _turn(store, "b", "two")
+        session.append(AIMessage(content="done"))
+    async with store.checkout("a") as session:
+        assert [m.content for m in session] == ["in flight", "done"]
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_sessions_survive_restart(tmp_path):
+    store = SessionStore(tmp_path / "checkpoints.sqlite")
+    await store.initialize()
+    await _turn(store, "a", "remember me")
+    await store.close()
+
+    reopened = SessionStore(tmp_path / "checkpoints.sqlite")
+    await reopened.initialize()
+    async with reopened.checkout("a") as session:
+        assert session[0].content == "remember me"
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_without_database_evicted_sessions_are_dropped():
+    store = SessionStore(max_sessions=1)
+    await _turn(store, "a", "one")
+    await _turn(store, "b", "two")
+    async with store.checkout("a") as session:
+        assert session == []
+
+
+@pytest.mark.asyncio
+async def test_summary_checkpoints_are_kept_per_session(tmp_path):
+    store = SessionStore(tmp_path / "checkpoints.sqlite")
+    await store.initialize()
+    await store.save_summary("a", "first", 10)
+    await store.save_summary("a", "second", 4)
+    await store.save_summary("b", "other", 3)
+
+    checkpoints = await store.summaries("a")
+    assert [(c["seq"], c["summary"], c["messages"]) for c in checkpoints] == [
+        (1, "first", 10), (2, "second", 4),
+    ]
+    await store.close()
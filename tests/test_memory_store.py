@@ -1,8 +1,11 @@
 """Tests for SQLite message log."""
 
+import asyncio
+import sqlite3
+
 import pytest
 
-from src.memory.store import MessageStore
+from src.memory.store import MessageStore, to_fts_query
 
 
 @pytest.fixture
@@ -76,3 +79,375 @@ async def test_get_messages_returns_chronological(store):
     messages = await store.get_messages(channel_id="ch-1", limit=10)
     assert messages[0]["content"] == "First"
     assert messages[1]["content"] == "Second"
+
+
+@pytest.mark.asyncio
+async def test_save_message_returns_row_ids(store):
+    first = await store.save_message(
+        channel_id="ch-1", user_id="u1", user_name="Alice",
+        content="First", is_bot=False, bot_name=None,
+    )
+    second = await store.save_message(
+        channel_id="ch-1", user_id="u1", user_name="Alice",
+        content="Second", is_bot=False, bot_name=None,
+    )
+    assert second > first
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_share_one_commit(tmp_path):
+    s = MessageStore(tmp_path / "batched.sqlite", batch_size=10, flush_interval_ms=1000)
+    await s.initialize()
+    ids = await asyncio.gather(*(
+        s.save_message(
+            channel_id="ch-1", user_id="u1", user_name="Alice",
+            content=f"Message {i}", is_bot=False, bot_name=None,
+        )
+        for i in range(10)
+    ))
+    assert len(set(ids)) == 10
+    assert s.stats.batches == 1
+    assert s.stats.rows == 10
+    await s.close()
+
+
+@pytest.mark.asyncio
+async def test_enqueued_messages_flush_after_interval(tmp_path):
+    s = MessageStore(tmp_path / "timed.sqlite", batch_size=100, flush_interval_ms=10)
+    await s.initialize()
+    future = s.enqueue_message(
+        channel_id="ch-1", user_id="u1", user_name="Alice",
+        content="Hello", is_bot=False, bot_name=None,
+    )
+    row_id = await asyncio.wait_for(future, timeout=1)
+    assert row_id == 1
+    assert s.stats.batches == 1
+    await s.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_see_pending_writes(tmp_path):
+    s = MessageStore(tmp_path / "pending.sqlite", batch_size=100, flush_interval_ms=10_000)
+    await s.initialize()
+    s.enqueue_message(
+        channel_id="ch-1", user_id="u1", user_name="Alice",
+        content="Not yet committed", is_bot=False, bot_name=None,
+    )
+    messages = await s.get_messages(channel_id="ch-1", limit=10)
+    assert [m["content"] for m in messages] == ["Not yet committed"]
+    await s.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_writes(tmp_path):
+    db_path = tmp_path / "close.sqlite"
+    s = MessageStore(db_path, batch_size=100, flush_interval_ms=10_000)
+    await s.initialize()
+    s.enqueue_message(
+        channel_id="ch-1", user_id="u1", user_name="Alice",
+        content="Flushed on close", is_bot=False, bot_name=None,
+    )
+    await s.close()
+
+    reopened = MessageStore(db_path)
+    await reopened.initialize()
+    messages = await reopened.get_messages(channel_id="ch-1", limit=10)
+    assert messages[0]["content"] == "Flushed on close"
+    await reopened.close()
+
+
+@pytest.fixture
+async def wal_store(tmp_path):
+    s = MessageStore(tmp_path / "wal.sqlite", wal=True, read_pool_size=2)
+    await s.initialize()
+    yield s
+    await s.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_mode_enabled(wal_store):
+    cursor = await wal_store._db.execute("PRAGMA journal_mode")
+    row = await cursor.fetchone()
+    assert row[0] == "wal"
+    cursor = await wal_store._db.execute("PRAGMA synchronous")
+    row = await cursor.fetchone()
+    assert row[0] == 1  # NORMAL
+
+
+@pytest.mark.asyncio
+async def test_read_pool_sees_committed_writes(wal_store):
+    await wal_store.save_message(
+        channel_id="ch-1", user_id="u1", user_name="Alice",
+        content="The weather is nice today", is_bot=False, bot_name=None,
+    )
+    messages = await wal_store.get_messages(channel_id="ch-1", limit=10)
+    assert messages[0]["content"] == "The weather is nice today"
+    results = await wal_store.search_messages(query="weather", limit=10)
+    assert len(results) == 1
+
+
+@pytest.mark.asyncio
+async def test_read_pool_connections_are_read_only(wal_store):
+    async with wal_store._reader() as reader:
+        assert reader is not wal_store._db
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            await reader.execute(
+                "INSERT INTO messages (timestamp, channel_id, user_id, user_name, content)"
+                " VALUES ('t', 'c', 'u', 'n', 'x')"
+            )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_use_pool(wal_store):
+    await wal_store.save_message(
+        channel_id="ch-1", user_id="u1", user_name="Alice",
+        content="Hello", is_bot=False, bot_name=None,
+    )
+    results = await asyncio.gather(*(
+        wal_store.get_messages(channel_id="ch-1", limit=10) for _ in range(6)
+    ))
+    assert all(len(r) == 1 for r in results)
+    assert wal_store._idle_readers.qsize() == 2
+
+
+async def _save(store, content, channel_id="ch-1"):
+    return await store.save_message(
+        channel_id=channel_id, user_id="u1", user_name="Alice",
+        content=content, is_bot=False, bot_name=None,
+    )
+
+
+def test_to_fts_query_quotes_terms():
+    assert to_fts_query("weather today") == '"weather" "today"'
+    assert to_fts_query('"nice day" deploy*') == '"nice day" "deploy"*'
+    assert to_fts_query("don't OR NEAR(") == '"don\'t" "OR" "NEAR("'
+    assert to_fts_query("   ") == ""
+    assert to_fts_query("weather today", match_any=True) == '"weather" OR "today"'
+
+
+@pytest.mark.asyncio
+async def test_search_phrase_query(store):
+    await _save(store, "The weather is nice today")
+    await _save(store, "Nice weather is rare")
+    results = await store.search_messages(query='"weather is nice"', limit=10)
+    assert [r["content"] for r in results] == ["The weather is nice today"]
+
+
+@pytest.mark.asyncio
+async def test_search_prefix_query(store):
+    await _save(store, "Deploying the new build")
+    await _save(store, "Lunch plans")
+    results = await store.search_messages(query="deploy*", limit=10)
+    assert [r["content"] for r in results] == ["Deploying the new build"]
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_by_bm25_and_highlights(store):
+    await _save(store, "pizza is fine I guess, though I prefer other food most days")
+    await _save(store, "pizza pizza pizza")
+    results = await store.search_messages(query="pizza", limit=10)
+    assert results[0]["content"] == "pizza pizza pizza"
+    assert "**pizza**" in results[0]["snippet"]
+    assert results[0]["rank"] <= results[1]["rank"]
+
+
+@pytest.mark.asyncio
+async def test_search_filters_by_channel(store):
+    await _save(store, "release notes", channel_id="ch-1")
+    await _save(store, "release party", channel_id="ch-2")
+    results = await store.search_messages(query="release", channel_id="ch-2")
+    assert [r["content"] for r in results] == ["release party"]
+
+
+@pytest.mark.asyncio
+async def test_search_tolerates_fts_syntax(store):
+    await _save(store, "don't panic")
+    results = await store.search_messages(query="don't", limit=10)
+    assert len(results) == 1
+
+
+@pytest.mark.asyncio
+async def test_fts_backfills_existing_database(tmp_path):
+    db_path = tmp_path / "legacy.sqlite"
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            user_name TEXT NOT NULL,
+            content TEXT NOT NULL,
+            is_bot INTEGER NOT NULL DEFAULT 0,
+            bot_name TEXT
+        )
+    """)
+    conn.execute(
+        "INSERT INTO messages (timestamp, channel_id, user_id, user_name, content)"
+        " VALUES ('2026-01-01T00:00:00+00:00', 'ch-1', 'u1', 'Alice', 'legacy weather report')"
+    )
+    conn.commit()
+    conn.close()
+
+    s = MessageStore(db_path)
+    await s.initialize()
+    results = await s.search_messages(query="weather", limit=10)
+    assert [r["content"] for r in results] == ["legacy weather report"]
+    await s.close()
+
+
+@pytest.mark.asyncio
+async def test_timestamps_are_epoch_microseconds(store):
+    await _save(store, "Hello")
+    cursor = await store._db.execute("SELECT typeof(timestamp) FROM messages")
+    assert (await cursor.fetchone())[0] == "integer"
+    message = (await store.get_messages(channel_id="ch-1"))[0]
+    assert isinstance(message["timestamp_us"], int)
+    assert message["timestamp"].startswith("20")
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination(store):
+    ids = [await _save(store, f"Message {i}") for i in range(10)]
+    await _save(store, "Other channel", channel_id="ch-2")
+
+    latest = await store.get_messages(channel_id="ch-1", limit=3)
+    assert [m["content"] for m in latest] == ["Message 7", "Message 8", "Message 9"]
+
+    older = await store.get_messages(channel_id="ch-1", limit=3, before_id=latest[0]["id"])
+    assert [m["content"] for m in older] == ["Message 4", "Message 5", "Message 6"]
+
+    newer = await store.get_messages(channel_id="ch-1", limit=2, after_id=ids[1])
+    assert [m["content"] for m in newer] == ["Message 2", "Message 3"]
+
+    window = await store.get_messages(
+        channel_id="ch-1", limit=10, after_id=ids[2], before_id=ids[5],
+    )
+    assert [m["content"] for m in window] == ["Message 3", "Message 4"]
+
+
+@pytest.mark.asyncio
+async def test_history_query_uses_channel_id_index(store):
+    cursor = await store._db.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM messages"
+        " WHERE channel_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+        ("ch-1", 100, 10),
+    )
+    plan = " ".join(row[3] for row in await cursor.fetchall())
+    assert "idx_messages_channel_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_migration_converts_legacy_timestamps(tmp_path):
+    db_path = tmp_path / "legacy.sqlite"
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            user_name TEXT NOT NULL,
+            content TEXT NOT NULL,
+            is_bot INTEGER NOT NULL DEFAULT 0,
+            bot_name TEXT
+        )
+    """)
+    conn.execute(
+        "INSERT INTO messages (timestamp, channel_id, user_id, user_name, content)"
+        " VALUES ('2026-01-01T00:00:00.000123+00:00', 'ch-1', 'u1', 'Alice', 'old message')"
+    )
+    conn.commit()
+    conn.close()
+
+    s = MessageStore(db_path)
+    await s.initialize()
+    new_id = await _save(s, "new message")
+    messages = await s.get_messages(channel_id="ch-1")
+    assert messages[0]["timestamp_us"] == 1_767_225_600_000_123
+    assert messages[0]["timestamp"] == "2026-01-01T00:00:00.000123+00:00"
+    assert messages[1]["id"] == new_id > messages[0]["id"]
+    # FTS triggers survive the table rebuild
+    results = await s.search_messages(query="new")
+    assert [r["content"] for r in results] == ["new message"]
+    await s.close()
+
+
+def _v1_database(db_path):
+    """A schema version 1 database: ISO timestamps plus the FTS index."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            user_name TEXT NOT NULL,
+            content TEXT NOT NULL,
+            is_bot INTEGER NOT NULL DEFAULT 0,
+            bot_name TEXT
+        );
+        CREATE VIRTUAL TABLE messages_fts USING fts5(
+            content, content='messages', content_rowid='id', tokenize='unicode61'
+        );
+        CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages BEGIN
+            INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+        END;
+        INSERT INTO messages (timestamp, channel_id, user_id, user_name, content)
+            VALUES ('2026-01-01T00:00:00+00:00', 'ch-1', 'u1', 'Alice', 'old message');
+        PRAGMA user_version=1;
+    """)
+    return conn
+
+
+@pytest.mark.asyncio
+async def test_migration_recovers_from_leftover_table(tmp_path):
+    db_path = tmp_path / "interrupted.sqlite"
+    conn = _v1_database(db_path)
+    # An earlier copy was killed after creating its target table
+    conn.execute("CREATE TABLE messages_v2 (id INTEGER PRIMARY KEY)")
+    conn.commit()
+    conn.close()
+
+    s = MessageStore(db_path)
+    await s.initialize()
+    messages = await s.get_messages(channel_id="ch-1")
+    assert [m["content"] for m in messages] == ["old message"]
+    assert messages[0]["timestamp_us"] == 1_767_225_600_000_000
+    await s.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    db_path = tmp_path / "failing.sqlite"
+    _v1_database(db_path).close()
+
+    def fail(value):
+        raise ValueError("killed mid-copy")
+
+    monkeypatch.setattr("src.memory.store._iso_to_us", fail)
+    s = MessageStore(db_path)
+    with pytest.raises(sqlite3.OperationalError):
+        await s.initialize()
+    await s._db.close()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone() == (1,)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    assert "messages_v2" not in tables
+    conn.close()
+
+    monkeypatch.undo()
+    s = MessageStore(db_path)
+    await s.initialize()
+    assert [m["content"] for m in await s.get_messages(channel_id="ch-1")] == ["old message"]
+    await s.close()
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_pages_in_id_order(store):
+    for i in range(5):
+        await _save(store, f"Message {i}", channel_id=f"ch-{i % 2}")
+    pages = [page async for page in store.iter_messages(after_id=1, batch_size=2)]
+    assert [[m["id"] for m in page] for page in pages] == [[2, 3], [4, 5]]
@@ -1,5 +1,7 @@
 """Tests for vector store with hybrid search."""
 
+import asyncio
+
 import pytest
 
 from src.memory.vector import VectorMemory
@@ -46,3 +48,236 @@ def test_add_multiple_and_search(vector_memory):
         )
     results = vector_memory.search("topic", k=3)
     assert len(results) == 3
+
+
+@pytest.fixture
+def offline_memory(tmp_path, hashing_embedding):
+    vm = VectorMemory(
+        persist_dir=tmp_path / "offline-vectors",
+        embedding_function=hashing_embedding,
+        max_pending=2,
+    )
+    yield vm
+    vm.close()
+
+
+@pytest.mark.asyncio
+async def test_async_add_and_search(offline_memory):
+    await offline_memory.aadd(text="Alice loves pizza", metadata={"user_name": "Alice"})
+    results = await offline_memory.asearch("pizza", k=1)
+    assert results[0]["text"] == "Alice loves pizza"
+
+
+@pytest.mark.asyncio
+async def test_async_calls_run_off_the_event_loop(offline_memory, monkeypatch):
+    import threading
+
+    seen = []
+    original = offline_memory.search
+
+    def recording_search(query, **kwargs):
+        seen.append(threading.current_thread().name)
+        return original(query, **kwargs)
+
+    monkeypatch.setattr(offline_memory, "search", recording_search)
+    await offline_memory.asearch("anything")
+    assert seen[0].startswith("vector-memory")
+
+
+@pytest.mark.asyncio
+async def test_background_adds_apply_backpressure(offline_memory, monkeypatch):
+    import asyncio
+    import threading
+
+    release = threading.Event()
+    original = offline_memory._write_batch
+
+    def slow_write(batch):
+        release.wait(timeout=5)
+        return original(batch)
+
+    monkeypatch.setattr(offline_memory, "_write_batch", slow_write)
+    await offline_memory.add_in_background(text="one", metadata={"n": "1"})
+    await offline_memory.add_in_background(text="two", metadata={"n": "2"})
+    assert offline_memory.pending_count == 2
+
+    third = asyncio.create_task(
+        offline_memory.add_in_background(text="three", metadata={"n": "3"})
+    )
+    await asyncio.sleep(0.05)
+    assert not third.done()  # max_pending=2 reached, producer waits
+
+    release.set()
+    await third
+    await offline_memory.drain()
+    assert offline_memory.pending_count == 0
+    assert len(await offline_memory.asearch("three", k=3)) == 3
+
+
+@pytest.mark.asyncio
+async def test_background_add_drops_when_writes_keep_failing(
+    tmp_path, hashing_embedding, monkeypatch,
+):
+    vm = VectorMemory(
+        persist_dir=tmp_path / "failing-vectors",
+        embedding_function=hashing_embedding,
+        max_pending=4,
+        max_wait=0.05,
+        batch_size=2,
+        flush_interval=60,
+    )
+
+    def failing_write(batch):
+        raise RuntimeError("embedder unavailable")
+
+    monkeypatch.setattr(vm, "_write_batch", failing_write)
+    ids = [await vm.add_in_background(text=f"doc {i}", metadata={"n": str(i)}) for i in range(6)]
+    assert all(ids[:4])
+    assert ids[4:] == [None, None]
+    assert vm.dropped == 2
+    await asyncio.gather(*vm._background, return_exceptions=True)
+    vm.close()
+
+
+@pytest.fixture
+def batching_memory(tmp_path, hashing_embedding):
+    vm = VectorMemory(
+        persist_dir=tmp_path / "batched-vectors",
+        embedding_function=hashing_embedding,
+        batch_size=4,
+        flush_interval=60,
+    )
+    yield vm
+    vm.close()
+
+
+@pytest.mark.asyncio
+async def test_buffer_writes_one_batch_per_batch_size(batching_memory, monkeypatch):
+    batches = []
+    original = batching_memory._write_batch
+
+    def recording_write(batch):
+        batches.append(len(batch))
+        return original(batch)
+
+    monkeypatch.setattr(batching_memory, "_write_batch", recording_write)
+    for i in range(4):
+        await batching_memory.add_in_background(text=f"message {i}", metadata={"n": str(i)})
+    await batching_memory.drain()
+    assert batches == [4]
+    assert batching_memory._collection.count() == 4
+
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_on_age(tmp_path, hashing_embedding):
+    import asyncio
+
+    vm = VectorMemory(
+        persist_dir=tmp_path / "aged-vectors",
+        embedding_function=hashing_embedding,
+        batch_size=100,
+        flush_interval=0.01,
+    )
+    await vm.add_in_background(text="lonely message", metadata={"n": "1"})
+    for _ in range(100):
+        if vm._collection.count() == 1:
+            break
+        await asyncio.sleep(0.01)
+    assert vm._collection.count() == 1
+    vm.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_buffer(batching_memory):
+    await batching_memory.add_in_background(text="flush me", metadata={"n": "1"})
+    assert batching_memory._collection.count() == 0
+    batching_memory.close()
+    assert batching_memory._collection.count() == 1
+    assert not list(batching_memory._journal_dir.glob("ingest-journal*.jsonl"))
+
+
+@pytest.mark.asyncio
+async def test_unflushed_items_recovered_after_crash(tmp_path, hashing_embedding):
+    persist_dir = tmp_path / "crash-vectors"
+    vm = VectorMemory(
+        persist_dir=persist_dir, embedding_function=hashing_embedding,
+        batch_size=100, flush_interval=60,
+    )
+    await vm.add_in_background(text="survives the crash", metadata={"n": "1"})
+    vm._flush_timer.cancel()  # simulate dying before the batch is written
+    # A partial line from the crash
+    journal = vm._journal_path
+    journal.write_text(journal.read_text() + '{"id": "torn')
+
+    recovered = VectorMemory(persist_dir=persist_dir, embedding_function=hashing_embedding)
+    results = recovered.search("crash", k=1)
+    assert results[0]["text"] == "survives the crash"
+    assert not list(persist_dir.glob("ingest-journal*.jsonl"))
+    recovered.close()
+
+
+def test_add_many_upserts_in_one_call(offline_memory):
+    ids = offline_memory.add_many(
+        texts=["alpha", "beta"], metadatas=[{"n": "1"}, {"n": "2"}], ids=["a", "b"],
+    )
+    assert ids == ["a", "b"]
+    offline_memory.add_many(texts=["alpha again"], metadatas=[{"n": "1"}], ids=["a"])
+    assert offline_memory._collection.count() == 2
+
+
+def test_content_ids_are_deterministic(offline_memory):
+    first = offline_memory.add(text="same text", metadata={"session_id": "dm-1"})
+    again = offline_memory.add(text="same text", metadata={"session_id": "dm-1"})
+    other = offline_memory.add(text="same text", metadata={"session_id": "dm-2"})
+    assert first == again != other
+    assert offline_memory.size == 2
+
+
+def test_ids_survive_restart_without_collisions(tmp_path, hashing_embedding):
+    persist_dir = tmp_path / "shared-vectors"
+    a = VectorMemory(persist_dir=persist_dir, embedding_function=hashing_embedding)
+    a.add(text="first", metadata={"n": "1"})
+    a.add(text="second", metadata={"n": "2"})
+    a._collection.delete(ids=[a.content_id("first", {"n": "1"})])
+    a.close()
+
+    b = VectorMemory(persist_dir=persist_dir, embedding_function=hashing_embedding)
+    b.add(text="third", metadata={"n": "3"})
+    assert b.size == 2
+    assert sorted(r["text"] for r in b.search("anything", k=5)) == ["second", "third"]
+    b.close()
+
+
+def test_search_does_not_count_collection(offline_memory, monkeypatch):
+    offline_memory.add(text="hello world", metadata={"n": "1"})
+    monkeypatch.setattr(
+        offline_memory._collection, "count",
+        lambda: pytest.fail("count() called on the query path"),
+    )
+    assert len(offline_memory.search("hello", k=5)) == 1
+
+
+def test_search_many_batches_queries(offline_memory, monkeypatch):
+    offline_memory.add(text="pizza party tonight", metadata={"n": "1"})
+    offline_memory.add(text="python release notes", metadata={"n": "2"})
+    calls = []
+    original = offline_memory._collection.query
+
+    def recording_query(**kwargs):
+        calls.append(kwargs["query_texts"])
+        return original(**kwargs)
+
+    monkeypatch.setattr(offline_memory._collection, "query", recording_query)
+    results = offline_memory.search_many(["pizza", "python release"], k=1)
+    assert len(calls) == 1
+    assert results[0][0]["text"] == "pizza party tonight"
+    assert results[1][0]["text"] == "python release notes"
+    assert offline_memory.search_many([]) == []
+
+
+def test_add_many_dedupes_ids_within_batch(offline_memory):
+    offline_memory.add_many(
+        texts=["v1", "v2"], metadatas=[{"n": "1"}, {"n": "1"}], ids=["same", "same"],
+    )
+    assert offline_memory.size == 1
+    assert offline_memory._collection.get(ids=["same"])["documents"] == ["v2"]
@@ -247,3 +247,85 @@ async def test_run_dynamic_skill_error_handling(tmp_path):
 
     result = await _run_dynamic_skill(manifest, "test")
     assert "failed" in result.lower()
+
+
+@pytest.mark.asyncio
+async def test_run_dynamic_skill_reuses_module(tmp_path):
+    """The entry point is executed once, not on every call."""
+    from src.skills.modules import SkillModuleCache
+
+    skill_dir = tmp_path / "counter"
+    skill_dir.mkdir()
+    (skill_dir / "tool.py").write_text(
+        "LOADS = []\n"
+        "LOADS.append(1)\n"
+        "async def run(input_text: str) -> str:\n"
+        "    return str(len(LOADS))\n"
+    )
+    manifest = SkillManifest(
+        name="counter",
+        description="Counts loads",
+        trigger="count",
+        permissions=[],
+        entry_point="tool.py",
+        author="agent",
+        trusted=False,
+        created="2026-01-01",
+        path=skill_dir,
+    )
+    cache = SkillModuleCache()
+
+    assert await _run_dynamic_skill(manifest, "x", cache) == "1"
+    assert await _run_dynamic_skill(manifest, "x", cache) == "1"
+    assert cache.loads == 1
+
+
+@pytest.mark.asyncio
+async def test_run_dynamic_skill_uses_worker_pool(tmp_path):
+    """With a worker pool, the skill is sent to it instead of run in-process."""
+    from unittest.mock import AsyncMock
+
+    skill_dir = tmp_path / "remote"
+    skill_dir.mkdir()
+    (skill_dir / "tool.py").write_text("raise RuntimeError('not imported here')\n")
+    manifest = SkillManifest(
+        name="remote",
+        description="Runs remotely",
+        trigger="remote",
+        permissions=[],
+        entry_point="tool.py",
+        author="agent",
+        trusted=False,
+        created="2026-01-01",
+        path=skill_dir,
+    )
+    workers = MagicMock()
+    workers.run = AsyncMock(return_value="from worker")
+
+    result = await _run_dynamic_skill(manifest, "hi", workers=workers)
+
+    assert result == "from worker"
+    workers.run.assert_awaited_once_with("remote", skill_dir, "tool.py", "hi")
+
+
+@pytest.mark.asyncio
+async def test_dispatch_matches_name_loosely(registry):
+    """Case and separator differences still find the skill."""
+    tool = create_dispatch_skill_tool(registry=registry, llm=MagicMock(), available_tools=[])
+    result = await tool.ainvoke({"skill_name": "Untrusted_Skill", "input_text": "x"})
+    assert "Unknown skill" not in result
+    assert "untrusted-skill" in result
+
+
+@pytest.mark.asyncio
+async def test_dispatch_unknown_skill_suggests_closest(registry):
+    """With a skill index, unknown names get close matches, not the full list."""
+    from unittest.mock import AsyncMock
+
+    index = MagicMock()
+    index.search = AsyncMock(return_value=[registry.get("research")])
+    tool = create_dispatch_skill_tool(
+        registry=registry, llm=MagicMock(), available_tools=[], skill_index=index,
+    )
+    result = await tool.ainvoke({"skill_name": "forecast", "input_text": "x"})
+    assert result == "Unknown skill 'forecast'. Closest matches: research"
@@ -0,0 +1,87 @@
+"""Tests for the embedding-based skill index."""
+
+from pathlib import Path
+
+import pytest
+
+from src.skills.index import SkillIndex
+from src.skills.loader import SkillManifest
+from src.skills.registry import SkillRegistry
+
+VOCAB = ["weather", "rain", "stock", "price", "email", "inbox", "recipe", "cook"]
+
+
+class WordEmbedder:
+    """Bag-of-words vectors over a tiny vocabulary; counts the texts embedded."""
+
+    def __init__(self):
+        self.embedded: list[str] = []
+
+    def __call__(self, texts):
+        self.embedded.extend(texts)
+        return [[float(w in t.lower()) for w in VOCAB] for t in texts]
+
+
+def _skill(name, trigger):
+    return SkillManifest(
+        name=name, description=name, trigger=trigger, permissions=[],
+        entry_point="tool.py", author="agent", trusted=False, created="2026-01-01",
+        path=Path(f"/tmp/{name}"),
+    )
+
+
+@pytest.fixture
+def registry():
+    r = SkillRegistry()
+    r.register(_skill("forecast", "weather and rain questions"))
+    r.register(_skill("ticker", "stock price lookups"))
+    r.register(_skill("mail", "email inbox triage"))
+    r.register(_skill("kitchen", "recipe and cook help"))
+    return r
+
+
+@pytest.mark.asyncio
+async def test_search_returns_top_k_relevant(registry):
+    index = SkillIndex(registry, WordEmbedder(), top_k=2)
+    skills = await index.search("will it rain? check the weather")
+    assert skills[0].name == "forecast"
+    assert len(skills) == 2
+
+
+@pytest.mark.asyncio
+async def test_named_skill_always_included(registry):
+    index = SkillIndex(registry, WordEmbedder(), top_k=1)
+    skills = await index.search("use kitchen to check the weather")
+    assert [s.name for s in skills] == ["kitchen"]
+
+
+@pytest.mark.asyncio
+async def test_only_new_skills_are_embedded(registry):
+    embedder = WordEmbedder()
+    index = SkillIndex(registry, embedder, top_k=2)
+    await index.search("weather")
+    assert len(embedder.embedded) == 5  # four skills and the query
+
+    registry.register(_skill("broker", "stock trades"))
+    await index.search("stock")
+    skill_texts = [t for t in embedder.embedded if "Use when" in t]
+    assert len(skill_texts) == 5
+    assert "broker" in skill_texts[-1]
+
+
+@pytest.mark.asyncio
+async def test_small_registry_skips_embedding(registry):
+    embedder = WordEmbedder()
+    index = SkillIndex(registry, embedder, top_k=10)
+    assert len(await index.search("anything")) == 4
+    assert embedder.embedded == []
+
+
+@pytest.mark.asyncio
+async def test_render_falls_back_to_full_index_on_error(registry):
+    def broken(texts):
+        raise RuntimeError("model unavailable")
+
+    index = SkillIndex(registry, broken, top_k=1)
+    rendered = await index.render("weather")
+    assert rendered == registry.get_skill_index()
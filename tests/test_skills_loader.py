@@ -3,7 +3,7 @@
 import pytest
 import yaml
 
-from src.skills.loader import SkillManifest, load_manifests
+from src.skills.loader import ManifestCache, SkillManifest, load_manifests
 
 
 @pytest.fixture
@@ -49,3 +49,29 @@ def test_load_manifests_empty_dir(tmp_path):
 def test_load_manifests_nonexistent_dir(tmp_path):
     manifests = load_manifests(tmp_path / "nope")
     assert manifests == []
+
+
+def test_manifest_cache_skips_unchanged(skills_dir, tmp_path, monkeypatch):
+    cache_path = tmp_path / "cache" / "manifests.json"
+    cache = ManifestCache(cache_path)
+    assert load_manifests(skills_dir, cache)[0].name == "weather"
+    cache.save()
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr("src.skills.loader.yaml.safe_load", no_parse)
+    manifests = load_manifests(skills_dir, ManifestCache(cache_path))
+    assert manifests[0].name == "weather"
+    assert manifests[0].permissions == ["http_request"]
+
+
+def test_manifest_cache_reparses_changed(skills_dir):
+    cache = ManifestCache()
+    load_manifests(skills_dir, cache)
+    manifest_path = skills_dir / "weather" / "manifest.yaml"
+    data = yaml.safe_load(manifest_path.read_text())
+    data["trigger"] = "When the user asks about rain or snow"
+    manifest_path.write_text(yaml.dump(data))
+
+    assert load_manifests(skills_dir, cache)[0].trigger == data["trigger"]
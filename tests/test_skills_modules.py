@@ -0,0 +1,66 @@
+"""Tests for the dynamic skill module cache."""
+
+import os
+
+from src.skills.modules import SkillModuleCache
+
+
+def _write(path, source, *, mtime_ns=None):
+    path.write_text(source)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_module_reused_until_file_changes(tmp_path):
+    entry = tmp_path / "tool.py"
+    _write(entry, "VALUE = 1\n", mtime_ns=1_000_000_000)
+    cache = SkillModuleCache()
+
+    first = cache.load("demo", entry)
+    assert cache.load("demo", entry) is first
+    assert first.VALUE == 1
+    assert (cache.loads, cache.hits) == (1, 1)
+
+    _write(entry, "VALUE = 2\n", mtime_ns=2_000_000_000)
+    second = cache.load("demo", entry)
+    assert second is not first
+    assert second.VALUE == 2
+    assert cache.loads == 2
+
+
+def test_touch_without_edit_keeps_module(tmp_path):
+    entry = tmp_path / "tool.py"
+    _write(entry, "VALUE = 1\n", mtime_ns=1_000_000_000)
+    cache = SkillModuleCache()
+    first = cache.load("demo", entry)
+
+    os.utime(entry, ns=(3_000_000_000, 3_000_000_000))
+    assert cache.load("demo", entry) is first
+    assert cache.loads == 1
+
+
+def test_bytecode_persisted_across_caches(tmp_path, monkeypatch):
+    entry = tmp_path / "tool.py"
+    _write(entry, "VALUE = 1\n")
+    bytecode = tmp_path / "bytecode"
+
+    SkillModuleCache(bytecode).load("demo", entry)
+    assert len(list(bytecode.iterdir())) == 1
+
+    def no_compile(*args, **kwargs):
+        raise AssertionError("compiled again")
+
+    monkeypatch.setattr("builtins.compile", no_compile)
+    module = SkillModuleCache(bytecode).load("demo", entry)
+    assert module.VALUE == 1
+
+
+def test_corrupt_bytecode_is_recompiled(tmp_path):
+    entry = tmp_path / "tool.py"
+    _write(entry, "VALUE = 1\n")
+    bytecode = tmp_path / "bytecode"
+    SkillModuleCache(bytecode).load("demo", entry)
+    for f in bytecode.iterdir():
+        f.write_bytes(b"\x00garbage")
+
+    assert SkillModuleCache(bytecode).load("demo", entry).VALUE == 1
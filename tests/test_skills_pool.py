@@ -0,0 +1,135 @@
+"""Tests for the out-of-process skill worker pool."""
+
+import asyncio
+
+import pytest
+
+from src.skills.pool import SkillWorkerPool
+
+
+def _skill(tmp_path, name, source):
+    skill_dir = tmp_path / name
+    skill_dir.mkdir()
+    (skill_dir / "tool.py").write_text(source)
+    return skill_dir
+
+
+@pytest.fixture
+async def pool():
+    pool = SkillWorkerPool(1, timeout=5, max_memory_mb=0, max_calls=3)
+    yield pool
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_runs_skill_in_worker_process(pool, tmp_path):
+    skill_dir = _skill(tmp_path, "pid", (
+        "import os\n"
+        "async def run(input_text):\n"
+        "    print('noise on stdout')\n"
+        "    return f'{input_text}:{os.getpid()}'\n"
+    ))
+
+    result = await pool.run("pid", skill_dir, "tool.py", "hi")
+
+    text, pid = result.split(":")
+    assert text == "hi"
+    assert int(pid) != __import__("os").getpid()
+
+
+@pytest.mark.asyncio
+async def test_worker_keeps_module_warm(pool, tmp_path):
+    skill_dir = _skill(tmp_path, "count", (
+        "CALLS = []\n"
+        "async def run(input_text):\n"
+        "    CALLS.append(1)\n"
+        "    return str(len(CALLS))\n"
+    ))
+
+    assert await pool.run("count", skill_dir, "tool.py", "") == "1"
+    assert await pool.run("count", skill_dir, "tool.py", "") == "2"
+
+
+@pytest.mark.asyncio
+async def test_worker_recycled_after_max_calls(pool, tmp_path):
+    skill_dir = _skill(tmp_path, "pid", (
+        "import os\n"
+        "async def run(input_text):\n"
+        "    return str(os.getpid())\n"
+    ))
+
+    pids = [await pool.run("pid", skill_dir, "tool.py", "") for _ in range(4)]
+
+    assert len(set(pids[:3])) == 1
+    assert pids[3] != pids[0]
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_and_replaces_worker(tmp_path):
+    pool = SkillWorkerPool(1, timeout=0.5, max_memory_mb=0)
+    skill_dir = _skill(tmp_path, "spin", (
+        "async def run(input_text):\n"
+        "    if input_text == 'spin':\n"
+        "        while True:\n"
+        "            pass\n"
+        "    return 'ok'\n"
+    ))
+    try:
+        result = await pool.run("spin", skill_dir, "tool.py", "spin")
+        assert "timed out" in result
+        assert await pool.run("spin", skill_dir, "tool.py", "again") == "ok"
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_loop_stays_responsive_during_blocking_skill(pool, tmp_path):
+    skill_dir = _skill(tmp_path, "sleepy", (
+        "import time\n"
+        "async def run(input_text):\n"
+        "    time.sleep(0.5)\n"
+        "    return 'done'\n"
+    ))
+    await pool.start()
+
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.05)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    result = await pool.run("sleepy", skill_dir, "tool.py", "")
+    ticker.cancel()
+
+    assert result == "done"
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_skill_errors_reported(pool, tmp_path):
+    skill_dir = _skill(tmp_path, "boom", (
+        "async def run(input_text):\n"
+        "    raise ValueError('kaboom')\n"
+    ))
+    result = await pool.run("boom", skill_dir, "tool.py", "")
+    assert result == "Skill 'boom' failed: kaboom"
+
+    missing = _skill(tmp_path, "norun", "x = 1\n")
+    assert "no run()" in await pool.run("norun", missing, "tool.py", "")
+
+
+@pytest.mark.asyncio
+async def test_dead_worker_is_replaced(pool, tmp_path):
+    skill_dir = _skill(tmp_path, "die", (
+        "import os\n"
+        "async def run(input_text):\n"
+        "    if input_text == 'die':\n"
+        "        os._exit(1)\n"
+        "    return 'alive'\n"
+    ))
+
+    assert "worker process exited" in await pool.run("die", skill_dir, "tool.py", "die")
+    assert await pool.run("die", skill_dir, "tool.py", "") == "alive"
@@ -49,3 +49,97 @@ def test_empty_registry():
     r = SkillRegistry()
     assert r.get_skill_index() == "No skills available."
     assert r.all_skills() == []
+
+
+def _write_skill(root, name, trigger="test trigger"):
+    skill_dir = root / name
+    skill_dir.mkdir(exist_ok=True)
+    (skill_dir / "manifest.yaml").write_text(
+        f"name: {name}\ndescription: A test skill\ntrigger: {trigger}\n"
+    )
+    return skill_dir
+
+
+def test_sync_only_bumps_version_on_change(tmp_path):
+    _write_skill(tmp_path, "one")
+    r = SkillRegistry()
+    assert r.sync(tmp_path) is True
+    version = r.version
+
+    assert r.sync(tmp_path) is False
+    assert r.version == version
+
+
+def test_sync_rereads_only_changed_skill(tmp_path, monkeypatch):
+    _write_skill(tmp_path, "one")
+    _write_skill(tmp_path, "two")
+    r = SkillRegistry()
+    r.sync(tmp_path)
+
+    loaded = []
+    import src.skills.registry as registry_module
+    original = registry_module.load_manifest
+    monkeypatch.setattr(
+        registry_module, "load_manifest",
+        lambda d, cache=None: loaded.append(d.name) or original(d, cache),
+    )
+    _write_skill(tmp_path, "two", trigger="a much longer trigger than before")
+    assert r.sync(tmp_path) is True
+
+    assert loaded == ["two"]
+    assert r.get("two").trigger == "a much longer trigger than before"
+
+
+def test_sync_removes_deleted_skill(tmp_path):
+    import shutil
+
+    skill_dir = _write_skill(tmp_path, "gone")
+    r = SkillRegistry()
+    r.sync(tmp_path)
+    shutil.rmtree(skill_dir)
+
+    assert r.sync(tmp_path) is True
+    assert r.get("gone") is None
+
+
+def test_refresh_single_directory(tmp_path):
+    r = SkillRegistry()
+    skill_dir = _write_skill(tmp_path, "fresh")
+    assert r.refresh(skill_dir).name == "fresh"
+    assert r.get("fresh") is not None
+
+    (skill_dir / "manifest.yaml").unlink()
+    assert r.refresh(skill_dir) is None
+    assert r.get("fresh") is None
+
+
+def test_removing_override_restores_shadowed_skill(tmp_path):
+    builtin = tmp_path / "builtin"
+    user = tmp_path / "user"
+    builtin.mkdir()
+    user.mkdir()
+    _write_skill(builtin, "shared", trigger="builtin")
+    override = _write_skill(user, "shared", trigger="user")
+    r = SkillRegistry()
+    r.sync(builtin, user)
+    assert r.get("shared").trigger == "user"
+
+    (override / "manifest.yaml").unlink()
+    r.refresh(override)
+    assert r.get("shared").trigger == "builtin"
+
+
+def test_editing_shadowed_builtin_keeps_user_override(tmp_path):
+    builtin = tmp_path / "builtin"
+    user = tmp_path / "user"
+    builtin.mkdir()
+    user.mkdir()
+    shadowed = _write_skill(builtin, "shared", trigger="builtin")
+    _write_skill(user, "shared", trigger="user")
+    r = SkillRegistry()
+    r.sync(builtin, user)
+
+    _write_skill(shadowed.parent, "shared", trigger="an edited builtin trigger")
+    r.sync(builtin, user)
+
+    assert r.get("shared").trigger == "user"
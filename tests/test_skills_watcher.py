@@ -0,0 +1,45 @@
+"""Tests for the skill directory watcher."""
+
+import asyncio
+
+import pytest
+
+from src.skills import watcher as watcher_module
+from src.skills.registry import SkillRegistry
+from src.skills.watcher import SkillWatcher
+
+
+def _write_skill(root, name):
+    skill_dir = root / name
+    skill_dir.mkdir()
+    (skill_dir / "manifest.yaml").write_text(
+        f"name: {name}\ndescription: A test skill\ntrigger: test trigger\n"
+    )
+    return skill_dir
+
+
+def test_apply_changes_refreshes_affected_skill(tmp_path):
+    registry = SkillRegistry()
+    watcher = SkillWatcher(registry, [tmp_path])
+    skill_dir = _write_skill(tmp_path, "edited")
+
+    watcher.apply_changes([skill_dir / "manifest.yaml", tmp_path / "__pycache__" / "x.pyc"])
+
+    assert registry.get("edited") is not None
+
+
+@pytest.mark.asyncio
+async def test_polling_picks_up_new_skill(tmp_path, monkeypatch):
+    monkeypatch.setattr(watcher_module, "awatch", None)
+    registry = SkillRegistry()
+    watcher = SkillWatcher(registry, [tmp_path], poll_interval=0.01)
+    watcher.start()
+    try:
+        _write_skill(tmp_path, "hand-made")
+        for _ in range(100):
+            if registry.get("hand-made") is not None:
+                break
+            await asyncio.sleep(0.01)
+        assert registry.get("hand-made") is not None
+    finally:
+        await watcher.stop()
@@ -0,0 +1,131 @@
+"""Tests for the tool result cache."""
+
+import asyncio
+
+import pytest
+from langchain_core.tools import tool
+
+from src.tools.cache import ToolResultCache
+
+
+def _counting_tools(calls):
+    @tool
+    async def web_search(query: str) -> str:
+        """Search the web.
+
+        Args:
+            query: Search query.
+        """
+        calls.append(query)
+        await asyncio.sleep(0.01)
+        return f"results for {query} #{len(calls)}"
+
+    @tool
+    async def shell_exec(command: str) -> str:
+        """Run a command.
+
+        Args:
+            command: Command to run.
+        """
+        calls.append(command)
+        return "ok"
+
+    return web_search, shell_exec
+
+
+@pytest.mark.asyncio
+async def test_repeated_call_is_served_from_cache():
+    calls = []
+    cache = ToolResultCache()
+    web_search, _ = cache.wrap(list(_counting_tools(calls)))
+
+    first = await web_search.ainvoke({"query": "python"})
+    second = await web_search.ainvoke({"query": "python"})
+    await web_search.ainvoke({"query": "rust"})
+
+    assert first == second
+    assert calls == ["python", "rust"]
+    stats = cache.stats["web_search"]
+    assert (stats.hits, stats.misses) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_side_effect_tools_are_never_cached():
+    calls = []
+    cache = ToolResultCache(ttls={"shell_exec": 60, "file_write": 60, "web_search": 60})
+    tools = list(_counting_tools(calls))
+    wrapped = cache.wrap(tools)
+
+    assert wrapped[1] is tools[1]
+    assert "shell_exec" not in cache.ttls and "file_write" not in cache.ttls
+
+
+@pytest.mark.asyncio
+async def test_entries_expire(monkeypatch):
+    calls = []
+    cache = ToolResultCache(ttls={"web_search": 10})
+    web_search, _ = cache.wrap(list(_counting_tools(calls)))
+
+    now = [1_000.0]
+    monkeypatch.setattr("src.tools.cache.time.time", lambda: now[0])
+    await web_search.ainvoke({"query": "q"})
+    now[0] += 11
+    await web_search.ainvoke({"query": "q"})
+    assert calls == ["q", "q"]
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_is_size_bounded():
+    cache = ToolResultCache(max_bytes=250)
+
+    async def result(text):
+        return text
+
+    for i in range(5):
+        await cache.get_or_call("web_search", {"query": str(i)}, lambda i=i: result(str(i) * 100))
+    assert cache._bytes <= 250
+    # Oldest entries were evicted first
+    assert cache._get_memory(cache.key("web_search", {"query": "0"})) is None
+    assert cache._get_memory(cache.key("web_search", {"query": "4"})) is not None
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached():
+    cache = ToolResultCache()
+    outcomes = iter(["Search failed: timeout", "real results"])
+
+    async def call():
+        return next(outcomes)
+
+    assert await cache.get_or_call("web_search", {"query": "q"}, call) == "Search failed: timeout"
+    assert await cache.get_or_call("web_search", {"query": "q"}, call) == "real results"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_execution():
+    calls = []
+    cache = ToolResultCache()
+    web_search, _ = cache.wrap(list(_counting_tools(calls)))
+
+    results = await asyncio.gather(*(web_search.ainvoke({"query": "same"}) for _ in range(3)))
+    assert calls == ["same"]
+    assert len(set(results)) == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    calls = []
+    cache = ToolResultCache(tmp_path / "tool_cache.sqlite")
+    await cache.initialize()
+    web_search, _ = cache.wrap(list(_counting_tools(calls)))
+    await web_search.ainvoke({"query": "q"})
+    await cache.close()
+
+    restarted = ToolResultCache(tmp_path / "tool_cache.sqlite")
+    await restarted.initialize()
+    web_search, _ = restarted.wrap(list(_counting_tools(calls)))
+    await web_search.ainvoke({"query": "q"})
+    assert calls == ["q"]
+    assert restarted.stats["web_search"].disk_hits == 1
+    assert "web_search" in restarted.report()
+    await restarted.close()
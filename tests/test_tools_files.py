@@ -0,0 +1,67 @@
+"""Tests for paged file reads."""
+
+import pytest
+
+from src.tools.files import file_read
+from src.tools.reading import CappedReader
+
+
+def test_capped_reader_stops_at_limit():
+    reader = CappedReader(5)
+    assert reader.feed(b"abc") is True
+    assert reader.feed(b"defgh") is False
+    assert reader.text() == "abcde\n[Truncated: pass offset=5 to read more]"
+
+
+def test_capped_reader_decodes_characters_split_across_chunks():
+    data = "héllo".encode()
+    reader = CappedReader(100)
+    reader.feed(data[:2])
+    reader.feed(data[2:])
+    assert reader.text() == "héllo"
+
+
+def test_capped_reader_next_offset_excludes_split_character():
+    # "é" is two bytes; a cap inside it leaves it for the next page
+    reader = CappedReader(2, skip=0)
+    reader.feed("aé".encode())
+    assert reader.truncated
+    assert reader.next_offset == 1
+    assert reader.text().startswith("a\n")
+
+
+def test_capped_reader_skip():
+    reader = CappedReader(3, skip=4)
+    reader.feed(b"01")
+    reader.feed(b"23456789")
+    assert reader.next_offset == 7
+    assert reader.text().startswith("456")
+
+
+@pytest.mark.asyncio
+async def test_file_read_pages_through_large_file(tmp_path):
+    test_file = tmp_path / "big.txt"
+    test_file.write_text("0123456789" * 10)
+
+    first = await file_read.ainvoke({"path": str(test_file), "length": 30})
+    assert first.startswith("0123456789" * 3)
+    assert "offset=30" in first
+
+    last = await file_read.ainvoke({"path": str(test_file), "offset": 90, "length": 30})
+    assert last == "0123456789"
+
+
+@pytest.mark.asyncio
+async def test_file_read_exact_length_is_not_truncated(tmp_path):
+    test_file = tmp_path / "small.txt"
+    test_file.write_text("Hello World")
+    result = await file_read.ainvoke({"path": str(test_file), "length": 11})
+    assert result == "Hello World"
+
+
+@pytest.mark.asyncio
+async def test_file_read_rejects_negative_offset(tmp_path):
+    test_file = tmp_path / "small.txt"
+    test_file.write_text("Hello")
+    result = await file_read.ainvoke({"path": str(test_file), "offset": -1})
+    assert result.startswith("Error")
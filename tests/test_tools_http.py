@@ -0,0 +1,66 @@
+"""Tests for the shared HTTP client registry."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.tools import http
+from src.tools.http import HttpClients, get_http_clients, set_http_clients
+
+
+@pytest.fixture(autouse=True)
+def _reset_registry():
+    yield
+    set_http_clients(None)
+
+
+@pytest.mark.asyncio
+async def test_session_is_shared_and_pooled():
+    clients = HttpClients(limit=7, limit_per_host=3, dns_ttl=60)
+    try:
+        first = await clients.session()
+        second = await clients.session()
+        assert first is second
+        assert first.connector.limit == 7
+        assert first.connector.limit_per_host == 3
+    finally:
+        await clients.close()
+    assert first.closed
+
+
+@pytest.mark.asyncio
+async def test_session_recreated_after_close():
+    clients = HttpClients()
+    first = await clients.session()
+    await clients.close()
+    second = await clients.session()
+    try:
+        assert second is not first
+        assert not second.closed
+    finally:
+        await clients.close()
+
+
+def test_firecrawl_client_built_once():
+    clients = HttpClients(firecrawl_api_key="fc-test")
+    fake = MagicMock()
+    with patch("firecrawl.AsyncFirecrawl", return_value=fake) as ctor:
+        assert clients.firecrawl() is fake
+        assert clients.firecrawl() is fake
+    ctor.assert_called_once_with(api_key="fc-test")
+
+
+def test_firecrawl_without_key_is_none():
+    assert HttpClients().firecrawl() is None
+
+
+def test_get_http_clients_returns_installed_registry():
+    clients = HttpClients()
+    set_http_clients(clients)
+    assert get_http_clients() is clients
+
+
+def test_get_http_clients_builds_default_once():
+    assert http._clients is None
+    clients = get_http_clients()
+    assert get_http_clients() is clients
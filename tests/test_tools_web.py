@@ -26,11 +26,31 @@ def test_sanitize_url_adds_https():
     assert sanitize_url("example.com") == "https://example.com"
 
 
+def _body(*chunks: bytes):
+    async def iter_chunked(size):
+        for chunk in chunks:
+            yield chunk
+    content = MagicMock()
+    content.iter_chunked = iter_chunked
+    return content
+
+
+def _mock_session(mock_response):
+    mock_get_cm = AsyncMock()
+    mock_get_cm.__aenter__ = AsyncMock(return_value=mock_response)
+    mock_get_cm.__aexit__ = AsyncMock(return_value=None)
+    mock_session = MagicMock()
+    mock_session.closed = False
+    mock_session.get = MagicMock(return_value=mock_get_cm)
+    return mock_session
+
+
 @pytest.mark.asyncio
 async def test_http_request_fetches():
     mock_response = AsyncMock()
     mock_response.status = 200
-    mock_response.text = AsyncMock(return_value="<html>Hello</html>")
+    mock_response.charset = "utf-8"
+    mock_response.content = _body(b"<html>", b"Hello</html>")
     mock_response.headers = {"content-type": "text/html"}
 
     mock_get_cm = AsyncMock()
@@ -47,6 +67,47 @@ async def test_http_request_fetches():
         assert "Hello" in result
 
 
+@pytest.mark.asyncio
+async def test_http_request_stops_reading_at_cap():
+    pulled = []
+
+    async def iter_chunked(size):
+        for i in range(1000):
+            pulled.append(i)
+            yield b"x" * 1000
+
+    mock_response = MagicMock()
+    mock_response.status = 200
+    mock_response.charset = None
+    mock_response.content.iter_chunked = iter_chunked
+    session = _mock_session(mock_response)
+
+    with patch("src.tools.web.get_http_clients") as clients:
+        clients.return_value.session = AsyncMock(return_value=session)
+        result = await http_request.ainvoke({"url": "https://example.com", "length": 2500})
+
+    assert result.startswith("x" * 2500 + "\n[Truncated: pass offset=2500")
+    assert len(pulled) == 3
+
+
+@pytest.mark.asyncio
+async def test_http_request_offset_uses_range_or_skips():
+    mock_response = MagicMock()
+    mock_response.status = 200  # server ignored Range
+    mock_response.charset = "utf-8"
+    mock_response.content = _body(b"0123456789")
+    session = _mock_session(mock_response)
+
+    with patch("src.tools.web.get_http_clients") as clients:
+        clients.return_value.session = AsyncMock(return_value=session)
+        result = await http_request.ainvoke(
+            {"url": "https://example.com", "offset": 4, "length": 3},
+        )
+
+    assert session.get.call_args.kwargs["headers"] == {"Range": "bytes=4-7"}
+    assert result.startswith("456\n[Truncated: pass offset=7")
+
+
 @pytest.mark.asyncio
 async def test_web_search_returns_results():
     mock_client = AsyncMock()